@@ -1,9 +1,10 @@
 import abc
+from contextlib import contextmanager
 from os.path import exists, join
 import numpy as np
-import requests
+from plateauutils.network.download_cache import default_download_cache
+from plateauutils.network.downloader import download
 from shapely.geometry import Polygon
-from tqdm import tqdm
 
 
 class PlateauParser(metaclass=abc.ABCMeta):
@@ -23,6 +24,15 @@ class PlateauParser(metaclass=abc.ABCMeta):
     def _target_list(self, polygon: Polygon = None) -> list:
         raise NotImplementedError("_target_list method is not implemented")
 
+    @contextmanager
+    def _open_cached(self, url: str, cache):
+        # キャッシュから取得し、パースが終わるまで削除されないようにする
+        # cacheがTrueの場合は共有のダウンロードキャッシュを利用する
+        if cache is True:
+            cache = default_download_cache()
+        with cache.open_cached(url) as saved_path:
+            yield saved_path
+
     def _download(self, url: str = "", target_dir: str = "") -> str:
         # ダウンロードパスが無ければエラー
         if not exists(target_dir):
@@ -34,27 +44,5 @@ class PlateauParser(metaclass=abc.ABCMeta):
         # 保存パスにファイルが存在すれば、そのパスを返す
         if exists(saved_path):
             return saved_path
-        # 進捗を表示するため、ストリームでダウンロード
-        response = requests.get(url, stream=True)
-        # レスポンスが200ならダウンロード
-        if response.status_code == 200:
-            # ファイルサイズを取得
-            total_size = int(response.headers.get("content-length", 0))
-            # 1 Kibibyte
-            block_size = 1024
-            # 進捗表示
-            t = tqdm(total=total_size, unit="iB", unit_scale=True)
-            with open(saved_path, "wb") as f:
-                for data in response.iter_content(block_size):
-                    # 進捗を更新
-                    t.update(len(data))
-                    # ファイルに書き込み
-                    f.write(data)
-            # 進捗表示を閉じる
-            t.close()
-            # サイズを確認、問題があればエラー
-            if total_size != 0 and t.n != total_size:
-                raise ConnectionError("ERROR, something went wrong")
-        else:
-            raise ConnectionError(f"Cannot download {url}")
-        return saved_path
+        # 一時ファイルに並列にダウンロードし、完了してから保存パスに移動する
+        return download(url, saved_path)
@@ -5,8 +5,15 @@ from reearthcmsapi.model.asset import Asset
 from reearthcmsapi.model.model import Model
 from reearthcmsapi.model.versioned_item import VersionedItem
 from reearthcmsapi.model.asset_embedding import AssetEmbedding
+from functools import partial
+import math
+from plateauutils.network.session import (
+    DEFAULT_CONCURRENCY,
+    get_session,
+    run_limited,
+    run_sync,
+)
 import pprint
-import requests
 
 
 class NoArgsException(Exception):
@@ -17,6 +24,16 @@ class NotFoundException(Exception):
     pass
 
 
+def _api_client(endpoint: str, access_token: str) -> reearthcmsapi.ApiClient:
+    # 1回の問い合わせの中でコネクションを再利用するAPIクライアントを作成する
+    # 利用後にコネクションを閉じるため、with文で利用する
+    configuration = reearthcmsapi.Configuration(
+        host=endpoint, access_token=access_token
+    )
+    configuration.connection_pool_maxsize = DEFAULT_CONCURRENCY
+    return reearthcmsapi.ApiClient(configuration)
+
+
 # query reearth cms via public api
 def public_query(
     endpoint: str = None, prefecture: str = None, city_name: str = None
@@ -43,7 +60,7 @@ def public_query(
     page = 1
     hasMore = True
     while hasMore:
-        response = requests.get(endpoint, params={"page": page})
+        response = get_session().get(endpoint, params={"page": page})
         if response.status_code == 200:
             obj = response.json()
             for item in obj["results"]:
@@ -124,45 +141,16 @@ def private_query(
     str
         CityGMLのパス
     """
-    configuration = reearthcmsapi.Configuration(
-        host=endpoint, access_token=access_token
-    )
-    # Enter a context with an instance of the API client
-    with reearthcmsapi.ApiClient(configuration) as api_client:
+    with _api_client(endpoint, access_token) as api_client:
         # Create an instance of the API class
         api_instance = items_project_api.ItemsProjectApi(api_client)
-
-        # example passing only optional values
         path_params = {
             "projectIdOrAlias": project,
             "modelIdOrKey": model,
         }
-        page = 1
         perPage = 50
-        totalCount = 0
-        query_params = {
-            "sort": "createdAt",
-            "dir": "desc",
-            "page": page,
-            "perPage": perPage,
-            "ref": "latest",
-            "asset": AssetEmbedding("all"),
-        }
-        try:
-            # Returns a list of items.
-            api_response = api_instance.item_filter_with_project(
-                path_params=path_params,
-                query_params=query_params,
-            )
-            items = api_response.body["items"]
-            url = _check_prefecture_city(items, prefecture, city_name)
-            if url != None:
-                return url
-            totalCount = api_response.body["totalCount"]
-        except reearthcmsapi.ApiException as e:
-            print("Exception when calling ItemsApi->item_filter: %s\n" % e)
-        while (page * perPage) < totalCount:
-            page += 1
+
+        def fetch_page(page):
             query_params = {
                 "sort": "createdAt",
                 "dir": "desc",
@@ -177,12 +165,33 @@ def private_query(
                     path_params=path_params,
                     query_params=query_params,
                 )
-                items = api_response.body["items"]
-                url = _check_prefecture_city(items, prefecture, city_name)
-                if url != None:
-                    return url
+                return api_response.body
             except reearthcmsapi.ApiException as e:
                 print("Exception when calling ItemsApi->item_filter: %s\n" % e)
+                return None
+
+        # 1ページ目で総数を確認してから、存在するページのみを取得する
+        body = fetch_page(1)
+        if body is None:
+            return None
+        url = _check_prefecture_city(body["items"], prefecture, city_name)
+        if url != None:
+            return url
+        totalCount = body["totalCount"]
+        pages = list(range(2, math.ceil(totalCount / perPage) + 1))
+        # 残りのページは同時に取得し、ページの順に確認する
+        # 見つかった時点で以降のページは取得しない
+        for i in range(0, len(pages), DEFAULT_CONCURRENCY):
+            functions = [
+                partial(fetch_page, page) for page in pages[i : i + DEFAULT_CONCURRENCY]
+            ]
+            for body in run_sync(run_limited(functions, DEFAULT_CONCURRENCY)):
+                if body is None:
+                    continue
+                url = _check_prefecture_city(body["items"], prefecture, city_name)
+                if url != None:
+                    return url
+
 
 # upload file to the reearth project using reearth-cms-api
 def upload_to_reearth(
@@ -209,17 +218,13 @@ def upload_to_reearth(
     boolean
         アップロードの成否
     """
-    configuration = reearthcmsapi.Configuration(
-        host = endpoint,
-        access_token = access_token
-    )
-    with reearthcmsapi.ApiClient(configuration) as api_client:
+    with _api_client(endpoint, access_token) as api_client:
         api_instance = assets_project_api.AssetsProjectApi(api_client)
         path_params = {
-            'projectId': project,
+            "projectId": project,
         }
         body = dict(
-            file=open(filepath, 'rb'),
+            file=open(filepath, "rb"),
             skip_decompression=False,
         )
         try:
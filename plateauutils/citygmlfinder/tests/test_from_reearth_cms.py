@@ -150,6 +150,11 @@ def test_private_query_with_many():
         city_name="西東京市",
     )
     assert result is not None
+    # totalCountから分かる2ページ目までのみを取得する
+    pages = sorted(
+        request.querystring["page"][0] for request in httpretty.latest_requests()
+    )
+    assert pages == ["1", "2"]
 
 
 @httpretty.activate(verbose=True, allow_net_connect=False)
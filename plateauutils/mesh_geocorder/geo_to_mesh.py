@@ -1,6 +1,8 @@
 # coding: utf-8
 
 import math
+import numpy as np
+import shapely
 from shapely.geometry import Point, Polygon
 
 
@@ -90,6 +92,77 @@ def point_to_meshcode(point: Point, mesh: str = "2") -> str:
         return mesh_code
 
 
+def points_to_meshcodes(
+    longitudes: np.ndarray, latitudes: np.ndarray, mesh: str = "2"
+) -> np.ndarray:
+    """経度緯度の配列をメッシュコードの配列に変換して返す
+
+    point_to_meshcodeをまとめて計算する版で、同じ順序で同じ演算を行うため
+    結果はpoint_to_meshcodeを整数にしたものと一致する
+
+    Parameters
+    ----------
+    longitudes : numpy.ndarray
+        経度の配列
+    latitudes : numpy.ndarray
+        緯度の配列
+    mesh : str, optional
+        メッシュの種類, by default "2"
+
+    Returns
+    -------
+    numpy.ndarray
+        メッシュコードの配列(int64)
+    """
+    # メッシュのバリデーション
+    _validate_mesh(mesh)
+
+    longitude = np.asarray(longitudes, dtype=np.float64)
+    latitude = np.asarray(latitudes, dtype=np.float64)
+
+    # 1次メッシュ
+    longitude_1st = (longitude - 100).astype(np.int64)
+    latitude_1st = np.floor(latitude * 60 / 40).astype(np.int64)
+    mesh_code = latitude_1st * 100 + longitude_1st
+    if mesh == "1":
+        return mesh_code
+    # 2次メッシュ
+    longitude_minutes = (longitude - np.floor(longitude)) * 60
+    latitude_minutes = (latitude * 60) % 40
+    longitude_2nd = (longitude_minutes / 7.5).astype(np.int64)
+    latitude_2nd = (latitude_minutes / 5).astype(np.int64)
+    mesh_code = mesh_code * 100 + latitude_2nd * 10 + longitude_2nd
+    if mesh == "2":
+        return mesh_code
+
+    # 3次メッシュ
+    longitude_seconds = longitude_minutes % 7.5 * 60
+    latitude_seconds = latitude_minutes % 5 * 60
+    longitude_3rd = np.floor(longitude_seconds / 45).astype(np.int64)
+    latitude_3rd = np.floor(latitude_seconds / 30).astype(np.int64)
+    mesh_code = mesh_code * 100 + latitude_3rd * 10 + longitude_3rd
+    if mesh == "3":
+        return mesh_code
+
+    # 2分の1メッシュ
+    mesh_2nd1 = (
+        np.floor(latitude_seconds % 30 / 15) * 2
+        + np.floor(longitude_seconds % 45 / 22.5)
+        + 1
+    ).astype(np.int64)
+    mesh_code = mesh_code * 10 + mesh_2nd1
+    if mesh == "2/1":
+        return mesh_code
+
+    # 4分の1メッシュ
+    mesh_4th1 = (
+        np.floor(latitude_seconds % 30 % 15 / 7.5) * 2
+        + np.floor(longitude_seconds % 45 % 22.5 / 11.25)
+        + 1
+    ).astype(np.int64)
+    return mesh_code * 10 + mesh_4th1
+
+
 def meshcode_to_polygon(mesh_code: str) -> Polygon:
     """
     メッシュコードをポリゴンに変換して返す
@@ -201,6 +274,153 @@ def meshcode_to_polygon(mesh_code: str) -> Polygon:
         return _create_polygon(left_x, left_y, right_x, right_y)
 
 
+def meshcodes_to_bounds(mesh_codes) -> np.ndarray:
+    """
+    メッシュコードの配列を範囲の配列に変換して返す
+
+    meshcode_to_polygonをまとめて計算する版で、範囲はmeshcode_to_polygonと一致する
+    桁数の異なるメッシュコードが混在してもよい
+
+    Parameters
+    ----------
+    mesh_codes : numpy.ndarray or list
+        メッシュコード(整数もしくは文字列)の配列
+
+    Returns
+    -------
+    numpy.ndarray
+        メッシュごとの(最小経度, 最小緯度, 最大経度, 最大緯度)の(メッシュ数, 4)の配列
+    """
+    mesh_codes = np.asarray(mesh_codes)
+    if mesh_codes.dtype.kind in "USO":
+        # 文字列は桁数を文字数から求める
+        mesh_codes = mesh_codes.astype(str)
+        digits = np.char.str_len(mesh_codes)
+        mesh_codes = mesh_codes.astype(np.int64)
+    else:
+        mesh_codes = mesh_codes.astype(np.int64)
+        digits = np.searchsorted(10 ** np.arange(1, 11), mesh_codes, side="right") + 1
+    if (digits < 4).any():
+        raise MeshCodeException("Mesh code must be 4 or more digits")
+    if (digits > 10).any():
+        raise MeshCodeException("Mesh code must be 10 or less digits")
+    if np.isin(digits, [5, 7]).any():
+        raise MeshCodeException("Mesh code must be 4, 6, 8, 9 or 10 digits")
+    bounds = np.empty((len(mesh_codes), 4), dtype=np.float64)
+    for length in np.unique(digits).tolist():
+        mask = digits == length
+        bounds[mask] = np.column_stack(_meshcode_bounds(mesh_codes[mask], length))
+    return bounds
+
+
+def meshcodes_to_polygons(mesh_codes) -> np.ndarray:
+    """
+    メッシュコードの配列をポリゴンの配列に変換して返す
+
+    meshcodes_to_boundsの範囲からまとめてポリゴンを作成する
+    頂点の順序はmeshcode_to_polygonと同じ
+
+    Parameters
+    ----------
+    mesh_codes : numpy.ndarray or list
+        メッシュコード(整数もしくは文字列)の配列
+
+    Returns
+    -------
+    numpy.ndarray
+        shapely.geometry.Polygonの配列
+    """
+    left_x, left_y, right_x, right_y = meshcodes_to_bounds(mesh_codes).T
+    coords = np.stack(
+        [
+            np.column_stack([left_x, left_y]),
+            np.column_stack([right_x, left_y]),
+            np.column_stack([right_x, right_y]),
+            np.column_stack([left_x, right_y]),
+            np.column_stack([left_x, left_y]),
+        ],
+        axis=1,
+    )
+    return shapely.polygons(coords)
+
+
+def _meshcode_bounds(mesh_codes: np.ndarray, digits: int) -> tuple:
+    """
+    同じ桁数のメッシュコードの配列を範囲の配列に変換して返す
+
+    meshcode_to_polygonと同じ順序で同じ演算を行うため、範囲は一致する
+
+    Parameters
+    ----------
+    mesh_codes : numpy.ndarray
+        メッシュコードの配列(int64)
+    digits : int
+        メッシュコードの桁数
+
+    Returns
+    -------
+    tuple
+        最小経度、最小緯度、最大経度、最大緯度の配列
+    """
+    mesh_codes = np.asarray(mesh_codes, dtype=np.int64)
+
+    def digit(start: int, length: int) -> np.ndarray:
+        # 先頭からstart桁目以降のlength桁
+        return mesh_codes // 10 ** (digits - start - length) % 10**length
+
+    # 1次メッシュ
+    left_x = (digit(2, 2) + 100).astype(np.float64)
+    left_y = digit(0, 2) * 40 / 60
+    if digits == 4:
+        return left_x, left_y, left_x + 1, left_y + 1 * 40 / 60
+
+    # 2次メッシュ
+    left_x = left_x + digit(5, 1) * 7.5 / 60
+    left_y = left_y + digit(4, 1) * 5 / 60
+    if digits == 6:
+        return left_x, left_y, left_x + (1 * 7.5 / 60), left_y + (1 * 5 / 60)
+
+    # 3次メッシュ
+    left_x = left_x + digit(7, 1) * 45 / 60 / 60
+    left_y = left_y + digit(6, 1) * 30 / 60 / 60
+    if digits == 8:
+        return (
+            left_x,
+            left_y,
+            left_x + (1 * 45 / 60 / 60),
+            left_y + (1 * 30 / 60 / 60),
+        )
+
+    # 2分の1メッシュ、4分の1メッシュ
+    for position, lon_size, lat_size, message in [
+        (8, 22.5, 15, "2nd mesh must be 1 to 4"),
+        (9, 11.25, 7.5, "4th mesh must be 1 to 4"),
+    ]:
+        section = digit(position, 1)
+        if ((section < 1) | (section > 4)).any():
+            raise MeshCodeException(message)
+        section = section - 1
+        lon_section = section % 2
+        min_lon_section = lon_section * lon_size / 60
+        max_lon_section = (lon_section + 1) * lon_size / 60
+        lat_section = section // 2
+        min_lat_section = lat_section * lat_size / 60
+        max_lat_section = (lat_section + 1) * lat_size / 60
+        min_latitude = np.floor(min_lat_section / 60) + min_lat_section % 60 / 60
+        max_latitude = np.floor(max_lat_section / 60) + max_lat_section % 60 / 60
+        min_longitude = np.floor(min_lon_section / 60) + min_lon_section % 60 / 60
+        max_longitude = np.floor(max_lon_section / 60) + max_lon_section % 60 / 60
+        left_x = left_x + min_longitude
+        left_y = left_y + min_latitude
+        if digits == position + 1:
+            return (
+                left_x,
+                left_y,
+                left_x + (max_longitude - min_longitude),
+                left_y + (max_latitude - min_latitude),
+            )
+
+
 def _create_polygon(
     left_x: float, left_y: float, right_x: float, right_y: float
 ) -> Polygon:
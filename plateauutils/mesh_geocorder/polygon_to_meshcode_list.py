@@ -1,14 +1,23 @@
-from itertools import product
 from plateauutils.abc.polygon_to_list import PolygonToList
 from plateauutils.mesh_geocorder.geo_to_mesh import (
-    point_to_meshcode,
-    meshcode_to_polygon,
+    _meshcode_bounds,
+    _validate_mesh,
+    points_to_meshcodes,
 )
+import numpy as np
+import shapely
+
+# メッシュの種類ごとの(桁数, 親のメッシュの縦横の分割数)
+MESH_LEVELS = [("1", 4, 1), ("2", 6, 8), ("3", 8, 10), ("2/1", 9, 2), ("4/1", 10, 2)]
 
 
 class PolygonToMeshCodeList(PolygonToList):
     """Polygonからメッシュコードのリストを返すクラス
 
+    1次メッシュから順に、ポリゴンと交差するメッシュのみを分割していく
+    ポリゴンに完全に含まれるメッシュの子は判定せずに含めるため、
+    判定の回数はポリゴンの辺が通るメッシュの数に比例する
+
     Parameters
     ----------
     polygon : shapely.geometry.Polygon
@@ -19,50 +28,41 @@ class PolygonToMeshCodeList(PolygonToList):
 
     def __init__(self, polygon, mesh="2"):
         super().__init__(polygon)
+        _validate_mesh(mesh)
         self.mesh = mesh
+        # targetsと同じ順の、ポリゴンに完全に含まれるメッシュかの配列
+        self.interior = None
         self.split()
 
     def split(self):
         """対象となるポリゴンを分割してメッシュコードのリストを作成する"""
-        start_mesh = int(point_to_meshcode(self.start_pos, self.mesh))
-        end_mesh = int(point_to_meshcode(self.end_pos, self.mesh))
-        # メッシュを一旦3次メッシュの単位までにする
-        if self.mesh == "2/1":
-            start_mesh = int(start_mesh / 10)
-            end_mesh = int(end_mesh / 10)
-        elif self.mesh == "4/1":
-            start_mesh = int(start_mesh / 100)
-            end_mesh = int(end_mesh / 100)
-        self.targets = _meshcode_range(start_mesh, end_mesh)
-        # メッシュを元の粒度に戻す
-        if self.mesh == "2/1":
-            new_targets = []
-            for i in self.targets:
-                new_targets.append(i + "1")
-                new_targets.append(i + "2")
-                new_targets.append(i + "3")
-                new_targets.append(i + "4")
-            self.targets = new_targets
-        elif self.mesh == "4/1":
-            new_targets = []
-            for i in self.targets:
-                new_targets.append(i + "11")
-                new_targets.append(i + "12")
-                new_targets.append(i + "13")
-                new_targets.append(i + "14")
-                new_targets.append(i + "21")
-                new_targets.append(i + "22")
-                new_targets.append(i + "23")
-                new_targets.append(i + "24")
-                new_targets.append(i + "31")
-                new_targets.append(i + "32")
-                new_targets.append(i + "33")
-                new_targets.append(i + "34")
-                new_targets.append(i + "41")
-                new_targets.append(i + "42")
-                new_targets.append(i + "43")
-                new_targets.append(i + "44")
-            self.targets = new_targets
+        # 範囲の南西端と北東端の点を含む1次メッシュの間の全ての1次メッシュ
+        start_mesh, end_mesh = points_to_meshcodes(
+            [self.bounds[0], self.bounds[2]], [self.bounds[1], self.bounds[3]], "1"
+        ).tolist()
+        rows = np.arange(start_mesh // 100, end_mesh // 100 + 1)
+        cols = np.arange(start_mesh % 100, end_mesh % 100 + 1)
+        codes = (rows[:, None] * 100 + cols).ravel()
+        interior = []
+        shapely.prepare(self.polygon)
+        for mesh, digits, divisions in MESH_LEVELS:
+            if divisions > 1:
+                codes = _children(codes, divisions)
+                interior = [_children(i, divisions) for i in interior]
+            # 交差しないメッシュは除き、完全に含まれるメッシュは以降判定しない
+            boxes = shapely.box(*_meshcode_bounds(codes, digits))
+            hit = shapely.intersects(self.polygon, boxes)
+            codes = codes[hit]
+            inside = shapely.covers(self.polygon, boxes[hit])
+            interior.append(codes[inside])
+            codes = codes[~inside]
+            if mesh == self.mesh:
+                break
+        interior = np.concatenate(interior)
+        order = np.argsort(np.concatenate([codes, interior]))
+        # 桁数が同じため、数値の順と文字列の順は一致する
+        self.targets = [str(i) for i in np.concatenate([codes, interior])[order]]
+        self.interior = (np.arange(len(order)) >= len(codes))[order]
 
     def output(self) -> list:
         """メッシュコードのリストを出力する
@@ -72,43 +72,47 @@ class PolygonToMeshCodeList(PolygonToList):
         list
             メッシュコードのリスト
         """
-        output_list = []
-        for i in self.targets:
-            polygon = meshcode_to_polygon(i)
-            # ポリゴンが交差しているかどうかを判定
-            if self.polygon.intersects(polygon):
-                output_list.append(i)
-        return sorted(output_list)
+        return list(self.targets)
+
+    def classify(self) -> dict:
+        """メッシュをポリゴンに完全に含まれるものと、辺が通るものに分けて出力する
+
+        分割の際の判定結果を利用するため、追加の判定は行わない
+        interiorのメッシュはポリゴンで切り抜く必要がない
+
+        Returns
+        -------
+        dict
+            interior(ポリゴンに完全に含まれるメッシュ)、boundary(辺が通るメッシュ)を
+            キー、メッシュコードのリストを値とする辞書
+        """
+        interior = []
+        boundary = []
+        for code, inside in zip(self.targets, self.interior.tolist()):
+            if inside:
+                interior.append(code)
+            else:
+                boundary.append(code)
+        return {"interior": interior, "boundary": boundary}
 
 
-def _meshcode_range(start_mesh: int, end_mesh: int) -> list:
-    """メッシュコードの範囲を返す
+def _children(codes: np.ndarray, divisions: int) -> np.ndarray:
+    """子のメッシュコードを返す
 
     Parameters
     ----------
-    start_mesh : int
-        開始メッシュコード
-    end_mesh : int
-        終了メッシュコード
+    codes : numpy.ndarray
+        メッシュコードの配列
+    divisions : int
+        縦横の分割数(2分の1、4分の1メッシュは2)
 
     Returns
     -------
-    list
-        メッシュコードのリスト
+    numpy.ndarray
+        子のメッシュコードの配列
     """
-    # start_pos = str(start_mesh)
-    # end_pos = str(end_mesh)
-    # print(start_pos, end_pos)
-    # matrix = []
-    # # 開始メッシュコードと終了メッシュコードの各桁の範囲をリストに格納
-    # for i in range(len(start_pos)):
-    #     if int(start_pos[i]) < int(end_pos[i]):
-    #         matrix.append(range(int(start_pos[i]), int(end_pos[i]) + 1))
-    #     else:
-    #         matrix.append(range(0, 10))
-    # # 全ての組み合わせを生成
-    # combinations = product(*matrix)
-    # # 各組み合わせを文字列として結合
-    # return ["".join(map(str, combo)) for combo in combinations]
-    combinations = range(start_mesh, end_mesh + 1)
-    return [str(combo) for combo in combinations]
+    rows, cols = np.divmod(np.arange(divisions * divisions), divisions)
+    if divisions == 2:
+        # 2分の1、4分の1メッシュは南西、南東、北西、北東の順に1から4
+        return (codes[:, None] * 10 + rows * 2 + cols + 1).ravel()
+    return (codes[:, None] * 100 + rows * 10 + cols).ravel()
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from shapely.geometry import Point
 
@@ -32,6 +33,34 @@ def test_point_to_mesh():
     assert mesh_code == "5339454711"
 
 
+def test_points_to_meshcodes():
+    """経度緯度の配列をメッシュコードの配列に変換するテスト"""
+    from plateauutils.mesh_geocorder.geo_to_mesh import (
+        MeshException,
+        point_to_meshcode,
+        points_to_meshcodes,
+    )
+
+    rng = np.random.default_rng(0)
+    # メッシュの境界上の点を含める
+    longitudes = np.concatenate(
+        [rng.uniform(122.0, 154.0, 2000), 139.0 + np.arange(400) / 80 / 8]
+    )
+    latitudes = np.concatenate(
+        [rng.uniform(20.0, 46.0, 2000), 35.0 + np.arange(400) / 120 / 8]
+    )
+    for mesh in ["1", "2", "3", "2/1", "4/1"]:
+        mesh_codes = points_to_meshcodes(longitudes, latitudes, mesh)
+        assert mesh_codes.dtype == np.int64
+        assert mesh_codes.tolist() == [
+            int(point_to_meshcode(Point(longitude, latitude), mesh))
+            for longitude, latitude in zip(longitudes, latitudes)
+        ]
+    assert points_to_meshcodes([139.71475], [35.70078], "4/1").tolist() == [5339454711]
+    with pytest.raises(MeshException):
+        points_to_meshcodes([139.71475], [35.70078], "5")
+
+
 def test_invalid_mesh_code_to_polygon():
     """メッシュコードが不正な場合のテスト"""
     from plateauutils.mesh_geocorder.geo_to_mesh import (
@@ -154,3 +183,50 @@ def test_meshcode_to_polygon():
         polygon.wkt
         == "POLYGON ((139.71562500000002 35.702083333333334, 139.71875000000003 35.702083333333334, 139.71875000000003 35.704166666666666, 139.71562500000002 35.704166666666666, 139.71562500000002 35.702083333333334))"
     )
+
+
+def test_meshcodes_to_bounds():
+    """メッシュコードの配列を範囲の配列に変換するテスト"""
+    from plateauutils.mesh_geocorder.geo_to_mesh import (
+        MeshCodeException,
+        meshcode_to_polygon,
+        meshcodes_to_bounds,
+        meshcodes_to_polygons,
+        points_to_meshcodes,
+    )
+
+    rng = np.random.default_rng(0)
+    longitudes = rng.uniform(122.0, 154.0, 500)
+    latitudes = rng.uniform(20.0, 46.0, 500)
+    # 桁数の異なるメッシュコードを混在させる
+    mesh_codes = np.concatenate(
+        [
+            points_to_meshcodes(longitudes, latitudes, mesh)
+            for mesh in ["1", "2", "3", "2/1", "4/1"]
+        ]
+    )
+    expected = np.array(
+        [meshcode_to_polygon(str(code)).bounds for code in mesh_codes.tolist()]
+    )
+    bounds = meshcodes_to_bounds(mesh_codes)
+    assert bounds.shape == (2500, 4)
+    assert (bounds == expected).all()
+    assert (meshcodes_to_bounds(mesh_codes.astype(str)) == expected).all()
+    polygons = meshcodes_to_polygons(["5339", "5339454711"])
+    assert [polygon.wkt for polygon in polygons] == [
+        meshcode_to_polygon("5339").wkt,
+        meshcode_to_polygon("5339454711").wkt,
+    ]
+
+    with pytest.raises(MeshCodeException) as e:
+        meshcodes_to_bounds([5339, 533])
+    assert str(e.value) == "Mesh code must be 4 or more digits"
+    with pytest.raises(MeshCodeException) as e:
+        meshcodes_to_bounds(["53394547141"])
+    assert str(e.value) == "Mesh code must be 10 or less digits"
+    with pytest.raises(MeshCodeException) as e:
+        meshcodes_to_bounds([55394])
+    assert str(e.value) == "Mesh code must be 4, 6, 8, 9 or 10 digits"
+    with pytest.raises(MeshCodeException) as e:
+        meshcodes_to_bounds(["533945475"])
+    assert str(e.value) == "2nd mesh must be 1 to 4"
@@ -1,5 +1,11 @@
 from plateauutils.mesh_geocorder.polygon_to_meshcode_list import PolygonToMeshCodeList
+from plateauutils.mesh_geocorder.geo_to_mesh import (
+    meshcode_to_polygon,
+    points_to_meshcodes,
+)
+import numpy as np
 from shapely import from_wkt
+from shapely.geometry import Point
 
 
 def test_polygon_to_list():
@@ -47,3 +53,41 @@ def test_polygon_to_list():
     )
     polygon_to_list = PolygonToMeshCodeList(polygon, "3")
     assert "49307460" in polygon_to_list.output()
+
+
+def test_polygon_to_list_classify():
+    polygon = from_wkt(
+        "POLYGON ((136.457062 35.610418, 136.568298 35.60651, 136.561432 35.472414, 136.459122 35.470736, 136.456375 35.431582, 136.662369 35.429904, 136.663742 35.635535, 136.459122 35.640557, 136.457062 35.610418))"
+    )
+    polygon_to_list = PolygonToMeshCodeList(polygon, "3")
+    classified = polygon_to_list.classify()
+    assert sorted(classified["interior"] + classified["boundary"]) == (
+        polygon_to_list.output()
+    )
+    for code in classified["interior"]:
+        assert polygon.covers(meshcode_to_polygon(code))
+    for code in classified["boundary"]:
+        assert not polygon.covers(meshcode_to_polygon(code))
+    assert len(classified["interior"]) > len(classified["boundary"])
+
+
+def test_polygon_to_list_across_rows():
+    # 1次メッシュ、2次メッシュの行をまたぐポリゴン
+    polygon = Point(139.0, 35.3333).buffer(0.03)
+    min_x, min_y, max_x, max_y = polygon.bounds
+    # 範囲内の3次メッシュを半分の間隔の点から求め、交差するものを選ぶ
+    longitudes, latitudes = np.meshgrid(
+        np.arange(min_x, max_x + 1 / 160, 1 / 160),
+        np.arange(min_y, max_y + 1 / 240, 1 / 240),
+    )
+    candidates = np.unique(points_to_meshcodes(longitudes, latitudes, "3"))
+    expected = [
+        str(code)
+        for code in candidates
+        if polygon.intersects(meshcode_to_polygon(str(code)))
+    ]
+    result = PolygonToMeshCodeList(polygon, "3").output()
+    assert result == expected
+    # 2次メッシュの桁は0から7
+    assert all(int(code[4]) < 8 and int(code[5]) < 8 for code in result)
+    assert {code[:4] for code in result} == {"5238", "5239", "5338", "5339"}
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from plateauutils.network.downloader import download
+from plateauutils.network.file_lock import FileLock
+from plateauutils.network.range_reader import CONTENT_RANGE_PATTERN
+from plateauutils.network.session import get_session
+import requests
+import shutil
+from urllib.parse import urlsplit
+
+# キャッシュの合計サイズの上限(デフォルト)
+DEFAULT_MAX_BYTES = 20 * 1024**3
+
+# キャッシュのディレクトリを指定する環境変数
+CACHE_DIR_ENV = "PLATEAUUTILS_CACHE_DIR"
+
+# キャッシュの合計サイズの上限を指定する環境変数
+CACHE_SIZE_ENV = "PLATEAUUTILS_CACHE_SIZE"
+
+# エントリごとのメタデータのファイル名
+META_FILENAME = "meta.json"
+
+# 共有のダウンロードキャッシュ
+_default_download_cache = None
+
+
+class DownloadCache(object):
+    """URLをキーとして複数のプロセスで共有するダウンロードキャッシュ
+
+    取得済みのファイルはETag、Last-Modifiedを利用した条件付きリクエストで
+    更新の有無を確認し(確認できない場合は取得済みのファイルを利用する)、
+    合計サイズが上限を超えた場合は利用されていない順に削除する
+
+    Parameters
+    ----------
+    cache_dir : str
+        キャッシュを保存するディレクトリ
+    max_bytes : int, optional
+        キャッシュの合計サイズの上限, by default 20 GiB
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        session: requests.Session = None,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.session = session
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_dir(self, url: str) -> str:
+        """URLに対応するエントリのディレクトリを返す
+
+        Parameters
+        ----------
+        url : str
+            ファイルのURL
+
+        Returns
+        -------
+        str
+            エントリのディレクトリ
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def fetch(self, url: str, validate: bool = True, **kwargs) -> str:
+        """URLのファイルをキャッシュから取得する、無ければダウンロードする
+
+        返り値のパスはロックされていないため、他のプロセスのevictで削除され得る
+        ファイルを読み込む場合はopen_cachedを利用する
+
+        Parameters
+        ----------
+        url : str
+            ファイルのURL
+        validate : bool, optional
+            Falseの場合、キャッシュがあれば更新を確認せずに利用する, by default True
+        **kwargs
+            downloadに渡す引数
+
+        Returns
+        -------
+        str
+            キャッシュされたファイルのパス
+        """
+        entry_dir = self.entry_dir(url)
+        filename = os.path.basename(urlsplit(url).path) or "data"
+        saved_path = os.path.join(entry_dir, filename)
+        meta_path = os.path.join(entry_dir, META_FILENAME)
+        with FileLock(entry_dir + ".lock"):
+            meta = _load_meta(meta_path)
+            if meta is not None and os.path.exists(saved_path):
+                if not validate:
+                    os.utime(meta_path)
+                    return saved_path
+                try:
+                    fresh, validators = self._validate(url, meta)
+                except (ConnectionError, requests.RequestException):
+                    # 更新を確認できない場合(オフライン等)はキャッシュを利用する
+                    fresh = True
+                if fresh:
+                    os.utime(meta_path)
+                    return saved_path
+            else:
+                _, validators = self._validate(url, None)
+            # ダウンロードしてメタデータを更新する
+            os.makedirs(entry_dir, exist_ok=True)
+            kwargs.setdefault("session", self._get_session())
+            download(url, saved_path, **kwargs)
+            meta = dict(validators)
+            meta["url"] = url
+            meta["size"] = os.path.getsize(saved_path)
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+        self.evict(keep=entry_dir)
+        return saved_path
+
+    @contextmanager
+    def open_cached(self, url: str, validate: bool = True, **kwargs):
+        """URLのファイルをキャッシュから取得し、利用中は削除されないようにする
+
+        withブロックの間はエントリの共有ロックを保持するため、
+        evictで削除されず、他のプロセスのfetchによる更新も待機する
+
+        Parameters
+        ----------
+        url : str
+            ファイルのURL
+        validate : bool, optional
+            Falseの場合、キャッシュがあれば更新を確認せずに利用する, by default True
+        **kwargs
+            downloadに渡す引数
+
+        Yields
+        ------
+        str
+            キャッシュされたファイルのパス
+        """
+        while True:
+            saved_path = self.fetch(url, validate, **kwargs)
+            lock = FileLock(self.entry_dir(url) + ".lock", shared=True)
+            lock.acquire()
+            # fetchとロックの取得の間に削除された場合は取得し直す
+            if os.path.exists(saved_path):
+                break
+            lock.release()
+        try:
+            yield saved_path
+        finally:
+            lock.release()
+
+    def _get_session(self) -> requests.Session:
+        # 指定されていなければ共有のセッションを利用する
+        return self.session if self.session is not None else get_session()
+
+    def _validate(self, url: str, meta: dict) -> tuple:
+        # 条件付きリクエストで更新の有無と最新のETag、Last-Modifiedを取得する
+        headers = {"Range": "bytes=0-0"}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        response = self._get_session().get(url, headers=headers, stream=True)
+        response.close()
+        if response.status_code not in [200, 206, 304, 416]:
+            raise ConnectionError(f"Cannot download {url}")
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if meta is None:
+            return False, validators
+        if response.status_code == 304:
+            return True, validators
+        if meta.get("etag") or meta.get("last_modified"):
+            return False, validators
+        # ETag、Last-Modifiedが無い場合はサイズで判定する
+        size = response.headers.get("Content-Length")
+        match = CONTENT_RANGE_PATTERN.fullmatch(
+            response.headers.get("Content-Range", "")
+        )
+        if match is not None:
+            size = match.group(3)
+        return size is not None and int(size) == meta.get("size"), validators
+
+    def evict(self, keep: str = None):
+        """合計サイズが上限を超えている場合、利用されていない順に削除する
+
+        Parameters
+        ----------
+        keep : str, optional
+            削除しないエントリのディレクトリ, by default None
+        """
+        with FileLock(os.path.join(self.cache_dir, ".lock")):
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                entry_dir = os.path.join(self.cache_dir, name)
+                meta_path = os.path.join(entry_dir, META_FILENAME)
+                if not os.path.exists(meta_path):
+                    continue
+                size = _directory_size(entry_dir)
+                entries.append((os.stat(meta_path).st_mtime, size, entry_dir))
+                total += size
+            for _, size, entry_dir in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if entry_dir == keep:
+                    continue
+                # 他のプロセスが利用中(open_cachedで共有ロック中)のエントリは削除しない
+                # ロックファイルもエントリと合わせて解放時に削除する
+                lock = FileLock(entry_dir + ".lock", remove=True)
+                if not lock.acquire(blocking=False):
+                    continue
+                try:
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                finally:
+                    lock.release()
+                total -= size
+
+    def clear(self):
+        """キャッシュを全て削除する"""
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def default_download_cache() -> DownloadCache:
+    """共有のダウンロードキャッシュを返す
+
+    ディレクトリは環境変数PLATEAUUTILS_CACHE_DIR(デフォルトは~/.cache/plateauutils/downloads)、
+    合計サイズの上限は環境変数PLATEAUUTILS_CACHE_SIZE(バイト)で指定する
+
+    Returns
+    -------
+    DownloadCache
+        共有のダウンロードキャッシュ
+    """
+    global _default_download_cache
+    if _default_download_cache is None:
+        cache_dir = os.environ.get(
+            CACHE_DIR_ENV,
+            os.path.join(
+                os.path.expanduser("~"), ".cache", "plateauutils", "downloads"
+            ),
+        )
+        max_bytes = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_BYTES))
+        _default_download_cache = DownloadCache(cache_dir, max_bytes)
+    return _default_download_cache
+
+
+def _load_meta(meta_path: str) -> dict:
+    # メタデータを読み込む、存在しないか壊れている場合はNone
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _directory_size(path: str) -> int:
+    # ディレクトリ以下のファイルの合計サイズ
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
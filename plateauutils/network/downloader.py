@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+from plateauutils.network.file_lock import FileLock
+from plateauutils.network.range_reader import CONTENT_RANGE_PATTERN
+from plateauutils.network.session import get_session
+import requests
+import threading
+import time
+from tqdm import tqdm
+
+# 読み込みと書き込みのバッファのサイズ
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# 並列にダウンロードする1区間のサイズ
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+# 並列にダウンロードするスレッド数
+DEFAULT_WORKERS = 4
+
+# ダウンロード中のファイルの拡張子
+PARTIAL_SUFFIX = ".part"
+
+# ダウンロードの進捗を保存するファイルの拡張子
+STATE_SUFFIX = ".part.json"
+
+# ダウンロード中のファイルを排他制御するロックファイルの拡張子
+LOCK_SUFFIX = ".part.lock"
+
+# ダウンロード中に進捗を保存する間隔(秒)
+STATE_SAVE_INTERVAL = 1.0
+
+
+class DownloadChecksumException(Exception):
+    pass
+
+
+def download(
+    url: str,
+    saved_path: str,
+    workers: int = DEFAULT_WORKERS,
+    segment_size: int = DEFAULT_SEGMENT_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    checksum: str = None,
+    session: requests.Session = None,
+    progress: bool = True,
+) -> str:
+    """ファイルをダウンロードする
+
+    Rangeリクエストに対応したサーバーの場合は区間ごとに並列にダウンロードし、
+    中断された場合は次回の呼び出しで続きからダウンロードする
+    一時ファイルに書き込み、サイズ(およびチェックサム)を確認してから保存先に移動する
+    同じ保存先へのダウンロードはロックファイルで排他制御し、複数のプロセスが
+    同じ一時ファイルに書き込まないようにする
+
+    Parameters
+    ----------
+    url : str
+        ファイルのURL
+    saved_path : str
+        保存先のパス
+    workers : int, optional
+        並列にダウンロードするスレッド数, by default 4
+    segment_size : int, optional
+        並列にダウンロードする1区間のサイズ, by default 64 MiB
+    buffer_size : int, optional
+        読み込みと書き込みのバッファのサイズ, by default 1 MiB
+    checksum : str, optional
+        "アルゴリズム:16進数の値"の形式のチェックサム(例: "sha256:..."), by default None
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+    progress : bool, optional
+        Trueの場合、進捗を表示する, by default True
+
+    Returns
+    -------
+    str
+        保存先のパス
+    """
+    if session is None:
+        session = get_session()
+    partial_path = saved_path + PARTIAL_SUFFIX
+    state_path = saved_path + STATE_SUFFIX
+    with FileLock(saved_path + LOCK_SUFFIX, remove=True):
+        # 先頭の1バイトを取得して、Rangeリクエストへの対応とサイズを確認する
+        response = session.get(url, headers={"Range": "bytes=0-0"}, stream=True)
+        if response.status_code == 416:
+            # 空のファイルは範囲を指定せずにダウンロードする
+            response.close()
+            response = session.get(url, stream=True)
+        if response.status_code == 206:
+            response.close()
+            match = CONTENT_RANGE_PATTERN.fullmatch(
+                response.headers.get("Content-Range", "")
+            )
+            if match is None:
+                raise ConnectionError(f"Invalid Content-Range: {url}")
+            total_size = int(match.group(3))
+            validator = response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+            _download_segments(
+                session,
+                url,
+                partial_path,
+                state_path,
+                total_size,
+                validator,
+                workers,
+                segment_size,
+                buffer_size,
+                progress,
+            )
+        elif response.status_code == 200:
+            # Rangeリクエストに対応していない場合は先頭からダウンロードする
+            total_size = int(response.headers.get("content-length", 0))
+            _download_stream(response, partial_path, total_size, buffer_size, progress)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+        else:
+            response.close()
+            raise ConnectionError(f"Cannot download {url}")
+        # サイズを確認、問題があればエラー
+        if total_size != 0 and os.path.getsize(partial_path) != total_size:
+            raise ConnectionError("ERROR, something went wrong")
+        # チェックサムを確認、一致しなければ一時ファイルを削除してエラー
+        if checksum is not None and not verify_checksum(partial_path, checksum):
+            os.remove(partial_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            raise DownloadChecksumException(f"checksum mismatch: {url}")
+        # 完了したファイルのみを保存先に移動する
+        os.replace(partial_path, saved_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return saved_path
+
+
+def verify_checksum(path: str, checksum: str) -> bool:
+    """ファイルのチェックサムを確認する
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパス
+    checksum : str
+        "アルゴリズム:16進数の値"の形式のチェックサム
+
+    Returns
+    -------
+    bool
+        一致すればTrue
+    """
+    algorithm, _, expected = checksum.partition(":")
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DEFAULT_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest() == expected.lower()
+
+
+def _download_stream(
+    response: requests.Response,
+    partial_path: str,
+    total_size: int,
+    buffer_size: int,
+    progress: bool,
+):
+    # レスポンスをそのまま一時ファイルに書き込む
+    t = tqdm(total=total_size, unit="iB", unit_scale=True, disable=not progress)
+    try:
+        with open(partial_path, "wb") as f:
+            for data in response.iter_content(buffer_size):
+                t.update(len(data))
+                f.write(data)
+    finally:
+        t.close()
+        response.close()
+
+
+def _load_state(
+    state_path: str, total_size: int, validator: str, segment_size: int
+) -> dict:
+    # 前回の進捗を読み込む、ファイルが変わっている場合は破棄する
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        state.get("size") != total_size
+        or state.get("validator") != validator
+        or state.get("segment_size") != segment_size
+    ):
+        return None
+    return state
+
+
+def _download_segments(
+    session: requests.Session,
+    url: str,
+    partial_path: str,
+    state_path: str,
+    total_size: int,
+    validator: str,
+    workers: int,
+    segment_size: int,
+    buffer_size: int,
+    progress: bool,
+):
+    state = None
+    if os.path.exists(partial_path):
+        state = _load_state(state_path, total_size, validator, segment_size)
+    if state is None:
+        # 区間ごとの開始位置とダウンロード済みのバイト数
+        state = {
+            "size": total_size,
+            "validator": validator,
+            "segment_size": segment_size,
+            "segments": [[start, 0] for start in range(0, total_size, segment_size)],
+        }
+        with open(partial_path, "wb") as f:
+            f.truncate(total_size)
+    lock = threading.Lock()
+    last_saved = [time.monotonic()]
+
+    def save_state():
+        # 進捗を一時ファイルに書き込んでから置き換える
+        with open(state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_path + ".tmp", state_path)
+        last_saved[0] = time.monotonic()
+
+    save_state()
+    done = sum(segment[1] for segment in state["segments"])
+    t = tqdm(
+        total=total_size,
+        initial=done,
+        unit="iB",
+        unit_scale=True,
+        disable=not progress,
+    )
+
+    def download_segment(segment: list):
+        start, downloaded = segment
+        end = min(start + segment_size, total_size) - 1
+        if start + downloaded > end:
+            return
+        response = session.get(
+            url,
+            headers={"Range": f"bytes={start + downloaded}-{end}"},
+            stream=True,
+        )
+        try:
+            if response.status_code != 206:
+                raise ConnectionError(f"Cannot download {url}")
+            with open(partial_path, "r+b") as f:
+                f.seek(start + downloaded)
+                for data in response.iter_content(buffer_size):
+                    f.write(data)
+                    f.flush()
+                    with lock:
+                        segment[1] += len(data)
+                        t.update(len(data))
+                        # 書き込みごとではなく、一定の間隔で進捗を保存する
+                        if time.monotonic() - last_saved[0] >= STATE_SAVE_INTERVAL:
+                            save_state()
+        finally:
+            response.close()
+        if start + segment[1] != end + 1:
+            raise ConnectionError("ERROR, something went wrong")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for _ in executor.map(download_segment, state["segments"]):
+                pass
+    finally:
+        t.close()
+        # 完了時、中断時には最新の進捗を保存する
+        save_state()
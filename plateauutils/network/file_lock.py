@@ -0,0 +1,99 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock(object):
+    """プロセス間で排他制御するためのファイルロック
+
+    ロックファイルは他のプロセスに削除され得るため、取得時にはロックした
+    ファイルがパスの指すファイルと同じかを確認し、異なれば取得し直す
+
+    Parameters
+    ----------
+    path : str
+        ロックファイルのパス
+    shared : bool, optional
+        Trueの場合は共有ロック(読み込み中を示し、排他ロックのみを妨げる)、
+        Windowsでは排他ロックとなる, by default False
+    remove : bool, optional
+        Trueの場合、解放時にロックファイルを削除する, by default False
+    """
+
+    def __init__(self, path: str, shared: bool = False, remove: bool = False):
+        self.path = path
+        self.shared = shared
+        self.remove = remove
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """ロックを取得する
+
+        Parameters
+        ----------
+        blocking : bool, optional
+            Falseの場合、取得できなければ待たずにFalseを返す, by default True
+
+        Returns
+        -------
+        bool
+            取得できればTrue
+        """
+        while True:
+            f = open(self.path, "a+b")
+            try:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                    if not blocking:
+                        flags |= fcntl.LOCK_NB
+                    fcntl.flock(f.fileno(), flags)
+                else:
+                    mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), mode, 1)
+            except OSError:
+                f.close()
+                return False
+            if _same_file(f, self.path):
+                break
+            # 待っている間に他のプロセスが削除したファイルはロックとして使えない
+            f.close()
+        self._file = f
+        return True
+
+    def release(self):
+        """ロックを解放する"""
+        if self._file is None:
+            return
+        if self.remove:
+            # ロックを保持したまま削除し、待っているプロセスには作り直させる
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+def _same_file(f, path: str) -> bool:
+    # 開いているファイルがパスの指すファイルと同じか
+    try:
+        return os.path.samestat(os.fstat(f.fileno()), os.stat(path))
+    except OSError:
+        return False
@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+import io
+from plateauutils.network.session import get_session
+import re
+import requests
+import zipfile
+
+# 一度のRangeリクエストで読み込む最小のバイト数
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Content-Rangeヘッダーの形式
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def is_remote(path: str) -> bool:
+    """パスがHTTP(S)のURLか判定する
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパスもしくはURL
+
+    Returns
+    -------
+    bool
+        URLであればTrue
+    """
+    return path.startswith(("http://", "https://"))
+
+
+class HttpRangeReader(io.RawIOBase):
+    """HTTPのRangeリクエストで読み込むファイルオブジェクト
+
+    seekとreadの位置に応じて必要な範囲だけを取得するため、
+    zipfile.ZipFileに渡すとセントラルディレクトリと対象のファイルのみを取得する
+
+    Parameters
+    ----------
+    url : str
+        ファイルのURL
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+    """
+
+    def __init__(self, url: str, session: requests.Session = None):
+        super().__init__()
+        self.url = url
+        self.name = url
+        self._session = session if session is not None else get_session()
+        self._pos = 0
+        # 取得したリクエスト数とバイト数
+        self.requests = 0
+        self.bytes_read = 0
+        # 先頭の1バイトを取得して、Rangeリクエストへの対応とサイズを確認する
+        _, self.size = self._fetch(0, 0)
+
+    def _fetch(self, start: int, end: int) -> tuple:
+        # start以上end以下の範囲を取得する
+        response = self._session.get(
+            self.url, headers={"Range": f"bytes={start}-{end}"}
+        )
+        self.requests += 1
+        if response.status_code != 206:
+            raise ConnectionError(f"Range request is not supported: {self.url}")
+        match = CONTENT_RANGE_PATTERN.fullmatch(
+            response.headers.get("Content-Range", "")
+        )
+        if match is None or int(match.group(1)) != start:
+            raise ConnectionError(f"Invalid Content-Range: {self.url}")
+        data = response.content
+        self.bytes_read += len(data)
+        return data, int(match.group(3))
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"negative seek position: {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b) -> int:
+        if self._pos >= self.size or len(b) == 0:
+            return 0
+        end = min(self._pos + len(b), self.size) - 1
+        data, _ = self._fetch(self._pos, end)
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        return n
+
+
+def open_remote(
+    url: str, buffer_size: int = DEFAULT_BUFFER_SIZE, session: requests.Session = None
+) -> io.BufferedReader:
+    """URLのファイルをRangeリクエストで読み込むファイルオブジェクトを返す
+
+    小さな読み込みはbuffer_size単位でまとめて取得する
+
+    Parameters
+    ----------
+    url : str
+        ファイルのURL
+    buffer_size : int, optional
+        一度に取得する最小のバイト数, by default 1 MiB
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+
+    Returns
+    -------
+    io.BufferedReader
+        読み込み用のファイルオブジェクト
+    """
+    return io.BufferedReader(HttpRangeReader(url, session), buffer_size)
+
+
+@contextmanager
+def open_zip_file(path: str):
+    """ローカルのパスもしくはURLのzipファイルを開く
+
+    URLの場合はファイル全体をダウンロードせず、必要な範囲のみをRangeリクエストで取得する
+
+    Parameters
+    ----------
+    path : str
+        zipファイルのパスもしくはURL
+
+    Yields
+    ------
+    zipfile.ZipFile
+        開いたzipファイル
+    """
+    if is_remote(path):
+        with open_remote(path) as f, zipfile.ZipFile(f) as zip_file:
+            yield zip_file
+    else:
+        with zipfile.ZipFile(path) as zip_file:
+            yield zip_file
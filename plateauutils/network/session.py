@@ -0,0 +1,279 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import os
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+from urllib3.util.retry import Retry
+
+# ホストごとに保持するコネクションの数
+DEFAULT_POOL_SIZE = 32
+
+# 接続エラー時の再試行回数
+DEFAULT_RETRIES = 3
+
+# 非同期APIで同時に実行するリクエストの数
+DEFAULT_CONCURRENCY = 8
+
+# 共有のセッションの設定
+_session_config = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "retries": DEFAULT_RETRIES,
+    "headers": {},
+}
+
+# 共有のセッションと作成したプロセスのID
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    headers: dict = None,
+) -> requests.Session:
+    """コネクションプールを設定したセッションを作成する
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        ホストごとに保持するコネクションの数, by default 32
+    retries : int, optional
+        接続エラー時の再試行回数, by default 3
+    headers : dict, optional
+        全てのリクエストに付与するヘッダー, by default None
+
+    Returns
+    -------
+    requests.Session
+        作成したセッション
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def configure_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    headers: dict = None,
+):
+    """共有のセッションの設定を変更する
+
+    次にget_sessionを呼び出した時点で新しい設定のセッションが作成される
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        ホストごとに保持するコネクションの数, by default 32
+    retries : int, optional
+        接続エラー時の再試行回数, by default 3
+    headers : dict, optional
+        全てのリクエストに付与するヘッダー, by default None
+    """
+    global _session
+    with _session_lock:
+        _session_config["pool_size"] = pool_size
+        _session_config["retries"] = retries
+        _session_config["headers"] = dict(headers or {})
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session() -> requests.Session:
+    """プロセス内で共有するセッションを返す
+
+    コネクションとTLSのセッションを再利用するため、同じセッションを返す
+    フォークした子プロセスでは新しいセッションを作成する
+
+    Returns
+    -------
+    requests.Session
+        共有のセッション
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = create_session(**_session_config)
+            _session_pid = os.getpid()
+        return _session
+
+
+def run_sync(coroutine):
+    """コルーチンを実行して結果を返す
+
+    イベントループの中から呼び出された場合は別のスレッドで実行する
+
+    Parameters
+    ----------
+    coroutine : coroutine
+        実行するコルーチン
+
+    Returns
+    -------
+    Any
+        コルーチンの返り値
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+async def run_limited(functions: list, limit: int = DEFAULT_CONCURRENCY) -> list:
+    """関数をスレッドで同時にlimit個まで実行し、結果を順番に返す
+
+    イベントループの既定のエグゼキューターはスレッド数に上限があるため、
+    limit個のスレッドを持つエグゼキューターを呼び出しごとに用意する
+
+    Parameters
+    ----------
+    functions : list
+        引数なしで呼び出す関数のリスト
+    limit : int, optional
+        同時に実行する数, by default 8
+
+    Returns
+    -------
+    list
+        関数の返り値のリスト(functionsと同じ順序)
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, limit)) as executor:
+        return await asyncio.gather(
+            *[loop.run_in_executor(executor, function) for function in functions]
+        )
+
+
+async def get_many_async(
+    urls: list,
+    limit: int = DEFAULT_CONCURRENCY,
+    session: requests.Session = None,
+    **kwargs,
+) -> list:
+    """複数のURLを同時にlimit個までGETする
+
+    Parameters
+    ----------
+    urls : list
+        URLのリスト
+    limit : int, optional
+        同時に実行するリクエストの数, by default 8
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+    **kwargs
+        requests.Session.getに渡す引数
+
+    Returns
+    -------
+    list
+        requests.Responseのリスト(urlsと同じ順序)
+    """
+    if session is None:
+        session = get_session()
+    return await run_limited(
+        [partial(session.get, url, **kwargs) for url in urls], limit
+    )
+
+
+def get_many(
+    urls: list,
+    limit: int = DEFAULT_CONCURRENCY,
+    session: requests.Session = None,
+    **kwargs,
+) -> list:
+    """get_many_asyncの同期版
+
+    Parameters
+    ----------
+    urls : list
+        URLのリスト
+    limit : int, optional
+        同時に実行するリクエストの数, by default 8
+    session : requests.Session, optional
+        リクエストに利用するセッション, by default None(共有のセッション)
+    **kwargs
+        requests.Session.getに渡す引数
+
+    Returns
+    -------
+    list
+        requests.Responseのリスト(urlsと同じ順序)
+    """
+    return run_sync(get_many_async(urls, limit, session, **kwargs))
+
+
+async def download_many_async(
+    urls: list, target_dir: str = "", limit: int = DEFAULT_CONCURRENCY, **kwargs
+) -> list:
+    """複数のファイルを同時にlimit個までダウンロードする
+
+    Parameters
+    ----------
+    urls : list
+        URLのリスト
+    target_dir : str, optional
+        保存先のディレクトリ、空の場合は共有のダウンロードキャッシュを利用する, by default ""
+    limit : int, optional
+        同時にダウンロードするファイルの数, by default 8
+    **kwargs
+        network.downloader.downloadに渡す引数
+
+    Returns
+    -------
+    list
+        保存したファイルのパスのリスト(urlsと同じ順序)
+    """
+    # 循環importを避けるため、ここでimportする
+    from plateauutils.network.download_cache import default_download_cache
+    from plateauutils.network.downloader import download
+
+    kwargs.setdefault("progress", False)
+
+    def fetch(url: str) -> str:
+        if target_dir == "":
+            return default_download_cache().fetch(url, **kwargs)
+        saved_path = os.path.join(target_dir, url.split("/")[-1])
+        # 保存パスにファイルが存在すれば、そのパスを返す
+        if os.path.exists(saved_path):
+            return saved_path
+        return download(url, saved_path, **kwargs)
+
+    return await run_limited([partial(fetch, url) for url in urls], limit)
+
+
+def download_many(
+    urls: list, target_dir: str = "", limit: int = DEFAULT_CONCURRENCY, **kwargs
+) -> list:
+    """download_many_asyncの同期版
+
+    Parameters
+    ----------
+    urls : list
+        URLのリスト
+    target_dir : str, optional
+        保存先のディレクトリ、空の場合は共有のダウンロードキャッシュを利用する, by default ""
+    limit : int, optional
+        同時にダウンロードするファイルの数, by default 8
+    **kwargs
+        network.downloader.downloadに渡す引数
+
+    Returns
+    -------
+    list
+        保存したファイルのパスのリスト(urlsと同じ順序)
+    """
+    return run_sync(download_many_async(urls, target_dir, limit, **kwargs))
@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import os
+import re
+import threading
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Rangeリクエストに対応したテスト用のハンドラ"""
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        size = len(data)
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        # 条件付きリクエストで変更が無ければ304を返す
+        if self.server.etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.server.requests += 1
+            return
+        match = RANGE_PATTERN.fullmatch(self.headers.get("Range", ""))
+        if match is None or not self.server.accept_ranges:
+            self.send_response(200)
+            body = data
+        else:
+            start, end = match.groups()
+            if start == "":
+                start = max(size - int(end), 0)
+                end = size - 1
+            else:
+                start = int(start)
+                end = size - 1 if end == "" else min(int(end), size - 1)
+            if start >= size:
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            body = data[start : end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        if self.server.etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.requests += 1
+        self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_directory(directory: str, accept_ranges: bool = True, etag: bool = True):
+    """ディレクトリをHTTPで配信するテスト用のサーバーを起動する"""
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(RangeRequestHandler, directory=directory)
+    )
+    server.accept_ranges = accept_ranges
+    server.etag = etag
+    server.requests = 0
+    server.bytes_sent = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,121 @@
+import os
+from plateauutils.network.download_cache import DownloadCache
+from plateauutils.network.file_lock import FileLock
+from plateauutils.network.tests.range_server import serve_directory
+import pytest
+import requests
+import tempfile
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_download_cache_validate():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        _write(os.path.join(server_dir, "a.zip"), b"a" * 1000)
+        cache = DownloadCache(os.path.join(tmpdir, "cache"))
+        with serve_directory(server_dir) as server:
+            url = server.url + "/a.zip"
+            path = cache.fetch(url, progress=False)
+            assert os.path.basename(path) == "a.zip"
+            bytes_sent = server.bytes_sent
+            # 変更が無ければ304となり、ダウンロードしない
+            assert cache.fetch(url, progress=False) == path
+            assert server.bytes_sent == bytes_sent
+            # 更新された場合はダウンロードし直す
+            _write(os.path.join(server_dir, "a.zip"), b"b" * 2000)
+            assert cache.fetch(url, progress=False) == path
+            with open(path, "rb") as f:
+                assert f.read() == b"b" * 2000
+
+
+def test_download_cache_offline():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        _write(os.path.join(server_dir, "a.zip"), b"a" * 1000)
+        # 再試行しないセッションを利用する
+        cache = DownloadCache(os.path.join(tmpdir, "cache"), session=requests.Session())
+        with serve_directory(server_dir) as server:
+            url = server.url + "/a.zip"
+            path = cache.fetch(url, progress=False)
+        # 更新を確認できない場合はキャッシュを利用する
+        assert cache.fetch(url, progress=False) == path
+        with cache.open_cached(url, progress=False) as cached:
+            assert cached == path
+        # キャッシュが無い場合はエラー
+        with pytest.raises((ConnectionError, requests.RequestException)):
+            cache.fetch(server.url + "/b.zip", progress=False)
+
+
+def test_download_cache_without_etag():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        _write(os.path.join(server_dir, "a.zip"), b"a" * 1000)
+        cache = DownloadCache(os.path.join(tmpdir, "cache"))
+        with serve_directory(server_dir, etag=False) as server:
+            url = server.url + "/a.zip"
+            path = cache.fetch(url, progress=False)
+            requests = server.requests
+            # ETagが無い場合はサイズで判定する
+            assert cache.fetch(url, progress=False) == path
+            assert server.requests == requests + 1
+            _write(os.path.join(server_dir, "a.zip"), b"b" * 2000)
+            cache.fetch(url, progress=False)
+            with open(path, "rb") as f:
+                assert f.read() == b"b" * 2000
+
+
+def test_download_cache_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        for name in ["a", "b", "c"]:
+            _write(os.path.join(server_dir, name + ".zip"), name.encode() * 1000)
+        cache = DownloadCache(os.path.join(tmpdir, "cache"), max_bytes=2500)
+        with serve_directory(server_dir) as server:
+            a = cache.fetch(server.url + "/a.zip", progress=False)
+            b = cache.fetch(server.url + "/b.zip", progress=False)
+            os.utime(os.path.join(os.path.dirname(a), "meta.json"), (0, 0))
+            c = cache.fetch(server.url + "/c.zip", progress=False)
+            # 最も利用されていないaが削除される
+            assert not os.path.exists(a)
+            assert not os.path.exists(os.path.dirname(a) + ".lock")
+            assert os.path.exists(b)
+            assert os.path.exists(c)
+            # 利用中(ロック中)のエントリは削除しない
+            lock = FileLock(os.path.dirname(b) + ".lock")
+            assert lock.acquire()
+            os.utime(os.path.join(os.path.dirname(b), "meta.json"), (0, 0))
+            cache.fetch(server.url + "/a.zip", progress=False)
+            lock.release()
+            assert os.path.exists(b)
+            assert not os.path.exists(c)
+
+
+def test_download_cache_open_cached():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        for name in ["a", "b"]:
+            _write(os.path.join(server_dir, name + ".zip"), name.encode() * 1000)
+        cache = DownloadCache(os.path.join(tmpdir, "cache"), max_bytes=1500)
+        with serve_directory(server_dir) as server:
+            with cache.open_cached(server.url + "/a.zip", progress=False) as a:
+                os.utime(os.path.join(os.path.dirname(a), "meta.json"), (0, 0))
+                # 利用中のエントリは他のエントリの取得で削除されない
+                b = cache.fetch(server.url + "/b.zip", progress=False)
+                with open(a, "rb") as f:
+                    assert f.read() == b"a" * 1000
+                assert not FileLock(os.path.dirname(a) + ".lock").acquire(
+                    blocking=False
+                )
+            # 利用が終われば削除できる
+            cache.evict()
+            assert not os.path.exists(a)
+            assert os.path.exists(b)
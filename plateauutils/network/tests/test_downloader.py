@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+from plateauutils.network import downloader
+from plateauutils.network.downloader import (
+    DownloadChecksumException,
+    LOCK_SUFFIX,
+    PARTIAL_SUFFIX,
+    STATE_SUFFIX,
+    download,
+)
+from plateauutils.network.file_lock import FileLock
+from plateauutils.network.tests.range_server import serve_directory
+import pytest
+import requests
+import tempfile
+import threading
+
+DATA = os.urandom(1024 * 1024 + 123)
+
+
+def _serve(tmpdir: str) -> str:
+    server_dir = os.path.join(tmpdir, "server")
+    os.mkdir(server_dir)
+    with open(os.path.join(server_dir, "data.zip"), "wb") as f:
+        f.write(DATA)
+    return server_dir
+
+
+def test_download_segments():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            checksum = "sha256:" + hashlib.sha256(DATA).hexdigest()
+            result = download(
+                server.url + "/data.zip",
+                saved_path,
+                segment_size=256 * 1024,
+                checksum=checksum,
+                progress=False,
+            )
+            assert result == saved_path
+            # 区間ごとにリクエストする
+            assert server.requests == 1 + 5
+        with open(saved_path, "rb") as f:
+            assert f.read() == DATA
+        assert not os.path.exists(saved_path + PARTIAL_SUFFIX)
+        assert not os.path.exists(saved_path + STATE_SUFFIX)
+
+
+def test_download_resume():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir), etag=False) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            segment_size = 512 * 1024
+            # 1つ目の区間を全て、2つ目の区間を途中までダウンロードした状態を作る
+            with open(saved_path + PARTIAL_SUFFIX, "wb") as f:
+                f.write(DATA[: segment_size + 1000])
+                f.truncate(len(DATA))
+            with open(saved_path + STATE_SUFFIX, "w") as f:
+                json.dump(
+                    {
+                        "size": len(DATA),
+                        "validator": None,
+                        "segment_size": segment_size,
+                        "segments": [
+                            [0, segment_size],
+                            [segment_size, 1000],
+                            [segment_size * 2, 0],
+                        ],
+                    },
+                    f,
+                )
+            download(
+                server.url + "/data.zip",
+                saved_path,
+                segment_size=segment_size,
+                progress=False,
+            )
+            assert server.bytes_sent == 1 + len(DATA) - segment_size - 1000
+        with open(saved_path, "rb") as f:
+            assert f.read() == DATA
+
+
+class _FailingSession(requests.Session):
+    # 指定した位置以降のRangeリクエストを失敗させるセッション
+    def __init__(self, fail_from: int):
+        super().__init__()
+        self.fail_from = fail_from
+
+    def get(self, url, **kwargs):
+        range_header = kwargs.get("headers", {}).get("Range", "")
+        if range_header and int(range_header[6:].split("-")[0]) >= self.fail_from:
+            raise requests.ConnectionError("failed")
+        return super().get(url, **kwargs)
+
+
+def test_download_state_saved_on_error(monkeypatch):
+    # 間隔による保存が起きない場合でも、中断時には進捗を保存する
+    monkeypatch.setattr(downloader, "STATE_SAVE_INTERVAL", 3600)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            segment_size = 512 * 1024
+            with pytest.raises(requests.ConnectionError):
+                download(
+                    server.url + "/data.zip",
+                    saved_path,
+                    workers=1,
+                    segment_size=segment_size,
+                    buffer_size=64 * 1024,
+                    session=_FailingSession(segment_size),
+                    progress=False,
+                )
+            with open(saved_path + STATE_SUFFIX) as f:
+                state = json.load(f)
+            assert state["segments"][0] == [0, segment_size]
+            assert not os.path.exists(saved_path + LOCK_SUFFIX)
+            # 続きからダウンロードする
+            bytes_sent = server.bytes_sent
+            download(
+                server.url + "/data.zip",
+                saved_path,
+                segment_size=segment_size,
+                progress=False,
+            )
+            assert server.bytes_sent - bytes_sent == 1 + len(DATA) - segment_size
+        with open(saved_path, "rb") as f:
+            assert f.read() == DATA
+
+
+def test_download_lock():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            lock = FileLock(saved_path + LOCK_SUFFIX)
+            assert lock.acquire()
+            # 他のプロセスがダウンロード中の場合は完了を待つ
+            thread = threading.Thread(
+                target=download,
+                args=(server.url + "/data.zip", saved_path),
+                kwargs={"progress": False},
+            )
+            thread.start()
+            thread.join(0.5)
+            assert thread.is_alive()
+            assert server.requests == 0
+            lock.release()
+            thread.join()
+        with open(saved_path, "rb") as f:
+            assert f.read() == DATA
+        assert not os.path.exists(saved_path + LOCK_SUFFIX)
+
+
+def test_download_without_range():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir), accept_ranges=False) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            download(server.url + "/data.zip", saved_path, progress=False)
+            assert server.requests == 1
+        with open(saved_path, "rb") as f:
+            assert f.read() == DATA
+
+
+def test_download_checksum_mismatch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            saved_path = os.path.join(tmpdir, "data.zip")
+            with pytest.raises(DownloadChecksumException):
+                download(
+                    server.url + "/data.zip",
+                    saved_path,
+                    checksum="sha256:" + "0" * 64,
+                    progress=False,
+                )
+        assert not os.path.exists(saved_path)
+        assert not os.path.exists(saved_path + PARTIAL_SUFFIX)
+
+
+def test_download_not_found():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            saved_path = os.path.join(tmpdir, "missing.zip")
+            with pytest.raises(ConnectionError) as e:
+                download(server.url + "/missing.zip", saved_path, progress=False)
+            assert str(e.value) == f"Cannot download {server.url}/missing.zip"
+        assert not os.path.exists(saved_path)
@@ -0,0 +1,55 @@
+from plateauutils.network.file_lock import FileLock
+import os
+import tempfile
+import threading
+import time
+
+
+def test_file_lock():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "a.lock")
+        with FileLock(path):
+            assert not FileLock(path).acquire(blocking=False)
+        lock = FileLock(path)
+        assert lock.acquire(blocking=False)
+        lock.release()
+        # 共有ロックは同時に取得でき、排他ロックのみを妨げる
+        with FileLock(path, shared=True):
+            shared = FileLock(path, shared=True)
+            assert shared.acquire(blocking=False)
+            shared.release()
+            assert not FileLock(path).acquire(blocking=False)
+
+
+def test_file_lock_remove():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "a.lock")
+        lock = FileLock(path, remove=True)
+        assert lock.acquire()
+        waiting = FileLock(path, remove=True)
+        assert not waiting.acquire(blocking=False)
+        # 解放時にロックファイルを削除する
+        lock.release()
+        assert not os.path.exists(path)
+        assert waiting.acquire(blocking=False)
+        waiting.release()
+        assert not os.path.exists(path)
+
+
+def test_file_lock_removed_while_waiting():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "a.lock")
+        lock = FileLock(path, remove=True)
+        assert lock.acquire()
+        waiting = FileLock(path)
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: waiting.acquire() and acquired.set())
+        thread.start()
+        time.sleep(0.1)
+        # 待っている間に削除されたロックファイルは作り直して取得する
+        lock.release()
+        assert acquired.wait(5)
+        assert os.path.exists(path)
+        assert not FileLock(path).acquire(blocking=False)
+        waiting.release()
+        thread.join()
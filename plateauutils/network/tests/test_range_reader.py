@@ -0,0 +1,66 @@
+import os
+from plateauutils.network.range_reader import (
+    HttpRangeReader,
+    is_remote,
+    open_remote,
+    open_zip_file,
+)
+from plateauutils.network.tests.range_server import serve_directory
+import pytest
+import tempfile
+import zipfile
+
+
+def test_is_remote():
+    assert is_remote("https://example.com/a.zip")
+    assert is_remote("http://example.com/a.zip")
+    assert not is_remote("/tmp/a.zip")
+
+
+def test_http_range_reader():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data = bytes(range(256)) * 16
+        with open(os.path.join(tmpdir, "data.bin"), "wb") as f:
+            f.write(data)
+        with serve_directory(tmpdir) as server:
+            reader = HttpRangeReader(server.url + "/data.bin")
+            assert reader.size == len(data)
+            reader.seek(-16, os.SEEK_END)
+            assert reader.read(32) == data[-16:]
+            reader.seek(100)
+            assert reader.read(10) == data[100:110]
+            assert reader.tell() == 110
+            # 小さな読み込みはバッファからまとめて返す
+            with open_remote(server.url + "/data.bin", buffer_size=1024) as f:
+                requests = server.requests
+                assert f.read(10) == data[:10]
+                assert f.read(10) == data[10:20]
+                assert server.requests == requests + 1
+
+
+def test_http_range_reader_not_supported():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "data.bin"), "wb") as f:
+            f.write(b"data")
+        with serve_directory(tmpdir, accept_ranges=False) as server:
+            with pytest.raises(ConnectionError) as e:
+                HttpRangeReader(server.url + "/data.bin")
+            assert str(e.value) == (
+                f"Range request is not supported: {server.url}/data.bin"
+            )
+
+
+def test_open_zip_file_remote():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, "archive.zip")
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("a.txt", "a")
+            zip_file.writestr("b.bin", os.urandom(4 * 1024 * 1024))
+        with serve_directory(tmpdir) as server:
+            with open_zip_file(server.url + "/archive.zip") as zip_file:
+                assert zip_file.namelist() == ["a.txt", "b.bin"]
+                assert zip_file.read("a.txt") == b"a"
+            # b.binの内容は取得しない
+            assert server.bytes_sent < os.path.getsize(archive_path) / 2
+        with open_zip_file(archive_path) as zip_file:
+            assert zip_file.read("a.txt") == b"a"
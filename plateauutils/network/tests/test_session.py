@@ -0,0 +1,94 @@
+import asyncio
+from functools import partial
+import os
+from plateauutils.network.session import (
+    configure_session,
+    download_many,
+    download_many_async,
+    get_many,
+    get_session,
+    run_limited,
+    run_sync,
+)
+from plateauutils.network.tests.range_server import serve_directory
+import tempfile
+import threading
+import time
+
+
+def _serve(tmpdir: str) -> str:
+    server_dir = os.path.join(tmpdir, "server")
+    os.mkdir(server_dir)
+    for i in range(5):
+        with open(os.path.join(server_dir, f"{i}.zip"), "wb") as f:
+            f.write(str(i).encode() * 100)
+    return server_dir
+
+
+def test_get_session():
+    session = get_session()
+    assert get_session() is session
+    configure_session(pool_size=4, headers={"User-Agent": "plateauutils"})
+    configured = get_session()
+    assert configured is not session
+    assert configured.headers["User-Agent"] == "plateauutils"
+    assert configured.get_adapter("https://example.com")._pool_maxsize == 4
+    configure_session()
+
+
+def test_get_many():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with serve_directory(_serve(tmpdir)) as server:
+            urls = [f"{server.url}/{i}.zip" for i in range(5)]
+            responses = get_many(urls, limit=2)
+    assert [response.content for response in responses] == [
+        str(i).encode() * 100 for i in range(5)
+    ]
+
+
+def test_run_limited():
+    # 既定のエグゼキューターのスレッド数(最大32)を超えても、limit個まで同時に実行する
+    limit = 40
+    barrier = threading.Barrier(limit, timeout=10)
+    results = run_sync(run_limited([barrier.wait] * limit, limit))
+    assert sorted(results) == list(range(limit))
+    # limit個を超えては実行しない
+    running = [0, 0]
+    lock = threading.Lock()
+
+    def function(i):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return i
+
+    functions = [partial(function, i) for i in range(20)]
+    assert run_sync(run_limited(functions, 3)) == list(range(20))
+    assert running[1] <= 3
+
+
+def test_download_many():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target_dir = os.path.join(tmpdir, "target")
+        os.mkdir(target_dir)
+        with serve_directory(_serve(tmpdir)) as server:
+            urls = [f"{server.url}/{i}.zip" for i in range(5)]
+            result = download_many(urls, target_dir, limit=3)
+            assert result == [os.path.join(target_dir, f"{i}.zip") for i in range(5)]
+            # 保存済みのファイルはダウンロードしない
+            requests = server.requests
+            assert download_many(urls, target_dir) == result
+            assert server.requests == requests
+
+            # イベントループの中からも利用できる
+            async def main():
+                assert run_sync(asyncio.sleep(0, "a")) == "a"
+                return await download_many_async(urls, target_dir)
+
+            assert asyncio.run(main()) == result
+        for i, path in enumerate(result):
+            with open(path, "rb") as f:
+                assert f.read() == str(i).encode() * 100
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+import os
+import threading
+from typing import Any, Callable, Hashable
+import weakref
+import zipfile
+
+# 開いているzipファイルごとのキー(ファイルを閉じて破棄されれば削除される)
+_archive_keys = weakref.WeakKeyDictionary()
+
+
+def archive_key(zip_file: zipfile.ZipFile) -> Hashable:
+    """zipファイルを識別するキーを返す
+
+    ファイルの場合はパス、サイズ、更新時刻からキーを作成するため、
+    同じパスのファイルが更新された場合は別のアーカイブとして扱われる
+    キーは開いているzipファイルごとに一度だけ作成する
+
+    Parameters
+    ----------
+    zip_file : zipfile.ZipFile
+        対象となるzipファイル
+
+    Returns
+    -------
+    Hashable
+        アーカイブのキー、識別できない場合はNone
+    """
+    try:
+        return _archive_keys[zip_file]
+    except KeyError:
+        pass
+    key = zip_file.filename
+    if key is not None and os.path.isfile(key):
+        stat = os.stat(key)
+        key = (os.path.abspath(key), stat.st_size, stat.st_mtime_ns)
+    _archive_keys[zip_file] = key
+    return key
+
+
+class ArchiveCache(object):
+    """アーカイブとキーの組み合わせで値を保持するLRUキャッシュ
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        保持する値の最大数, by default 128
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._storage = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, zip_file: zipfile.ZipFile, key: Hashable, loader: Callable[[], Any]
+    ) -> Any:
+        """キャッシュから値を取得し、存在しなければloaderで作成して格納する
+
+        Parameters
+        ----------
+        zip_file : zipfile.ZipFile
+            対象となるzipファイル
+        key : Hashable
+            アーカイブ内で値を識別するキー
+        loader : Callable[[], Any]
+            値を作成する関数
+
+        Returns
+        -------
+        Any
+            キャッシュされた値
+        """
+        base = archive_key(zip_file)
+        # アーカイブを識別できない場合はキャッシュしない
+        if base is None:
+            return loader()
+        cache_key = (base, key)
+        with self._lock:
+            if cache_key in self._storage:
+                self._storage.move_to_end(cache_key)
+                return self._storage[cache_key]
+        value = loader()
+        with self._lock:
+            self._storage[cache_key] = value
+            self._storage.move_to_end(cache_key)
+            # 上限を超えたら古いものから削除
+            while len(self._storage) > self.maxsize:
+                self._storage.popitem(last=False)
+        return value
+
+    def clear(self):
+        """キャッシュを空にする"""
+        with self._lock:
+            self._storage.clear()
+
+    def __len__(self) -> int:
+        return len(self._storage)
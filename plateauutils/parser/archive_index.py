@@ -0,0 +1,110 @@
+from plateauutils.parser.archive_cache import ArchiveCache
+import zipfile
+
+# CityGMLの地物ファイルを格納するディレクトリ
+UDX_DIRECTORY = "udx"
+
+# アーカイブごとの索引のキャッシュ
+archive_index_cache = ArchiveCache(maxsize=32)
+
+
+class ArchiveIndex(object):
+    """zipファイル内のファイル名の索引
+
+    ファイル名を一度だけ走査し、メッシュコードとタイルのキーからファイル名を引けるようにする
+
+    * メッシュコード: udx/<地物>/<メッシュコード>_<地物>_*.gml
+    * タイル: <レイヤー>/<z>/<x>/<y>.<拡張子>
+
+    Parameters
+    ----------
+    names : list
+        zipファイル内のファイル名のリスト
+    """
+
+    def __init__(self, names: list):
+        self.names = list(names)
+        # (地物, メッシュコード)をキーとしたファイル名の位置
+        self._meshes = {}
+        # (レイヤー, z/x/y.拡張子)をキーとしたファイル名の位置
+        self._tiles = {}
+        for position, name in enumerate(self.names):
+            parts = name.split("/")
+            for i in range(len(parts) - 2):
+                if parts[i] != UDX_DIRECTORY:
+                    continue
+                feature = parts[i + 1]
+                code, _, rest = parts[i + 2].partition("_")
+                if rest.startswith(feature):
+                    self._meshes.setdefault((feature, code), []).append(position)
+            if len(parts) >= 4:
+                key = (parts[-4], "/".join(parts[-3:]))
+                self._tiles.setdefault(key, []).append(position)
+
+    def _lookup(self, index: dict, prefix: str, keys: list) -> list:
+        # キーごとに位置を集め、zipファイル内の順序で返す
+        # keysはイテレータも可(該当した位置のみを保持する)
+        positions = set()
+        for key in keys:
+            positions.update(index.get((prefix, key), []))
+        return [self.names[i] for i in sorted(positions)]
+
+    def mesh_members(self, feature: str, codes: list, suffix: str = ".gml") -> list:
+        """メッシュコードに該当するファイル名を返す
+
+        Parameters
+        ----------
+        feature : str
+            地物の種類(bldgなど)
+        codes : list
+            メッシュコードのリスト
+        suffix : str, optional
+            ファイルの拡張子, by default ".gml"
+
+        Returns
+        -------
+        list
+            該当するファイル名のリスト(zipファイル内の順序)
+        """
+        return [
+            name
+            for name in self._lookup(self._meshes, feature, codes)
+            if name.endswith(suffix)
+        ]
+
+    def tile_members(self, layer: str, tiles: list) -> list:
+        """タイルに該当するファイル名を返す
+
+        Parameters
+        ----------
+        layer : str
+            レイヤーのディレクトリ名(luseなど)
+        tiles : list
+            タイルのリスト(z/x/y.拡張子)
+
+        Returns
+        -------
+        list
+            該当するファイル名のリスト(zipファイル内の順序)
+        """
+        return self._lookup(self._tiles, layer, tiles)
+
+
+def load_archive_index(zip_file: zipfile.ZipFile) -> ArchiveIndex:
+    """zipファイルの索引を返す
+
+    アーカイブごとに一度だけ作成し、結果はキャッシュされる
+
+    Parameters
+    ----------
+    zip_file : zipfile.ZipFile
+        対象となるzipファイル
+
+    Returns
+    -------
+    ArchiveIndex
+        zipファイルの索引
+    """
+    return archive_index_cache.get(
+        zip_file, "index", lambda: ArchiveIndex(zip_file.namelist())
+    )
@@ -0,0 +1,353 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+# 浮動小数点の列
+FLOAT_COLUMNS = ["center_x", "center_y", "min_height", "measured_height"]
+
+# 辞書符号化する文字列の列
+CATEGORY_COLUMNS = ["building_structure_type", "usage"]
+
+
+class DictionaryColumn(object):
+    """文字列を辞書符号化して保持する列
+
+    値はcategoriesのインデックス(codes)として保持し、欠損値は-1とする
+    """
+
+    def __init__(self):
+        self.codes = array("i")
+        self.categories = []
+        self._index = {}
+
+    def _code(self, value: str) -> int:
+        # 値に対応するコードを返す、存在しなければ追加する
+        if value is None:
+            return -1
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.categories)
+            self._index[value] = code
+            self.categories.append(value)
+        return code
+
+    def append(self, value: str):
+        """値を追加する
+
+        Parameters
+        ----------
+        value : str
+            追加する値(欠損値の場合はNone)
+        """
+        self.codes.append(self._code(value))
+
+    def extend(self, other: "DictionaryColumn"):
+        """別の列の値を末尾に追加する
+
+        Parameters
+        ----------
+        other : DictionaryColumn
+            追加する列
+        """
+        # otherのコードを自身のコードに変換する対応表(末尾は欠損値用)
+        mapping = np.array(
+            [self._code(value) for value in other.categories] + [-1], dtype=np.intc
+        )
+        self.codes.frombytes(mapping[other.numpy_codes()].tobytes())
+
+    def numpy_codes(self) -> np.ndarray:
+        """コードをnumpyの配列で返す"""
+        return np.frombuffer(self.codes, dtype=np.intc).astype(np.int32)
+
+    def values(self) -> list:
+        """復号した値のリストを返す"""
+        categories = self.categories + [None]
+        return [categories[code] for code in self.codes]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class BuildingTable(object):
+    """建物の情報を列ごとに保持するクラス
+
+    パース中に1件ずつ追加し、最後にnumpy、pandas、Arrowの形式に変換する
+
+    Parameters
+    ----------
+    geometry : bool, optional
+        Trueの場合、底面のPolygonの列を保持する, by default False
+    """
+
+    def __init__(self, geometry: bool = False):
+        self.gid = []
+        self.center_x = array("d")
+        self.center_y = array("d")
+        self.min_height = array("d")
+        self.measured_height = array("d")
+        self.building_structure_type = DictionaryColumn()
+        self.usage = DictionaryColumn()
+        self.geometry = [] if geometry else None
+        # 底面の外接矩形(min_x, min_y, max_x, max_y)、範囲の判定に利用する
+        self.envelope = array("d")
+
+    def append(
+        self,
+        gid: str,
+        center: list,
+        min_height: float,
+        measured_height: float,
+        building_structure_type: str,
+        usage: str,
+        geometry=None,
+        envelope: tuple = None,
+    ):
+        """建物を1件追加する
+
+        中心座標、測定高さ、外接矩形が無い場合はNaNとして保持する
+        """
+        self.gid.append(gid)
+        if center is None:
+            self.center_x.append(np.nan)
+            self.center_y.append(np.nan)
+        else:
+            self.center_x.append(center[0])
+            self.center_y.append(center[1])
+        self.min_height.append(min_height)
+        self.measured_height.append(
+            np.nan if measured_height is None else measured_height
+        )
+        self.building_structure_type.append(building_structure_type)
+        self.usage.append(usage)
+        if self.geometry is not None:
+            self.geometry.append(geometry)
+        if envelope is None:
+            envelope = (np.nan, np.nan, np.nan, np.nan)
+        self.envelope.extend(envelope)
+
+    def extend(self, other: "BuildingTable"):
+        """別のテーブルの建物を末尾に追加する
+
+        Parameters
+        ----------
+        other : BuildingTable
+            追加するテーブル
+        """
+        self.gid.extend(other.gid)
+        for column in FLOAT_COLUMNS:
+            getattr(self, column).extend(getattr(other, column))
+        for column in CATEGORY_COLUMNS:
+            getattr(self, column).extend(getattr(other, column))
+        if self.geometry is not None:
+            self.geometry.extend(other.geometry)
+        self.envelope.extend(other.envelope)
+
+    def __len__(self) -> int:
+        return len(self.gid)
+
+    def envelope_array(self) -> np.ndarray:
+        """外接矩形を(件数, 4)のnumpyの配列で返す"""
+        return np.frombuffer(self.envelope, dtype=np.float64).reshape((-1, 4))
+
+    def select(self, mask: np.ndarray) -> "BuildingTable":
+        """条件に一致する建物のみを含むテーブルを返す
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            建物ごとのboolの配列
+
+        Returns
+        -------
+        BuildingTable
+            条件に一致する建物のテーブル
+        """
+        indices = np.flatnonzero(mask)
+        table = BuildingTable(geometry=self.geometry is not None)
+        table.gid = [self.gid[i] for i in indices]
+        for column in FLOAT_COLUMNS:
+            values = np.frombuffer(getattr(self, column), dtype=np.float64)
+            getattr(table, column).frombytes(values[indices].tobytes())
+        for column in CATEGORY_COLUMNS:
+            dictionary_column = getattr(self, column)
+            selected = getattr(table, column)
+            # カテゴリはそのまま引き継ぐ
+            selected.categories = list(dictionary_column.categories)
+            selected._index = dict(dictionary_column._index)
+            codes = dictionary_column.numpy_codes()[indices].astype(np.intc)
+            selected.codes.frombytes(codes.tobytes())
+        if self.geometry is not None:
+            table.geometry = [self.geometry[i] for i in indices]
+        table.envelope.frombytes(self.envelope_array()[indices].tobytes())
+        return table
+
+    def save(self, file):
+        """テーブルをnpz形式で保存する
+
+        geometryの列は保存されない
+
+        Parameters
+        ----------
+        file : str or file-like object
+            保存先
+        """
+        # gml:idが無い建物は空文字列とし、別の列で区別する
+        data = {
+            "gid": np.array(["" if i is None else i for i in self.gid], dtype=np.str_),
+            "gid_missing": np.array([i is None for i in self.gid], dtype=np.bool_),
+            "envelope": self.envelope_array(),
+        }
+        for column in FLOAT_COLUMNS:
+            data[column] = np.frombuffer(getattr(self, column), dtype=np.float64)
+        for column in CATEGORY_COLUMNS:
+            dictionary_column = getattr(self, column)
+            data[column + "_codes"] = dictionary_column.numpy_codes()
+            data[column + "_categories"] = np.array(
+                dictionary_column.categories, dtype=np.str_
+            )
+        np.savez_compressed(file, **data)
+
+    @classmethod
+    def load(cls, file) -> "BuildingTable":
+        """npz形式で保存されたテーブルを読み込む
+
+        Parameters
+        ----------
+        file : str or file-like object
+            読み込むファイル
+
+        Returns
+        -------
+        BuildingTable
+            読み込んだテーブル
+        """
+        table = cls()
+        with np.load(file, allow_pickle=False) as data:
+            table.gid = data["gid"].tolist()
+            if "gid_missing" in data:
+                for i in np.flatnonzero(data["gid_missing"]).tolist():
+                    table.gid[i] = None
+            for column in FLOAT_COLUMNS:
+                getattr(table, column).frombytes(data[column].tobytes())
+            for column in CATEGORY_COLUMNS:
+                dictionary_column = getattr(table, column)
+                for value in data[column + "_categories"].tolist():
+                    dictionary_column._code(value)
+                codes = data[column + "_codes"].astype(np.intc)
+                dictionary_column.codes.frombytes(codes.tobytes())
+            table.envelope.frombytes(data["envelope"].astype(np.float64).tobytes())
+        return table
+
+    def to_list(self) -> list:
+        """建物ごとの辞書のリストに変換する
+
+        Returns
+        -------
+        list
+            CityGMLParser.parseと同じ形式の辞書のリスト
+        """
+        building_structure_types = self.building_structure_type.values()
+        usages = self.usage.values()
+        return_list = []
+        for i, gid in enumerate(self.gid):
+            center = None
+            if not np.isnan(self.center_x[i]):
+                center = [self.center_x[i], self.center_y[i]]
+            measured_height = self.measured_height[i]
+            return_value = {
+                "gid": gid,
+                "center": center,
+                "min_height": self.min_height[i],
+                "measured_height": (
+                    None if np.isnan(measured_height) else measured_height
+                ),
+                "building_structure_type": building_structure_types[i],
+                "usage": usages[i],
+            }
+            if self.geometry is not None:
+                return_value["geometry"] = self.geometry[i]
+            return_list.append(return_value)
+        return return_list
+
+    def to_numpy(self) -> np.ndarray:
+        """numpyの構造化配列に変換する
+
+        building_structure_type、usageはコード(欠損値は-1)で格納されるため、
+        対応する値は各列のcategoriesを参照する
+
+        Returns
+        -------
+        numpy.ndarray
+            構造化配列
+        """
+        dtype = [("gid", object)]
+        dtype += [(column, np.float64) for column in FLOAT_COLUMNS]
+        dtype += [(column, np.int32) for column in CATEGORY_COLUMNS]
+        if self.geometry is not None:
+            dtype.append(("geometry", object))
+        result = np.empty(len(self), dtype=dtype)
+        result["gid"] = self.gid
+        for column in FLOAT_COLUMNS:
+            result[column] = np.frombuffer(getattr(self, column), dtype=np.float64)
+        for column in CATEGORY_COLUMNS:
+            result[column] = getattr(self, column).numpy_codes()
+        if self.geometry is not None:
+            result["geometry"] = self.geometry
+        return result
+
+    def to_pandas(self) -> pd.DataFrame:
+        """pandasのDataFrameに変換する
+
+        building_structure_type、usageはカテゴリ型の列となる
+
+        Returns
+        -------
+        pandas.DataFrame
+            建物ごとの行を持つDataFrame
+        """
+        data = {"gid": self.gid}
+        for column in FLOAT_COLUMNS:
+            data[column] = np.frombuffer(getattr(self, column), dtype=np.float64)
+        for column in CATEGORY_COLUMNS:
+            dictionary_column = getattr(self, column)
+            data[column] = pd.Categorical.from_codes(
+                dictionary_column.numpy_codes(),
+                categories=dictionary_column.categories,
+            )
+        if self.geometry is not None:
+            data["geometry"] = self.geometry
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """pyarrowのTableに変換する
+
+        building_structure_type、usageは辞書型の列となる
+        geometryの列はWKBとして格納する
+
+        Returns
+        -------
+        pyarrow.Table
+            建物ごとの行を持つTable
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required for arrow output")
+        data = {"gid": pa.array(self.gid, type=pa.string())}
+        for column in FLOAT_COLUMNS:
+            data[column] = pa.array(
+                np.frombuffer(getattr(self, column), dtype=np.float64)
+            )
+        for column in CATEGORY_COLUMNS:
+            dictionary_column = getattr(self, column)
+            codes = dictionary_column.numpy_codes()
+            data[column] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0),
+                pa.array(dictionary_column.categories, type=pa.string()),
+            )
+        if self.geometry is not None:
+            data["geometry"] = pa.array(
+                [None if g is None else g.wkb for g in self.geometry],
+                type=pa.binary(),
+            )
+        return pa.table(data)
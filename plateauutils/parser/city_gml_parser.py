@@ -1,11 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import numpy as np
 import os
 from plateauutils.abc.plateau_parser import PlateauParser
+from plateauutils.network.download_cache import DownloadCache
+from plateauutils.network.range_reader import open_zip_file
+from plateauutils.parser.archive_cache import ArchiveCache
+from plateauutils.parser.archive_index import load_archive_index
+from plateauutils.parser.building_table import BuildingTable
+from plateauutils.parser.codelist import load_codelist
+from plateauutils.parser.parse_cache import ParseCache
+from plateauutils.parser.spatial_filter import SpatialFilter
 from plateauutils.mesh_geocorder.polygon_to_meshcode_list import PolygonToMeshCodeList
 from shapely.geometry import Polygon
+from typing import Callable
 import xml.etree.ElementTree as ET
 import zipfile
 
+# core:cityObjectMemberのタグ
+CITY_OBJECT_MEMBER_TAG = "{http://www.opengis.net/citygml/2.0}cityObjectMember"
+
+# uroのnamespaceとversionの対応(判定の優先順)
+URO_NAMESPACES = [
+    ("https://www.geospatial.jp/iur/uro/2.0", 2),
+    ("https://www.geospatial.jp/iur/uro/3.0", 3),
+    (
+        "http://www.kantei.go.jp/jp/singi/tiiki/toshisaisei/itoshisaisei/iur/uro/1.4",
+        1,
+    ),
+    ("https://www.chisou.go.jp/tiiki/toshisaisei/itoshisaisei/iur/uro/1.5", 1),
+]
+
+# CityGMLで利用するnamespace(uroはファイルごとに判定する)
+BASE_NAMESPACES = {
+    "core": "http://www.opengis.net/citygml/2.0",
+    "bldg": "http://www.opengis.net/citygml/building/2.0",
+    "gml": "http://www.opengis.net/gml",
+}
+
+# namespace判定のために一度に読み込むバイト数
+SNIFF_CHUNK_SIZE = 8192
+
+# parseの返り値の形式
+OUTPUT_FORMATS = ["list", "table", "numpy", "pandas", "arrow"]
+
+# bldg:usageのコードリストの対象ファイルからの相対パス
+USAGE_CODELIST = "../../codelists/Building_usage.xml"
+
+# アーカイブごとのuroのnamespaceとversionのキャッシュ
+uro_namespace_cache = ArchiveCache(maxsize=128)
+
 
 class CityGMLParser(PlateauParser):
     """CityGMLファイルをパースするクラス
@@ -14,12 +58,59 @@ class CityGMLParser(PlateauParser):
     ----------
     polygon : shapely.geometry.Polygon
         対象となるポリゴン
+    streaming : bool, optional
+        Trueの場合、GMLファイルを要素木に展開せずcore:cityObjectMember単位で
+        逐次パースする(メモリ使用量が建物1件分程度になる), by default False
+    workers : int, optional
+        GMLファイルを並列にパースするプロセス数, by default 1
+    geometry : bool, optional
+        Trueの場合、底面のPolygonを返り値のgeometryに含める, by default False
+    spatial_filter : str, optional
+        指定した場合、ポリゴンの範囲外の建物を除外する, by default None
+
+        * centroid: 底面の重心がポリゴンと交差する建物を残す
+        * envelope: 底面の外接矩形がポリゴンと交差する建物を残す
+    output : str, optional
+        parseの返り値の形式, by default "list"
+
+        * list: 建物ごとの辞書のリスト
+        * table: 列ごとに値を保持するBuildingTable
+        * numpy: numpyの構造化配列
+        * pandas: pandasのDataFrame
+        * arrow: pyarrowのTable(pyarrowが必要)
+    cache_dir : str, optional
+        指定した場合、GMLファイルごとのパース結果をこのディレクトリにキャッシュする
+        (geometry=Trueの場合は利用しない), by default None
+    cache_size : int, optional
+        キャッシュの合計サイズの上限(バイト), by default 1 GiB
     """
 
-    def __init__(self, polygon: Polygon = None):
+    def __init__(
+        self,
+        polygon: Polygon = None,
+        streaming: bool = False,
+        workers: int = 1,
+        geometry: bool = False,
+        spatial_filter: str = None,
+        output: str = "list",
+        cache_dir: str = None,
+        cache_size: int = 1024**3,
+    ):
+        if output not in OUTPUT_FORMATS:
+            raise ValueError("output must be one of " + ", ".join(OUTPUT_FORMATS))
+        self.streaming = streaming
+        self.workers = workers
+        self.geometry = geometry
+        self.output = output
         super().__init__(polygon)
+        self._spatial_filter = None
+        if spatial_filter is not None:
+            self._spatial_filter = SpatialFilter(polygon, spatial_filter)
+        self._parse_cache = None
+        if cache_dir is not None:
+            self._parse_cache = ParseCache(cache_dir, cache_size)
 
-    def parse(self, target_path: str = "") -> list:
+    def parse(self, target_path: str = ""):
         """CityGMLファイルをパースして、情報を返すメソッド
 
         Parameters
@@ -30,100 +121,28 @@ class CityGMLParser(PlateauParser):
         Returns
         -------
         list
-            パースした情報のリスト、以下の情報を含む
+            パースした情報のリスト(outputの指定により形式が変わる)、以下の情報を含む
 
             * gid: gml:id
-            * center: 中心座標
+            * center: 中心座標(列形式ではcenter_x, center_y)
             * min_height: 最小高さ
             * measured_height: 測定高さ
             * building_structure_type: 建物構造種別(コード)
             * usage: 用途
+            * geometry: 底面のPolygon(geometry=Trueの場合のみ)
         """
         # ファイルが存在しないならエラー
         if not os.path.exists(target_path):
             raise FileNotFoundError(f"target_path: {target_path} is not found")
-        # zipファイルにターゲットのパスが存在するか確認
-        hit_targets = []
-        with zipfile.ZipFile(target_path) as zip_file:
-            for name in zip_file.namelist():
-                for target in self.targets:
-                    path = os.path.join("udx", "bldg", target + "_bldg")
-                    if name.find(path) >= 0 and name.endswith(".gml"):
-                        hit_targets.append(name)
-        if len(hit_targets) == 0:
-            raise ValueError(f"target_path: {target_path} is not target")
-        # 返り値を作成
-        return_list = []
-        with zipfile.ZipFile(target_path) as zip_file:
-            # 解凍したファイルをパースする
-            for target in hit_targets:
-                # XMLのオブジェクトとして読み込む
-                root = ET.fromstring(zip_file.read(target))
-                # namespaceを作成
-                ns = {
-                    "core": "http://www.opengis.net/citygml/2.0",
-                    "bldg": "http://www.opengis.net/citygml/building/2.0",
-                    "gml": "http://www.opengis.net/gml",
-                    "uro": "",
-                }
-                # 処理の分岐のためのversion変数を作成
-                version = None
-                # uroのnamespaceとversionを取得
-                if (
-                    len(
-                        root.findall(
-                            ".//{https://www.geospatial.jp/iur/uro/2.0}buildingDetailAttribute"
-                        )
-                    )
-                    > 0
-                ):
-                    ns["uro"] = "https://www.geospatial.jp/iur/uro/2.0"
-                    version = 2
-                elif (
-                    len(
-                        root.findall(
-                            ".//{https://www.geospatial.jp/iur/uro/3.0}buildingDetailAttribute"
-                        )
-                    )
-                    > 0
-                ):
-                    ns["uro"] = "https://www.geospatial.jp/iur/uro/3.0"
-                    version = 3
-                elif (
-                    len(
-                        root.findall(
-                            ".//{http://www.kantei.go.jp/jp/singi/tiiki/toshisaisei/itoshisaisei/iur/uro/1.4}buildingDetails"
-                        )
-                    )
-                    > 0
-                ):
-                    ns["uro"] = (
-                        "http://www.kantei.go.jp/jp/singi/tiiki/toshisaisei/itoshisaisei/iur/uro/1.4"
-                    )
-                    version = 1
-                elif (
-                    len(
-                        root.findall(
-                            ".//{https://www.chisou.go.jp/tiiki/toshisaisei/itoshisaisei/iur/uro/1.5}buildingDetails"
-                        )
-                    )
-                    > 0
-                ):
-                    ns["uro"] = (
-                        "https://www.chisou.go.jp/tiiki/toshisaisei/itoshisaisei/iur/uro/1.5"
-                    )
-                    version = 1
-                # versionがNoneならエラーとする
-                if version is None:
-                    raise ValueError("version is None")
-                # パース処理を実施する
-                ret = self._parse(root, target, zip_file, ns, version)
-                # 返り値に追加
-                return_list.extend(ret)
-        # 返り値を返却
-        return return_list
+        return self._parse_archive(target_path)
 
-    def download_and_parse(self, url: str = "", target_dir: str = "") -> list:
+    def download_and_parse(
+        self,
+        url: str = "",
+        target_dir: str = "",
+        remote: bool = False,
+        cache: DownloadCache = None,
+    ):
         """CityGMLファイルをダウンロードして、情報を返すメソッド
 
         Parameters
@@ -132,22 +151,62 @@ class CityGMLParser(PlateauParser):
             CityGMLファイル(zip)のURL
         target_dir : str
             ファイルを展開する先のパス
+        remote : bool, optional
+            Trueの場合、zipファイル全体をダウンロードせず、Rangeリクエストで
+            対象のGMLファイルとコードリストのみを取得する(target_dirは利用しない),
+            by default False
+        cache : DownloadCache or bool, optional
+            指定した場合はtarget_dirにダウンロードせず、ダウンロードキャッシュを利用する
+            Trueの場合は共有のダウンロードキャッシュ、Falseの場合は利用しない,
+            by default None
 
         Returns
         -------
         list
-            パースした情報のリスト、以下の情報を含む
+            パースした情報のリスト(outputの指定により形式が変わる)、以下の情報を含む
 
             * gid: gml:id
-            * center: 中心座標
+            * center: 中心座標(列形式ではcenter_x, center_y)
             * min_height: 最小高さ
             * measured_height: 測定高さ
             * building_structure_type: 建物構造種別(コード)
             * usage: 用途
+            * geometry: 底面のPolygon(geometry=Trueの場合のみ)
         """
+        if remote:
+            return self._parse_archive(url)
+        if cache:
+            with self._open_cached(url, cache) as saved_path:
+                return self.parse(saved_path)
         saved_path = self._download(url, target_dir)
         return self.parse(saved_path)
 
+    def _parse_archive(self, target_path: str):
+        # target_pathはローカルのパスもしくはURL
+        with open_zip_file(target_path) as zip_file:
+            # 索引からターゲットのメッシュコードのファイルを取得
+            hit_targets = load_archive_index(zip_file).mesh_members(
+                "bldg", self.targets
+            )
+            if len(hit_targets) == 0:
+                raise ValueError(f"target_path: {target_path} is not target")
+            # パース結果を列ごとに格納するテーブルを作成
+            table = BuildingTable(geometry=self.geometry)
+            if self.workers > 1 and len(hit_targets) > 1:
+                # ファイルごとにプロセスプールで並列にパースする
+                # 結果はhit_targetsの順序で結合する
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    for ret in executor.map(
+                        self._parse_target, repeat(target_path), hit_targets
+                    ):
+                        table.extend(ret)
+            else:
+                # 解凍したファイルをパースする
+                for target in hit_targets:
+                    table.extend(self._parse_member(target_path, target, zip_file))
+        # 指定された形式で返却
+        return self._convert_output(table)
+
     def _target_list(self, polygon: Polygon = None) -> list:
         # PolygonがNoneならエラー
         if polygon is None:
@@ -166,128 +225,324 @@ class CityGMLParser(PlateauParser):
         # 返り値を返す
         return return_list
 
+    def _convert_output(self, table: BuildingTable):
+        # 指定された形式に変換する
+        if self.output == "table":
+            return table
+        if self.output == "numpy":
+            return table.to_numpy()
+        if self.output == "pandas":
+            return table.to_pandas()
+        if self.output == "arrow":
+            return table.to_arrow()
+        return table.to_list()
+
+    def _parse_target(self, target_path: str, target: str) -> BuildingTable:
+        # プロセスごとにzipファイルを開いてパースする
+        with open_zip_file(target_path) as zip_file:
+            return self._parse_member(target_path, target, zip_file)
+
+    def _parse_member(
+        self, target_path: str, target: str, zip_file: zipfile.ZipFile
+    ) -> BuildingTable:
+        # キャッシュを利用しない場合はそのままパースする
+        if self._parse_cache is None or self.geometry:
+            return self._parse_gml(target, zip_file, self._spatial_filter)
+        # キャッシュはポリゴンに依存しないよう絞り込み前の結果を保持する
+        info = zip_file.getinfo(target)
+        table = self._parse_cache.load(target_path, info)
+        if table is None:
+            table = self._parse_gml(target, zip_file, None)
+            self._parse_cache.save(target_path, info, table)
+        # ポリゴンの範囲外の建物を除外する
+        if self._spatial_filter is not None:
+            mask = self._spatial_filter.mask(
+                np.frombuffer(table.center_x, dtype=np.float64),
+                np.frombuffer(table.center_y, dtype=np.float64),
+                table.envelope_array(),
+            )
+            table = table.select(mask)
+        return table
+
+    def _parse_gml(
+        self,
+        target: str,
+        zip_file: zipfile.ZipFile,
+        spatial_filter: SpatialFilter,
+    ) -> BuildingTable:
+        table = BuildingTable(geometry=self.geometry)
+        # uroのnamespaceとversionを取得
+        ns, version = self._detect_namespace(target, zip_file)
+        # コードリストはファイル内の建物で共通のため、ファイルごとに一度だけ取得する
+        codelist = _codelist_loader(target, zip_file)
+        # ストリーミングモードの場合は逐次パースする
+        if self.streaming:
+            self._parse_stream(
+                target, zip_file, codelist, ns, version, spatial_filter, table
+            )
+            return table
+        # XMLのオブジェクトとして読み込む
+        root = ET.fromstring(zip_file.read(target))
+        # パース処理を実施する
+        self._parse(root, target, codelist, ns, version, spatial_filter, table)
+        return table
+
     def _parse(
         self,
         root: ET.Element,
         target: str,
-        zip_file: zipfile.ZipFile,
+        codelist: Callable[[str], dict],
         ns: dict,
         version: int,
-    ) -> list:
-        # 返り値を作成
-        return_list = []
+        spatial_filter: SpatialFilter,
+        table: BuildingTable,
+    ):
         # core:cityObjectMemberの一覧を取得
         city_object_members = root.findall(".//core:cityObjectMember", ns)
         # core:cityObjectMemberごとに処理
         for city_object_member in city_object_members:
-            # bldg:Buildingを取得
-            building = city_object_member.find(".//bldg:Building", ns)
-            # gml:idを取得
-            gid = building.get("{http://www.opengis.net/gml}id")
-            # bldg:mesuredHeightを取得
-            try:
-                measured_height = float(
-                    city_object_member.find(".//bldg:measuredHeight", ns).text
-                )
-            except AttributeError:
-                print("bldg:measuredHeight is NoneType in", gid, "in", target)
-                measured_height = None
-            # uro:BuildingDetails(v1) もしくは uro:buildingDetailAttribute(v2以降)を取得
-            if version == 1:
-                building_detail_attribute = city_object_member.find(
-                    ".//uro:BuildingDetails", ns
-                )
-            else:
-                building_detail_attribute = city_object_member.find(
-                    ".//uro:buildingDetailAttribute", ns
-                )
-            # uro:buildingStructureTypeを取得
+            self._parse_city_object_member(
+                city_object_member, target, codelist, ns, version, spatial_filter, table
+            )
+
+    def _detect_namespace(self, target: str, zip_file: zipfile.ZipFile) -> tuple:
+        # アーカイブ内のファイルはuroのversionが共通のため、アーカイブ単位でキャッシュする
+        uri, version = uro_namespace_cache.get(
+            zip_file, "uro", lambda: self._sniff_namespace(target, zip_file)
+        )
+        # namespaceを作成
+        ns = dict(BASE_NAMESPACES)
+        ns["uro"] = uri
+        return ns, version
+
+    def _sniff_namespace(self, target: str, zip_file: zipfile.ZipFile) -> tuple:
+        # ルート要素が開くまでファイルの先頭だけを読み込み、namespace宣言を集める
+        declared = set()
+        parser = ET.XMLPullParser(events=("start-ns", "start"))
+        with zip_file.open(target) as f:
+            found_root = False
+            while not found_root:
+                chunk = f.read(SNIFF_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == "start-ns":
+                        declared.add(elem[1])
+                    else:
+                        found_root = True
+                        break
+        # 優先順にuroのnamespaceを判定する
+        for uri, version in URO_NAMESPACES:
+            if uri in declared:
+                return uri, version
+        # versionが判定できないならエラーとする
+        raise ValueError("version is None")
+
+    def _parse_stream(
+        self,
+        target: str,
+        zip_file: zipfile.ZipFile,
+        codelist: Callable[[str], dict],
+        ns: dict,
+        version: int,
+        spatial_filter: SpatialFilter,
+        table: BuildingTable,
+    ):
+        root = None
+        with zip_file.open(target) as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    # ルート要素を保持する
+                    if root is None:
+                        root = elem
+                elif elem.tag == CITY_OBJECT_MEMBER_TAG:
+                    # core:cityObjectMemberが閉じたらパースする
+                    self._parse_city_object_member(
+                        elem, target, codelist, ns, version, spatial_filter, table
+                    )
+                    # パース済みの要素を破棄してメモリを解放する
+                    root.clear()
+
+    def _parse_city_object_member(
+        self,
+        city_object_member: ET.Element,
+        target: str,
+        codelist: Callable[[str], dict],
+        ns: dict,
+        version: int,
+        spatial_filter: SpatialFilter,
+        table: BuildingTable,
+    ):
+        # bldg:Buildingを取得
+        building = city_object_member.find(".//bldg:Building", ns)
+        # gml:idを取得
+        gid = building.get("{http://www.opengis.net/gml}id")
+        # bldg:lod1Solidを取得
+        lod1_solid = city_object_member.find(".//bldg:lod1Solid", ns)
+        # 最も低い面(底面)の座標と高さ
+        footprint = None
+        min_height = 10000
+        # gml:posListを取得
+        pos_lists = lod1_solid.findall(".//gml:posList", ns)
+        for pos_list in pos_lists:
+            # posListをパース
+            coordinates = self._parse_pos_list(pos_list.text)
+            max_height = coordinates[:, 2].max()
+            if max_height < min_height:
+                footprint = coordinates
+                min_height = max_height
+        center = None
+        if footprint is not None:
+            # 底面の重心を中心座標とする(lon, latの順番にする)
+            center = list(_ring_centroid(footprint[:, 1], footprint[:, 0]))
+        # ポリゴンの範囲外の建物は属性を取得せずに除外する
+        if spatial_filter is not None:
+            if center is None or not spatial_filter.contains(
+                footprint[:, 1::-1], center
+            ):
+                return
+        # bldg:mesuredHeightを取得
+        try:
+            measured_height = float(
+                city_object_member.find(".//bldg:measuredHeight", ns).text
+            )
+        except AttributeError:
+            print("bldg:measuredHeight is NoneType in", gid, "in", target)
+            measured_height = None
+        # uro:BuildingDetails(v1) もしくは uro:buildingDetailAttribute(v2以降)を取得
+        if version == 1:
+            building_detail_attribute = city_object_member.find(
+                ".//uro:BuildingDetails", ns
+            )
+        else:
+            building_detail_attribute = city_object_member.find(
+                ".//uro:buildingDetailAttribute", ns
+            )
+        # uro:buildingStructureTypeを取得
+        building_structure_type = None
+        if building_detail_attribute is not None:
             building_structure_type = building_detail_attribute.find(
                 ".//uro:buildingStructureType", ns
             )
-            # uro:codeSpaceを取得
-            try:
-                code_space = building_structure_type.get("codeSpace")
-                # codeSpaceから値を取得
-                code_space_path = os.path.normpath(
-                    os.path.join(target, "..", code_space)
-                )
-                code_space_root = ET.fromstring(zip_file.read(code_space_path))
-                building_structure_type_text = None
-                for code_space_root_root_child in code_space_root.findall(
-                    ".//gml:dictionaryEntry", ns
-                ):
-                    gml_name = code_space_root_root_child.find(".//gml:name", ns)
-                    if str(gml_name.text) == str(building_structure_type.text):
-                        building_structure_type_text = str(
-                            code_space_root_root_child.find(
-                                ".//gml:description", ns
-                            ).text
-                        )
-                        break
-            except AttributeError:
-                print("uro:buildingStructureType is NoneType in", gid, "in", target)
-                building_structure_type_text = None
-            try:
-                # bldg:usageを取得
-                usage = city_object_member.find(".//bldg:usage", ns)
-                # bldg:usageのdescriptionを取得
-                usage_xml_path = os.path.normpath(
-                    os.path.join(target, "..", "../../codelists/Building_usage.xml")
-                )
-                usage_xml_root = ET.fromstring(zip_file.read(usage_xml_path))
-                usage_text = None
-                for usage_xml_root_child in usage_xml_root.findall(
-                    ".//gml:dictionaryEntry", ns
-                ):
-                    gml_name = usage_xml_root_child.find(".//gml:name", ns)
-                    if str(gml_name.text) == str(usage.text):
-                        usage_text = str(
-                            usage_xml_root_child.find(".//gml:description", ns).text
-                        )
-                        break
-            except AttributeError:
-                print("bldg:usage is NoneType in", gid, "in", target)
-                usage_text = None
-            # bldg:lod1Solidを取得
-            lod1_solid = city_object_member.find(".//bldg:lod1Solid", ns)
-            # 返り値に入る値を作成
-            return_value = {
-                "gid": gid,
-                "center": None,
-                "min_height": 10000,
-                "measured_height": measured_height,
-                "building_structure_type": building_structure_type_text,
-                "usage": usage_text,
-            }
-            # gml:posListを取得
-            pos_lists = lod1_solid.findall(".//gml:posList", ns)
-            for poi_list in pos_lists:
-                # posListをパース
-                polygon, max_height = self._parse_poi_list(poi_list.text)
-                if max_height < return_value["min_height"]:
-                    # 返り値に追加
-                    return_value["center"] = [polygon.centroid.x, polygon.centroid.y]
-                    return_value["min_height"] = max_height
-            # 返り値を追加
-            return_list.append(return_value)
-        # 返り値を返す
-        return return_list
+        # uro:codeSpaceを取得
+        try:
+            code_space = building_structure_type.get("codeSpace")
+            # codeSpaceのコードリストから説明を取得
+            building_structure_type_text = codelist(code_space).get(
+                str(building_structure_type.text)
+            )
+        except AttributeError:
+            print("uro:buildingStructureType is NoneType in", gid, "in", target)
+            building_structure_type_text = None
+        try:
+            # bldg:usageを取得
+            usage = city_object_member.find(".//bldg:usage", ns)
+            # bldg:usageのdescriptionを取得
+            usage_text = codelist(USAGE_CODELIST).get(str(usage.text))
+        except AttributeError:
+            print("bldg:usage is NoneType in", gid, "in", target)
+            usage_text = None
+        # ジオメトリの出力が指定された場合のみPolygonを作成する
+        geometry = None
+        if self.geometry and footprint is not None:
+            geometry = Polygon(footprint[:, 1::-1])
+        # 底面の外接矩形(lon, latの順番)
+        envelope = None
+        if footprint is not None:
+            envelope = (
+                footprint[:, 1].min(),
+                footprint[:, 0].min(),
+                footprint[:, 1].max(),
+                footprint[:, 0].max(),
+            )
+        # テーブルに追加
+        table.append(
+            gid,
+            center,
+            min_height,
+            measured_height,
+            building_structure_type_text,
+            usage_text,
+            geometry,
+            envelope,
+        )
 
-    def _parse_poi_list(self, poi_list: str) -> tuple[Polygon, float]:
-        # numpyの3次元配列に変換する
-        numbers = [float(x) for x in poi_list.split()]
-        num_numbers = len(numbers)
-        # 3で割り切れることを確認
-        if num_numbers % 3 != 0:
+    def _parse_pos_list(self, pos_list: str) -> np.ndarray:
+        # 空白で区切ってnumpyの配列に変換する(数値でない値はValueError)
+        numbers = np.array(pos_list.split(), dtype=np.float64)
+        # reshapeの前に3で割り切れることを確認
+        if numbers.size == 0 or numbers.size % 3 != 0:
             raise ValueError("poi_list is invalid")
-        array = np.array(numbers).reshape((-1, 3))
-        # max_heightを作成
-        max_height = np.max(array[:, 2])
-        # heightを削除
-        new_array = np.delete(array, 2, axis=1)
-        # Polygonを作成する際にlon, latの順番にする
-        list_of_points = [sublist[::-1] for sublist in new_array.tolist()]
-        polygon = Polygon(list_of_points)
-        # 返り値を返す
-        return polygon, max_height
+        # lat, lon, heightの3次元配列にする
+        return numbers.reshape((-1, 3))
+
+
+def _codelist_loader(target: str, zip_file: zipfile.ZipFile) -> Callable[[str], dict]:
+    """対象ファイルから相対パスで参照するコードリストを読み込む関数を返す
+
+    パスごとに一度だけload_codelistを呼び出し、以降は同じ辞書を返す
+
+    Parameters
+    ----------
+    target : str
+        zipファイル内の対象ファイルのパス
+    zip_file : zipfile.ZipFile
+        対象ファイルを含むzipファイル
+
+    Returns
+    -------
+    Callable[[str], dict]
+        相対パスからコードリストの辞書を返す関数
+    """
+    codelists = {}
+
+    def load(relative_path: str) -> dict:
+        if relative_path not in codelists:
+            path = os.path.normpath(os.path.join(target, "..", relative_path))
+            codelists[relative_path] = load_codelist(zip_file, path)
+        return codelists[relative_path]
+
+    return load
+
+
+def _ring_centroid(x: np.ndarray, y: np.ndarray) -> tuple:
+    """リングの重心を返す
+
+    shapely(GEOS)と同じく先頭の点を基準とした三角形分割で面積と重心を求めるため、
+    Polygon.centroidと同じ値になる
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        経度の配列
+    y : numpy.ndarray
+        緯度の配列
+
+    Returns
+    -------
+    tuple
+        重心の経度と緯度
+    """
+    # リングが閉じていなければ閉じる
+    if x[0] != x[-1] or y[0] != y[-1]:
+        x = np.append(x, x[0])
+        y = np.append(y, y[0])
+    x0, y0 = x[0], y[0]
+    x1, y1, x2, y2 = x[:-1], y[:-1], x[1:], y[1:]
+    # 三角形ごとの面積(2倍)
+    area2 = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    # GEOSと同じ順序で加算するため、逐次加算となるcumsumを利用する
+    area_sum = np.cumsum(area2)[-1]
+    if area_sum != 0.0:
+        center_x = np.cumsum(area2 * (x0 + x1 + x2))[-1] / 3 / area_sum
+        center_y = np.cumsum(area2 * (y0 + y1 + y2))[-1] / 3 / area_sum
+        return float(center_x), float(center_y)
+    # 面積が0の場合は線分の長さで重み付けした中点の平均とする
+    length = np.hypot(x2 - x1, y2 - y1)
+    length_sum = np.cumsum(length)[-1]
+    if length_sum != 0.0:
+        center_x = np.cumsum(length * ((x1 + x2) / 2))[-1] / length_sum
+        center_y = np.cumsum(length * ((y1 + y2) / 2))[-1] / length_sum
+        return float(center_x), float(center_y)
+    return float(x0), float(y0)
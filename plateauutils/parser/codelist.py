@@ -0,0 +1,59 @@
+from plateauutils.parser.archive_cache import ArchiveCache
+import xml.etree.ElementTree as ET
+import zipfile
+
+# コードリストで利用するnamespace
+GML_NS = {"gml": "http://www.opengis.net/gml"}
+
+# 複数回のパースで共有するコードリストのキャッシュ
+codelist_cache = ArchiveCache(maxsize=128)
+
+
+def parse_codelist(data: bytes) -> dict:
+    """コードリストのXMLをパースして、コードと説明の辞書を返す
+
+    Parameters
+    ----------
+    data : bytes
+        コードリストのXML
+
+    Returns
+    -------
+    dict
+        コード(gml:name)をキー、説明(gml:description)を値とする辞書
+    """
+    root = ET.fromstring(data)
+    codelist = {}
+    for dictionary_entry in root.iterfind(".//gml:dictionaryEntry", GML_NS):
+        gml_name = dictionary_entry.find(".//gml:name", GML_NS)
+        if gml_name is None:
+            continue
+        gml_description = dictionary_entry.find(".//gml:description", GML_NS)
+        description = None
+        if gml_description is not None:
+            description = str(gml_description.text)
+        # 同じコードが複数ある場合は先に出現したものを優先する
+        codelist.setdefault(str(gml_name.text), description)
+    return codelist
+
+
+def load_codelist(zip_file: zipfile.ZipFile, path: str) -> dict:
+    """zipファイル内のコードリストを読み込む
+
+    アーカイブとパスごとに一度だけパースし、結果はキャッシュされる
+
+    Parameters
+    ----------
+    zip_file : zipfile.ZipFile
+        コードリストを含むzipファイル
+    path : str
+        zipファイル内のコードリストのパス
+
+    Returns
+    -------
+    dict
+        コード(gml:name)をキー、説明(gml:description)を値とする辞書
+    """
+    return codelist_cache.get(
+        zip_file, path, lambda: parse_codelist(zip_file.read(path))
+    )
@@ -0,0 +1,854 @@
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import numpy as np
+import pandas as pd
+from plateauutils.parser.tile_archive import _read_varint
+from plateauutils.tile_list.tile_cover import _ranges
+import shapely
+from shapely import GeometryType
+from shapely.geometry import Polygon
+import struct
+
+# ジオメトリの種類(MVTのGeomType)
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+# ジオメトリの種類とshapelyのMulti*の型の対応
+MULTI_GEOMETRY_TYPES = {
+    POINT: GeometryType.MULTIPOINT,
+    LINESTRING: GeometryType.MULTILINESTRING,
+    POLYGON: GeometryType.MULTIPOLYGON,
+}
+
+# ジオメトリの種類とshapelyの構成要素の型の対応
+PART_GEOMETRY_TYPES = {
+    POINT: GeometryType.POINT,
+    LINESTRING: GeometryType.LINESTRING,
+    POLYGON: GeometryType.POLYGON,
+}
+
+# ジオメトリの種類とMulti*を作成する関数の対応
+MULTI_GEOMETRY_CONSTRUCTORS = {
+    POINT: shapely.multipoints,
+    LINESTRING: shapely.multilinestrings,
+    POLYGON: shapely.multipolygons,
+}
+
+# レイヤーのextentのデフォルト値
+DEFAULT_EXTENT = 4096
+
+# コマンドの種類
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+
+
+class MvtDecodeException(Exception):
+    pass
+
+
+class MvtFeatureTable(object):
+    """MVTの地物を列ごとに保持するクラス
+
+    ジオメトリは経度緯度の座標の配列と、リング、パーツ、地物ごとのオフセットで保持する
+    (GeoArrowのMulti*と同じ構造)
+
+    * coords[ring_offsets[i]:ring_offsets[i + 1]]: i番目のリング(ラインストリング、点の集合)
+    * ring_offsets[part_offsets[j]:part_offsets[j + 1] + 1]: j番目のパーツのリング
+    * part_offsets[feature_offsets[k]:feature_offsets[k + 1] + 1]: k番目の地物のパーツ
+
+    Parameters
+    ----------
+    layers : list
+        レイヤー名のリスト
+    layer : numpy.ndarray
+        地物ごとのレイヤー名のインデックス
+    feature_id : numpy.ndarray
+        地物ごとのID(uint64、無い場合は0)
+    geometry_type : numpy.ndarray
+        地物ごとのジオメトリの種類(1: 点、2: 線、3: 面)
+    coords : numpy.ndarray
+        経度緯度の(点の数, 2)の配列
+    ring_offsets : numpy.ndarray
+        リングごとの座標の開始位置
+    part_offsets : numpy.ndarray
+        パーツごとのリングの開始位置
+    feature_offsets : numpy.ndarray
+        地物ごとのパーツの開始位置
+    properties : dict
+        属性名をキー、地物ごとの値の配列(値が無い場合はNone)を値とする辞書
+    """
+
+    def __init__(
+        self,
+        layers: list,
+        layer: np.ndarray,
+        feature_id: np.ndarray,
+        geometry_type: np.ndarray,
+        coords: np.ndarray,
+        ring_offsets: np.ndarray,
+        part_offsets: np.ndarray,
+        feature_offsets: np.ndarray,
+        properties: dict,
+    ):
+        self.layers = layers
+        self.layer = layer
+        self.feature_id = feature_id
+        self.geometry_type = geometry_type
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.part_offsets = part_offsets
+        self.feature_offsets = feature_offsets
+        self.properties = properties
+
+    @classmethod
+    def empty(cls) -> "MvtFeatureTable":
+        """地物が無いテーブルを返す"""
+        return cls(
+            [],
+            np.zeros(0, dtype=np.int32),
+            np.zeros(0, dtype=np.uint64),
+            np.zeros(0, dtype=np.uint8),
+            np.zeros((0, 2), dtype=np.float64),
+            np.zeros(1, dtype=np.int64),
+            np.zeros(1, dtype=np.int64),
+            np.zeros(1, dtype=np.int64),
+            {},
+        )
+
+    @classmethod
+    def concat(cls, tables: list) -> "MvtFeatureTable":
+        """複数のテーブルを順に結合する
+
+        Parameters
+        ----------
+        tables : list
+            MvtFeatureTableのリスト
+
+        Returns
+        -------
+        MvtFeatureTable
+            結合したテーブル
+        """
+        tables = [table for table in tables if len(table) > 0]
+        if len(tables) == 0:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+        # レイヤー名を統合してインデックスを振り直す
+        layers = []
+        layer_index = {}
+        layer_columns = []
+        for table in tables:
+            mapping = []
+            for name in table.layers:
+                if name not in layer_index:
+                    layer_index[name] = len(layers)
+                    layers.append(name)
+                mapping.append(layer_index[name])
+            layer_columns.append(np.array(mapping, dtype=np.int32)[table.layer])
+        # オフセットは前のテーブルの末尾の位置だけずらす
+        ring_offsets = [np.zeros(1, dtype=np.int64)]
+        part_offsets = [np.zeros(1, dtype=np.int64)]
+        feature_offsets = [np.zeros(1, dtype=np.int64)]
+        coords_count = rings_count = parts_count = 0
+        for table in tables:
+            ring_offsets.append(table.ring_offsets[1:] + coords_count)
+            part_offsets.append(table.part_offsets[1:] + rings_count)
+            feature_offsets.append(table.feature_offsets[1:] + parts_count)
+            coords_count += len(table.coords)
+            rings_count += len(table.ring_offsets) - 1
+            parts_count += len(table.part_offsets) - 1
+        # 属性は全てのテーブルの属性名を持つ列にする
+        keys = []
+        for table in tables:
+            for key in table.properties:
+                if key not in keys:
+                    keys.append(key)
+        properties = {}
+        for key in keys:
+            columns = []
+            for table in tables:
+                column = table.properties.get(key)
+                if column is None:
+                    column = np.full(len(table), None, dtype=object)
+                columns.append(column)
+            properties[key] = np.concatenate(columns)
+        return cls(
+            layers,
+            np.concatenate(layer_columns),
+            np.concatenate([table.feature_id for table in tables]),
+            np.concatenate([table.geometry_type for table in tables]),
+            np.concatenate([table.coords for table in tables]),
+            np.concatenate(ring_offsets),
+            np.concatenate(part_offsets),
+            np.concatenate(feature_offsets),
+            properties,
+        )
+
+    def __len__(self) -> int:
+        return len(self.feature_id)
+
+    def take(self, indices: np.ndarray) -> "MvtFeatureTable":
+        """指定した位置の地物のテーブルを返す
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            地物の位置の配列
+
+        Returns
+        -------
+        MvtFeatureTable
+            指定した順序の地物のテーブル
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        part_counts = self.feature_offsets[indices + 1] - self.feature_offsets[indices]
+        parts = _ranges(self.feature_offsets[indices], part_counts)
+        ring_counts = self.part_offsets[parts + 1] - self.part_offsets[parts]
+        rings = _ranges(self.part_offsets[parts], ring_counts)
+        coord_counts = self.ring_offsets[rings + 1] - self.ring_offsets[rings]
+        coords = self.coords[_ranges(self.ring_offsets[rings], coord_counts)]
+        return MvtFeatureTable(
+            self.layers,
+            self.layer[indices],
+            self.feature_id[indices],
+            self.geometry_type[indices],
+            coords,
+            _offsets(coord_counts),
+            _offsets(ring_counts),
+            _offsets(part_counts),
+            {key: column[indices] for key, column in self.properties.items()},
+        )
+
+    def select(self, mask: np.ndarray) -> "MvtFeatureTable":
+        """条件に一致する地物のテーブルを返す
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            地物ごとのboolの配列
+
+        Returns
+        -------
+        MvtFeatureTable
+            条件に一致する地物のテーブル
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def geometries(self) -> np.ndarray:
+        """地物ごとのshapelyのジオメトリ(Multi*)の配列を返す
+
+        Returns
+        -------
+        numpy.ndarray
+            MultiPoint、MultiLineString、MultiPolygonの配列
+        """
+        result = np.empty(len(self), dtype=object)
+        for geometry_type in np.unique(self.geometry_type):
+            indices = np.flatnonzero(self.geometry_type == geometry_type)
+            table = self.take(indices)
+            # パーツの開始位置からリング、座標の開始位置を求める
+            parts = table.part_offsets[table.feature_offsets]
+            if geometry_type == POLYGON:
+                offsets = (
+                    table.ring_offsets,
+                    table.part_offsets,
+                    table.feature_offsets,
+                )
+            elif geometry_type == LINESTRING:
+                offsets = (table.ring_offsets, parts)
+            else:
+                offsets = (table.ring_offsets[parts],)
+            result[indices] = shapely.from_ragged_array(
+                MULTI_GEOMETRY_TYPES[int(geometry_type)], table.coords, offsets
+            )
+        return result
+
+    def with_geometries(self, geometries: np.ndarray) -> "MvtFeatureTable":
+        """ジオメトリを置き換えたテーブルを返す
+
+        Parameters
+        ----------
+        geometries : numpy.ndarray
+            地物ごとのジオメトリ(geometry_typeに対応するMulti*もしくはNone)
+
+        Returns
+        -------
+        MvtFeatureTable
+            ジオメトリを置き換えたテーブル
+        """
+        tables = []
+        order = []
+        for geometry_type in np.unique(self.geometry_type):
+            indices = np.flatnonzero(self.geometry_type == geometry_type)
+            table = self.take(indices)
+            if shapely.is_missing(geometries[indices]).all():
+                # 全て空の場合はパーツを持たない地物にする
+                table.coords = np.zeros((0, 2), dtype=np.float64)
+                table.ring_offsets = np.zeros(1, dtype=np.int64)
+                table.part_offsets = np.zeros(1, dtype=np.int64)
+                table.feature_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+                tables.append(table)
+                order.append(indices)
+                continue
+            _, coords, offsets = shapely.to_ragged_array(
+                geometries[indices], include_z=False
+            )
+            if geometry_type == POLYGON:
+                ring_offsets, part_offsets, feature_offsets = offsets
+            elif geometry_type == LINESTRING:
+                ring_offsets, feature_offsets = offsets
+                part_offsets = np.arange(len(ring_offsets), dtype=np.int64)
+            else:
+                (ring_offsets,) = offsets
+                part_offsets = np.arange(len(ring_offsets), dtype=np.int64)
+                feature_offsets = part_offsets
+            table.coords = coords.astype(np.float64)
+            table.ring_offsets = ring_offsets.astype(np.int64)
+            table.part_offsets = part_offsets.astype(np.int64)
+            table.feature_offsets = feature_offsets.astype(np.int64)
+            tables.append(table)
+            order.append(indices)
+        if len(tables) == 0:
+            return self
+        # 元の地物の順序に戻す
+        table = MvtFeatureTable.concat(tables)
+        return table.take(np.argsort(np.concatenate(order), kind="stable"))
+
+    def to_pandas(self, geometry: bool = True) -> pd.DataFrame:
+        """pandasのDataFrameに変換する
+
+        Parameters
+        ----------
+        geometry : bool, optional
+            Trueの場合、shapelyのジオメトリの列を含める, by default True
+
+        Returns
+        -------
+        pandas.DataFrame
+            地物ごとの行を持つDataFrame
+        """
+        data = {
+            "layer": pd.Categorical.from_codes(self.layer, categories=self.layers),
+            "id": self.feature_id,
+            "geometry_type": self.geometry_type,
+        }
+        for key, column in self.properties.items():
+            data[key] = column
+        if geometry:
+            data["geometry"] = self.geometries()
+        return pd.DataFrame(data)
+
+
+def decode_tile(data: bytes, tile: str) -> MvtFeatureTable:
+    """MVTタイルを復号する
+
+    Parameters
+    ----------
+    data : bytes
+        タイルの内容(gzipで圧縮されていても良い)
+    tile : str
+        タイルのパス(z/x/y.mvt)
+
+    Returns
+    -------
+    MvtFeatureTable
+        経度緯度に変換した地物のテーブル
+    """
+    zoom, tile_x, tile_y = [int(i) for i in tile.split(".")[0].split("/")[-3:]]
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    try:
+        return _decode_tile(data, zoom, tile_x, tile_y)
+    except (IndexError, struct.error):
+        raise MvtDecodeException(f"tile is truncated: {tile}")
+
+
+def decode_tiles(tiles: dict, workers: int = 1) -> MvtFeatureTable:
+    """複数のMVTタイルを復号して結合する
+
+    Parameters
+    ----------
+    tiles : dict
+        タイルのパス(z/x/y.mvt)をキー、内容を値とする辞書
+    workers : int, optional
+        並列に復号するプロセス数, by default 1
+
+    Returns
+    -------
+    MvtFeatureTable
+        タイルの順に結合した地物のテーブル
+    """
+    if workers > 1 and len(tiles) > 1:
+        # 結果はtilesの順序で結合する
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tables = list(executor.map(decode_tile, tiles.values(), tiles.keys()))
+    else:
+        tables = [decode_tile(data, tile) for tile, data in tiles.items()]
+    return MvtFeatureTable.concat(tables)
+
+
+def merge_split_features(table: MvtFeatureTable) -> MvtFeatureTable:
+    """タイルの境界で分割された地物を結合する
+
+    同じレイヤー、ジオメトリの種類、ID(0以外)を持つ地物を1つにまとめる
+    属性は最初に出現した地物のものを利用する
+
+    Parameters
+    ----------
+    table : MvtFeatureTable
+        地物のテーブル
+
+    Returns
+    -------
+    MvtFeatureTable
+        結合した地物のテーブル
+    """
+    candidates = np.flatnonzero(table.feature_id != 0)
+    if len(candidates) < 2:
+        return table
+    # レイヤー、ジオメトリの種類、IDで並べ替えて、同じキーが続く範囲を求める
+    order = candidates[
+        np.lexsort(
+            (
+                candidates,
+                table.feature_id[candidates],
+                table.geometry_type[candidates],
+                table.layer[candidates],
+            )
+        )
+    ]
+    same = (
+        (table.layer[order[1:]] == table.layer[order[:-1]])
+        & (table.geometry_type[order[1:]] == table.geometry_type[order[:-1]])
+        & (table.feature_id[order[1:]] == table.feature_id[order[:-1]])
+    )
+    if not same.any():
+        return table
+    boundaries = np.flatnonzero(np.concatenate(([True], ~same, [True])))
+    geometries = table.geometries()
+    keep = np.ones(len(table), dtype=bool)
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        if end - start < 2:
+            continue
+        group = order[start:end]
+        geometry_type = int(table.geometry_type[group[0]])
+        merged = shapely.union_all(geometries[group])
+        if geometry_type == LINESTRING:
+            merged = shapely.line_merge(merged)
+        geometries[group[0]] = _normalize(np.array([merged]), geometry_type)[0]
+        keep[group[1:]] = False
+    return table.with_geometries(geometries).select(keep)
+
+
+def filter_features(table: MvtFeatureTable, polygon: Polygon) -> MvtFeatureTable:
+    """ポリゴンと交差する地物のみを残す
+
+    Parameters
+    ----------
+    table : MvtFeatureTable
+        地物のテーブル
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン
+
+    Returns
+    -------
+    MvtFeatureTable
+        ポリゴンと交差する地物のテーブル
+    """
+    if len(table) == 0:
+        return table
+    shapely.prepare(polygon)
+    return table.select(shapely.intersects(polygon, table.geometries()))
+
+
+def clip_features(table: MvtFeatureTable, polygon: Polygon) -> MvtFeatureTable:
+    """地物をポリゴンで切り抜く
+
+    切り抜いた結果が空になった地物は除外する
+
+    Parameters
+    ----------
+    table : MvtFeatureTable
+        地物のテーブル
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン
+
+    Returns
+    -------
+    MvtFeatureTable
+        切り抜いた地物のテーブル
+    """
+    if len(table) == 0:
+        return table
+    table = filter_features(table, polygon)
+    clipped = shapely.intersection(table.geometries(), polygon)
+    geometries = np.empty(len(table), dtype=object)
+    for geometry_type in np.unique(table.geometry_type):
+        indices = np.flatnonzero(table.geometry_type == geometry_type)
+        geometries[indices] = _normalize(clipped[indices], int(geometry_type))
+    table = table.with_geometries(geometries)
+    return table.select(table.feature_offsets[1:] > table.feature_offsets[:-1])
+
+
+def _normalize(geometries: np.ndarray, geometry_type: int) -> np.ndarray:
+    # 演算結果から対応する次元の要素のみを取り出してMulti*にする(無ければNone)
+    parts, indices = shapely.get_parts(geometries, return_index=True)
+    # Multi*を含むGeometryCollectionの場合に備えてもう一度分解する
+    parts, sub_indices = shapely.get_parts(parts, return_index=True)
+    indices = indices[sub_indices]
+    wanted = (shapely.get_type_id(parts) == PART_GEOMETRY_TYPES[geometry_type]) & (
+        ~shapely.is_empty(parts)
+    )
+    result = np.empty(len(geometries), dtype=object)
+    if wanted.any():
+        MULTI_GEOMETRY_CONSTRUCTORS[geometry_type](
+            parts[wanted], indices=indices[wanted], out=result
+        )
+    return result
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    # 個数の配列から開始位置の配列を作成する
+    return np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+
+
+def _fields(data: bytes, start: int, end: int):
+    # protobufのメッセージのフィールドを順に返す
+    # 長さ付きのフィールドの値は(開始位置, 終了位置)とする
+    pos = start
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type == 1:
+            value = data[pos : pos + 8]
+            pos += 8
+        elif wire_type == 5:
+            value = data[pos : pos + 4]
+            pos += 4
+        else:
+            raise MvtDecodeException(f"unsupported wire type: {wire_type}")
+        if pos > end:
+            raise IndexError(pos)
+        yield field, wire_type, value
+
+
+def _decode_varints(data: np.ndarray) -> np.ndarray:
+    # packedのvarintの列をまとめて復号する
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    if data[-1] >= 0x80:
+        raise IndexError(len(data))
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    values = (data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(values, starts)
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    # zigzag符号化された値を符号付き整数に戻す
+    values = values.astype(np.int64)
+    return (values >> 1) ^ -(values & 1)
+
+
+def _decode_value(data: bytes, start: int, end: int):
+    # Valueメッセージを復号する
+    value = None
+    for field, _, raw in _fields(data, start, end):
+        if field == 1:
+            value = data[raw[0] : raw[1]].decode("utf-8")
+        elif field == 2:
+            value = struct.unpack("<f", raw)[0]
+        elif field == 3:
+            value = struct.unpack("<d", raw)[0]
+        elif field == 4:
+            # int64は2の補数で符号化される
+            value = raw - (1 << 64) if raw >= 1 << 63 else raw
+        elif field == 5:
+            value = raw
+        elif field == 6:
+            value = (raw >> 1) ^ -(raw & 1)
+        elif field == 7:
+            value = bool(raw)
+    return value
+
+
+def _decode_tile(data: bytes, zoom: int, tile_x: int, tile_y: int) -> MvtFeatureTable:
+    layers = []
+    layer_column = []
+    feature_ids = []
+    geometry_types = []
+    extents = []
+    geometry_starts = []
+    geometry_lengths = []
+    tag_starts = []
+    tag_lengths = []
+    # 全てのレイヤーのキーと値、レイヤーごとの開始位置
+    all_keys = []
+    all_values = []
+    key_offsets = [0]
+    value_offsets = [0]
+    for field, _, value in _fields(data, 0, len(data)):
+        if field != 3:
+            continue
+        # Layerメッセージ
+        name = ""
+        extent = DEFAULT_EXTENT
+        features = []
+        for layer_field, _, layer_value in _fields(data, *value):
+            if layer_field == 1:
+                name = data[layer_value[0] : layer_value[1]].decode("utf-8")
+            elif layer_field == 2:
+                features.append(layer_value)
+            elif layer_field == 3:
+                all_keys.append(data[layer_value[0] : layer_value[1]].decode("utf-8"))
+            elif layer_field == 4:
+                all_values.append(_decode_value(data, *layer_value))
+            elif layer_field == 5:
+                extent = layer_value
+        layer_code = len(layers)
+        layers.append(name)
+        key_offsets.append(len(all_keys))
+        value_offsets.append(len(all_values))
+        for feature in features:
+            # Featureメッセージ
+            feature_id = 0
+            geometry_type = 0
+            tags = (0, 0)
+            geometry = None
+            for feature_field, _, feature_value in _fields(data, *feature):
+                if feature_field == 1:
+                    feature_id = feature_value
+                elif feature_field == 2:
+                    tags = feature_value
+                elif feature_field == 3:
+                    geometry_type = feature_value
+                elif feature_field == 4:
+                    geometry = feature_value
+            # 種類が不明、もしくはジオメトリが無い地物は除外する
+            if geometry_type not in MULTI_GEOMETRY_TYPES or geometry is None:
+                continue
+            layer_column.append(layer_code)
+            feature_ids.append(feature_id)
+            geometry_types.append(geometry_type)
+            extents.append(extent)
+            geometry_starts.append(geometry[0])
+            geometry_lengths.append(geometry[1] - geometry[0])
+            tag_starts.append(tags[0])
+            tag_lengths.append(tags[1] - tags[0])
+    if len(feature_ids) == 0:
+        return MvtFeatureTable.empty()
+    layer_column = np.array(layer_column, dtype=np.int32)
+    geometry_types = np.array(geometry_types, dtype=np.uint8)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    # 全ての地物のジオメトリをまとめて復号する
+    packed = buffer[_ranges(geometry_starts, geometry_lengths)]
+    commands = _decode_varints(packed)
+    # 地物ごとのコマンド列の開始位置(終端バイトの数から求める)
+    terminators = _offsets(packed < 0x80)
+    command_offsets = terminators[_offsets(geometry_lengths)]
+    ring_feature, segment_ring, segment_starts, segment_counts = _read_commands(
+        commands, command_offsets, geometry_types
+    )
+    # パラメーターを差分から絶対座標に変換する(地物ごとに原点から累積する)
+    deltas = _zigzag(commands[_ranges(segment_starts, segment_counts * 2)])
+    cumulative = np.cumsum(deltas.reshape((-1, 2)), axis=0)
+    point_feature = np.repeat(ring_feature[segment_ring], segment_counts)
+    feature_start = np.searchsorted(point_feature, point_feature)
+    base = np.where(
+        (feature_start > 0)[:, None], cumulative[np.maximum(feature_start - 1, 0)], 0
+    )
+    points = (cumulative - base).astype(np.float64)
+    # リングごとの点の数、ポリゴンのリングは始点を末尾に追加して閉じる
+    ring_points = np.bincount(
+        segment_ring, weights=segment_counts, minlength=len(ring_feature)
+    ).astype(np.int64)
+    ring_types = geometry_types[ring_feature]
+    closed = (ring_types == POLYGON).astype(np.int64)
+    ring_starts = _offsets(ring_points)[:-1]
+    lengths = ring_points + closed
+    take = _ranges(ring_starts, lengths)
+    local = take - np.repeat(ring_starts, lengths)
+    take = np.where(
+        local == np.repeat(ring_points, lengths), np.repeat(ring_starts, lengths), take
+    )
+    coords = points[take]
+    ring_offsets = _offsets(lengths)
+    # ポリゴンのリングの面積(タイル座標、正なら外周、負なら穴)
+    cross = np.zeros(len(coords))
+    if len(coords) > 1:
+        cross[:-1] = coords[:-1, 0] * coords[1:, 1] - coords[1:, 0] * coords[:-1, 1]
+    cross = _offsets(cross)
+    area = cross[np.maximum(ring_offsets[1:] - 1, 0)] - cross[ring_offsets[:-1]]
+    # 不正なリング(面積0のポリゴンのリング、点が2つ未満の線)を除外する
+    valid = np.where(
+        ring_types == POLYGON,
+        area != 0,
+        np.where(ring_types == LINESTRING, ring_points >= 2, ring_points >= 1),
+    )
+    rings = np.flatnonzero(valid)
+    coords = coords[_ranges(ring_offsets[rings], lengths[rings])]
+    ring_offsets = _offsets(lengths[rings])
+    ring_feature = ring_feature[rings]
+    area = area[rings]
+    ring_types = ring_types[rings]
+    # パーツの開始となるリング(地物の先頭、ポリゴンの外周、線と点は全て)
+    first_ring = np.ones(len(rings), dtype=bool)
+    first_ring[1:] = ring_feature[1:] != ring_feature[:-1]
+    part_start = first_ring | (ring_types != POLYGON) | (area > 0)
+    part_offsets = np.concatenate((np.flatnonzero(part_start), [len(rings)])).astype(
+        np.int64
+    )
+    part_feature = ring_feature[part_start]
+    part_counts = np.bincount(part_feature, minlength=len(feature_ids))
+    feature_offsets = _offsets(part_counts)
+    # 経度緯度に変換する
+    extent = np.repeat(np.array(extents, dtype=np.float64), np.diff(feature_offsets))
+    extent = np.repeat(extent, np.diff(part_offsets))
+    extent = np.repeat(extent, np.diff(ring_offsets))
+    n = float(2**zoom)
+    x = (tile_x + coords[:, 0] / extent) / n
+    y = (tile_y + coords[:, 1] / extent) / n
+    coords = np.empty((len(x), 2), dtype=np.float64)
+    coords[:, 0] = x * 360.0 - 180.0
+    coords[:, 1] = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * y))))
+    # 全ての地物のタグをまとめて復号し、属性の列にする
+    properties = _read_tags(
+        buffer[_ranges(tag_starts, tag_lengths)],
+        np.array(tag_lengths, dtype=np.int64),
+        layer_column,
+        np.array(key_offsets, dtype=np.int64),
+        np.array(value_offsets, dtype=np.int64),
+        all_keys,
+        all_values,
+    )
+    table = MvtFeatureTable(
+        layers,
+        layer_column,
+        np.array(feature_ids, dtype=np.uint64),
+        geometry_types,
+        coords,
+        ring_offsets,
+        part_offsets,
+        feature_offsets,
+        properties,
+    )
+    # ジオメトリが残らなかった地物を除外する
+    if (part_counts == 0).any():
+        table = table.select(part_counts > 0)
+    return table
+
+
+def _read_commands(
+    commands: np.ndarray, command_offsets: np.ndarray, geometry_types: np.ndarray
+) -> tuple:
+    # コマンド列を読み、リングとパラメーターの範囲を返す
+    # パラメーターの範囲(セグメント)は開始位置と点の数で表す
+    size = len(commands)
+    feature_sizes = np.diff(command_offsets)
+    feature_ends = np.repeat(command_offsets[1:], feature_sizes)
+    command_ids = (commands & np.uint64(7)).astype(np.int64)
+    command_counts = np.minimum(commands >> np.uint64(3), size).astype(np.int64)
+    # 各位置をコマンドとみなした場合の次のコマンドの位置
+    params = (command_ids == MOVE_TO) | (command_ids == LINE_TO)
+    following = np.arange(1, size + 1) + np.where(params, command_counts * 2, 0)
+    # 地物の先頭のコマンドから辿れる位置を、移動量を倍にしながら求める
+    # 地物の末尾を越えた先はsizeとする
+    jump = np.append(np.where(following < feature_ends, following, size), size)
+    positions = command_offsets[:-1][feature_sizes > 0]
+    while True:
+        reached = np.union1d(positions, jump[positions])
+        reached = reached[reached < size]
+        if len(reached) == len(positions):
+            break
+        positions = reached
+        jump = jump[jump]
+    if (following[positions] > feature_ends[positions]).any():
+        raise IndexError(size)
+    ids = command_ids[positions]
+    counts = command_counts[positions]
+    unknown = (ids != MOVE_TO) & (ids != LINE_TO) & (ids != CLOSE_PATH)
+    if unknown.any():
+        raise MvtDecodeException(f"unknown command: {ids[unknown][0]}")
+    features = np.repeat(np.arange(len(feature_sizes)), feature_sizes)[positions]
+    # 点以外のMoveToは点ごとにリングを開始する
+    # 点の場合は1つのMoveToの点をまとめて1つのリングとする
+    split = (ids == MOVE_TO) & (geometry_types[features] != POINT)
+    segments_per_command = np.where(split, counts, (ids != CLOSE_PATH).astype(np.int64))
+    command_index = np.repeat(np.arange(len(positions)), segments_per_command)
+    step = _ranges(np.zeros(len(positions), dtype=np.int64), segments_per_command)
+    segment_starts = positions[command_index] + 1 + step * 2
+    segment_counts = np.where(split[command_index], 1, counts[command_index])
+    new_ring = ids[command_index] == MOVE_TO
+    segment_ring = np.cumsum(new_ring) - 1
+    segment_feature = features[command_index]
+    ring_feature = segment_feature[new_ring]
+    # LineToは同じ地物のMoveToで開始したリングに続ける
+    line_to = ~new_ring
+    if line_to.any() and (
+        (segment_ring[line_to] < 0).any()
+        or (
+            ring_feature[np.maximum(segment_ring[line_to], 0)]
+            != segment_feature[line_to]
+        ).any()
+    ):
+        raise MvtDecodeException("LineTo without MoveTo")
+    return ring_feature, segment_ring, segment_starts, segment_counts
+
+
+def _read_tags(
+    packed: np.ndarray,
+    tag_lengths: np.ndarray,
+    feature_layers: np.ndarray,
+    key_offsets: np.ndarray,
+    value_offsets: np.ndarray,
+    keys: list,
+    values: list,
+) -> dict:
+    # 地物ごとのキーと値の番号の組を読み、キーの名前ごとの列を返す
+    tags = _decode_varints(packed)
+    tag_counts = np.diff(_offsets(packed < 0x80)[_offsets(tag_lengths)])
+    pair_counts = tag_counts // 2
+    pair_feature = np.repeat(np.arange(len(tag_counts)), pair_counts)
+    first = _ranges(_offsets(tag_counts)[:-1], pair_counts * 2)
+    key_index = tags[first[0::2]]
+    value_index = tags[first[1::2]]
+    layers = feature_layers[pair_feature]
+    key_start = key_offsets[layers]
+    value_start = value_offsets[layers]
+    if (key_index >= (key_offsets[layers + 1] - key_start).astype(np.uint64)).any() or (
+        value_index >= (value_offsets[layers + 1] - value_start).astype(np.uint64)
+    ).any():
+        raise IndexError(len(packed))
+    # 同じ名前のキーはレイヤーをまたいで1つの列とする
+    names = {}
+    key_columns = np.array(
+        [names.setdefault(key, len(names)) for key in keys], dtype=np.int64
+    )
+    names = list(names)
+    columns = key_columns[key_start + key_index.astype(np.int64)]
+    value_array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        value_array[i] = value
+    pair_values = value_array[value_start + value_index.astype(np.int64)]
+    properties = {}
+    if len(columns) == 0:
+        return properties
+    # 最初に現れた順に列を作成する(同じ地物で重複するキーは後の値とする)
+    order = np.argsort(columns, kind="stable")
+    groups = np.split(order, np.flatnonzero(np.diff(columns[order])) + 1)
+    groups.sort(key=lambda group: group[0])
+    for group in groups:
+        column = np.full(len(tag_counts), None, dtype=object)
+        column[pair_feature[group]] = pair_values[group]
+        properties[names[columns[group[0]]]] = column
+    return properties
@@ -1,11 +1,25 @@
-import glob
 import os
 from plateauutils.abc.plateau_parser import PlateauParser
+from plateauutils.network.download_cache import DownloadCache
+from plateauutils.network.range_reader import open_zip_file
+from plateauutils.parser.archive_index import load_archive_index
+from plateauutils.parser.mvt_decoder import (
+    clip_features,
+    decode_tiles,
+    filter_features,
+    merge_split_features,
+)
+from plateauutils.parser.tile_archive import is_tile_archive, open_tile_archive
 from plateauutils.tile_list.polygon_to_tile_list import PolygonToTileList
 from shapely.geometry import Polygon
-import shutil
 import zipfile
 
+# parseの返り値の形式
+OUTPUT_FORMATS = ["path", "bytes", "features"]
+
+# タイルを格納するレイヤーのディレクトリ名
+TILE_LAYER = "luse"
+
 
 class MvtTileParser(PlateauParser):
     """MVTタイルをパースするクラス
@@ -16,10 +30,33 @@ class MvtTileParser(PlateauParser):
         対象となるポリゴン
     zoom : int
         対象とするズームレベル
+    output : str, optional
+        parseの返り値の形式, by default "path"
+
+        * path: 対象のタイルのみを展開し、タイルのパスのリストを返す
+        * bytes: 展開せず、タイル(z/x/y.mvt)をキー、内容を値とする辞書を返す
+        * features: 展開せずにタイルを復号し、地物のテーブル(MvtFeatureTable)を返す
+    clip : bool, optional
+        output="features"の場合、Trueなら地物をポリゴンで切り抜き、
+        Falseならポリゴンと交差する地物のみを残す, by default False
+    workers : int, optional
+        output="features"の場合に並列に復号するプロセス数, by default 1
     """
 
-    def __init__(self, polygon: Polygon = None, zoom: int = 15):
+    def __init__(
+        self,
+        polygon: Polygon = None,
+        zoom: int = 15,
+        output: str = "path",
+        clip: bool = False,
+        workers: int = 1,
+    ):
+        if output not in OUTPUT_FORMATS:
+            raise ValueError("output must be one of " + ", ".join(OUTPUT_FORMATS))
         self.zoom = zoom
+        self.output = output
+        self.clip = clip
+        self.workers = workers
         super().__init__(polygon)
 
     def parse(self, target_path: str = "") -> list:
@@ -28,57 +65,149 @@ class MvtTileParser(PlateauParser):
         Parameters
         ----------
         target_path : str
-            MVTタイル(zip)のパス
+            MVTタイル(zip)、MBTiles、PMTilesのパス
 
         Returns
         -------
         list
-            タイルのパスのリスト
+            タイルのパスのリスト(output="bytes"の場合はタイルと内容の辞書、
+            output="features"の場合は地物のテーブル)
         """
         # ファイルが存在しないならエラー
         if not os.path.exists(target_path):
             raise FileNotFoundError(f"target_path: {target_path} is not found")
-        # zipファイルにターゲットのパスが存在するか確認
-        hit_targets = []
-        with zipfile.ZipFile(target_path) as zip_file:
-            for name in zip_file.namelist():
-                for target in self.targets:
-                    path = os.path.join("luse", target)
-                    if name.find(path) >= 0:
-                        hit_targets.append(target)
-        if len(hit_targets) == 0:
-            raise ValueError(f"target_path: {target_path} is not target")
-        # zipファイルを解凍する
-        unarchived_dir = target_path.replace(".zip", "")
-        shutil.unpack_archive(target_path, unarchived_dir)
-        # 返り値を作成
-        return_list = []
-        # 解凍したファイルをパースする
-        for target in hit_targets:
-            # ファイルパスを作成
-            target_file_path = os.path.join(unarchived_dir, "luse", target)
-            for file_path in glob.glob(target_file_path):
-                return_list.append(file_path)
-        return sorted(return_list)
+        if is_tile_archive(target_path):
+            unarchived_dir = os.path.splitext(target_path)[0]
+        else:
+            unarchived_dir = target_path.replace(".zip", "")
+        return self._parse_file(target_path, unarchived_dir)
 
-    def download_and_parse(self, url: str = "", target_dir: str = "") -> list:
+    def download_and_parse(
+        self,
+        url: str = "",
+        target_dir: str = "",
+        remote: bool = False,
+        cache: DownloadCache = None,
+    ) -> list:
         """MVTタイルをダウンロードして、タイルのリストを返すメソッド
 
         Parameters
         ----------
         url : str
-            MVTタイル(zip)のURL
+            MVTタイル(zip)、MBTiles、PMTilesのURL
         target_dir : str
             ファイルを展開する先のパス
+            (remote=Trueの場合はoutput="path"のときのみ指定が必要)
+        remote : bool, optional
+            Trueの場合、zipファイル、PMTiles全体をダウンロードせず、Rangeリクエストで
+            対象のタイルのみを取得する(MBTilesは非対応), by default False
+        cache : DownloadCache or bool, optional
+            指定した場合はtarget_dirにダウンロードせず、ダウンロードキャッシュを利用する
+            Trueの場合は共有のダウンロードキャッシュ、Falseの場合は利用しない,
+            by default None
 
         Returns
         -------
         list
-            タイルのパスのリスト
+            タイルのパスのリスト(output="bytes"の場合はタイルと内容の辞書、
+            output="features"の場合は地物のテーブル)
         """
+        if remote and is_tile_archive(url):
+            # ダウンロードパスが無ければエラー
+            if self.output == "path" and not os.path.exists(target_dir):
+                raise FileNotFoundError(f"{target_dir} does not exist.")
+            filename = os.path.splitext(url.split("/")[-1])[0]
+            return self._parse_tile_archive(url, os.path.join(target_dir, filename))
+        if remote:
+            with open_zip_file(url) as zip_file:
+                hit_targets = self._hit_targets(zip_file, url)
+                if self.output != "path":
+                    return self._output(self._read(zip_file, hit_targets))
+                # ダウンロードパスが無ければエラー
+                if not os.path.exists(target_dir):
+                    raise FileNotFoundError(f"{target_dir} does not exist.")
+                filename = url.split("/")[-1]
+                unarchived_dir = os.path.join(target_dir, filename.replace(".zip", ""))
+                return self._extract(zip_file, hit_targets, unarchived_dir)
+        if cache:
+            # キャッシュ内には展開せず、target_dirに展開する
+            if self.output == "path" and not os.path.exists(target_dir):
+                raise FileNotFoundError(f"{target_dir} does not exist.")
+            filename = os.path.splitext(url.split("/")[-1])[0]
+            with self._open_cached(url, cache) as saved_path:
+                return self._parse_file(saved_path, os.path.join(target_dir, filename))
         saved_path = self._download(url, target_dir)
         return self.parse(saved_path)
 
+    def _parse_file(self, target_path: str, unarchived_dir: str):
+        # ローカルのファイルをパースし、output="path"の場合はunarchived_dirに展開する
+        if is_tile_archive(target_path):
+            return self._parse_tile_archive(target_path, unarchived_dir)
+        with zipfile.ZipFile(target_path) as zip_file:
+            # zipファイルにターゲットのパスが存在するか確認
+            hit_targets = self._hit_targets(zip_file, target_path)
+            if self.output != "path":
+                return self._output(self._read(zip_file, hit_targets))
+            # 対象のタイルのみを展開する
+            return self._extract(zip_file, hit_targets, unarchived_dir)
+
+    def _hit_targets(self, zip_file: zipfile.ZipFile, target_path: str) -> list:
+        # 索引からターゲットのタイルのファイルを取得
+        hit_targets = load_archive_index(zip_file).tile_members(
+            TILE_LAYER, self.targets
+        )
+        if len(hit_targets) == 0:
+            raise ValueError(f"target_path: {target_path} is not target")
+        return hit_targets
+
+    def _extract(
+        self, zip_file: zipfile.ZipFile, hit_targets: list, unarchived_dir: str
+    ) -> list:
+        # 対象のタイルのみを展開する
+        return_list = []
+        for target in hit_targets:
+            return_list.append(zip_file.extract(target, unarchived_dir))
+        return sorted(return_list)
+
+    def _read(self, zip_file: zipfile.ZipFile, hit_targets: list) -> dict:
+        # 展開せずにタイルの内容を読み込む
+        tiles = {}
+        for target in sorted(hit_targets):
+            tile = "/".join(target.split("/")[-3:])
+            tiles[tile] = zip_file.read(target)
+        return tiles
+
+    def _parse_tile_archive(self, target_path: str, unarchived_dir: str):
+        # MBTiles、PMTilesから索引を利用して対象のタイルのみを読み込む
+        with open_tile_archive(target_path) as reader:
+            tiles = reader.read_tiles(self.targets)
+        if len(tiles) == 0:
+            raise ValueError(f"target_path: {target_path} is not target")
+        if self.output != "path":
+            return self._output(tiles)
+        # zipファイルと同じくluse/z/x/y.mvtとして、対象のタイルのみを書き出す
+        return_list = []
+        for tile, data in tiles.items():
+            path = os.path.join(unarchived_dir, TILE_LAYER, *tile.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            return_list.append(path)
+        return sorted(return_list)
+
+    def _output(self, tiles: dict):
+        # output="features"の場合は復号する
+        if self.output == "features":
+            return self._decode(tiles)
+        return tiles
+
+    def _decode(self, tiles: dict):
+        # タイルを復号し、分割された地物を結合してからポリゴンで絞り込む
+        table = merge_split_features(decode_tiles(tiles, self.workers))
+        if self.clip:
+            return clip_features(table, self.polygon)
+        return filter_features(table, self.polygon)
+
     def _target_list(self, polygon: Polygon = None) -> list:
         # PolygonがNoneならエラー
         if polygon is None:
@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import os
+from plateauutils.network.range_reader import is_remote
+from plateauutils.parser.building_table import BuildingTable
+import tempfile
+import zipfile
+
+# キャッシュの形式のバージョン(形式を変更した場合は更新する)
+CACHE_FORMAT_VERSION = 2
+
+
+class ParseCache(object):
+    """GMLファイルのパース結果をディスクに保持するキャッシュ
+
+    zipファイルのパス、ファイル名、セントラルディレクトリのCRC32をキーとして、
+    GMLファイルごとにパース結果をnpz形式で保存する
+
+    Parameters
+    ----------
+    cache_dir : str
+        キャッシュを保存するディレクトリ
+    max_bytes : int, optional
+        キャッシュの合計サイズの上限, by default 1 GiB
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024**3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, archive_path: str, info: zipfile.ZipInfo) -> str:
+        """キャッシュファイルのパスを返す
+
+        Parameters
+        ----------
+        archive_path : str
+            zipファイルのパスもしくはURL
+        info : zipfile.ZipInfo
+            GMLファイルの情報
+
+        Returns
+        -------
+        str
+            キャッシュファイルのパス
+        """
+        key = "\0".join(
+            [
+                str(CACHE_FORMAT_VERSION),
+                (
+                    archive_path
+                    if is_remote(archive_path)
+                    else os.path.abspath(archive_path)
+                ),
+                info.filename,
+                f"{info.CRC:08x}",
+                str(info.file_size),
+            ]
+        )
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".npz")
+
+    def load(self, archive_path: str, info: zipfile.ZipInfo) -> BuildingTable:
+        """キャッシュからパース結果を読み込む
+
+        Parameters
+        ----------
+        archive_path : str
+            zipファイルのパス
+        info : zipfile.ZipInfo
+            GMLファイルの情報
+
+        Returns
+        -------
+        BuildingTable
+            パース結果、キャッシュが無い場合はNone
+        """
+        path = self.path(archive_path, info)
+        try:
+            table = BuildingTable.load(path)
+        except (OSError, ValueError, KeyError):
+            # 存在しない、もしくは壊れたキャッシュは無視する
+            return None
+        # 最近利用したものとして更新時刻を更新する
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return table
+
+    def save(self, archive_path: str, info: zipfile.ZipInfo, table: BuildingTable):
+        """パース結果をキャッシュに保存する
+
+        Parameters
+        ----------
+        archive_path : str
+            zipファイルのパス
+        info : zipfile.ZipInfo
+            GMLファイルの情報
+        table : BuildingTable
+            パース結果
+        """
+        path = self.path(archive_path, info)
+        # 一時ファイルに書き込んでから置き換える
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                table.save(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """合計サイズが上限を超えている場合、利用されていない順に削除する"""
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*.npz")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """キャッシュを全て削除する"""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.npz")):
+            os.remove(path)
@@ -0,0 +1,102 @@
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.geometry import Polygon
+
+
+class SpatialFilterException(Exception):
+    pass
+
+
+class SpatialFilter(object):
+    """ポリゴンとの位置関係で地物を絞り込むクラス
+
+    ポリゴンを構成する部分ごとにSTRtreeへ格納し、prepareしたジオメトリで判定する
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン(MultiPolygonも可)
+    predicate : str, optional
+        判定方法, by default "centroid"
+
+        * centroid: 中心座標がポリゴンと交差する地物を残す
+        * envelope: 外接矩形がポリゴンと交差する地物を残す
+    """
+
+    def __init__(self, polygon: Polygon, predicate: str = "centroid"):
+        if predicate not in ["centroid", "envelope"]:
+            raise SpatialFilterException("predicate must be one of centroid, envelope")
+        self.polygon = polygon
+        self.predicate = predicate
+        self._build()
+
+    def _build(self):
+        # ポリゴンを部分に分割してprepareする
+        self.parts = shapely.get_parts(self.polygon)
+        shapely.prepare(self.parts)
+        self.tree = STRtree(self.parts)
+
+    def __getstate__(self) -> dict:
+        # prepareの状態はpickleで保持されないため、ポリゴンと判定方法のみ保存する
+        return {"polygon": self.polygon, "predicate": self.predicate}
+
+    def __setstate__(self, state: dict):
+        self.polygon = state["polygon"]
+        self.predicate = state["predicate"]
+        self._build()
+
+    def contains(self, coordinates: np.ndarray, center: tuple) -> bool:
+        """地物がポリゴンの範囲内か判定する
+
+        Parameters
+        ----------
+        coordinates : numpy.ndarray
+            地物の座標(lon, latの2次元配列)
+        center : tuple
+            地物の中心座標(lon, lat)
+
+        Returns
+        -------
+        bool
+            範囲内であればTrue
+        """
+        if self.predicate == "centroid":
+            geometry = shapely.points(center)
+        else:
+            minx, miny = coordinates.min(axis=0)
+            maxx, maxy = coordinates.max(axis=0)
+            geometry = shapely.box(minx, miny, maxx, maxy)
+        return len(self.tree.query(geometry, predicate="intersects")) > 0
+
+    def mask(
+        self, center_x: np.ndarray, center_y: np.ndarray, envelope: np.ndarray
+    ) -> np.ndarray:
+        """複数の地物がポリゴンの範囲内か一括で判定する
+
+        Parameters
+        ----------
+        center_x : numpy.ndarray
+            中心の経度の配列
+        center_y : numpy.ndarray
+            中心の緯度の配列
+        envelope : numpy.ndarray
+            外接矩形(min_x, min_y, max_x, max_y)の(件数, 4)の配列
+
+        Returns
+        -------
+        numpy.ndarray
+            範囲内であればTrueとなるboolの配列
+        """
+        result = np.zeros(len(center_x), dtype=bool)
+        # 座標が無い地物は範囲外とする
+        indices = np.flatnonzero(~np.isnan(center_x))
+        if len(indices) == 0:
+            return result
+        if self.predicate == "centroid":
+            geometries = shapely.points(center_x[indices], center_y[indices])
+        else:
+            geometries = shapely.box(*envelope[indices].T)
+        hits = self.tree.query(geometries, predicate="intersects")
+        result[indices[np.unique(hits[0])]] = True
+        return result
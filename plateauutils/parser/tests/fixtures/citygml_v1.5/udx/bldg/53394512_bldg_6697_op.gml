@@ -0,0 +1,195 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<core:CityModel xmlns:brid="http://www.opengis.net/citygml/bridge/2.0" xmlns:tran="http://www.opengis.net/citygml/transportation/2.0" xmlns:frn="http://www.opengis.net/citygml/cityfurniture/2.0" xmlns:wtr="http://www.opengis.net/citygml/waterbody/2.0" xmlns:sch="http://www.ascc.net/xml/schematron" xmlns:veg="http://www.opengis.net/citygml/vegetation/2.0" xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:tun="http://www.opengis.net/citygml/tunnel/2.0" xmlns:tex="http://www.opengis.net/citygml/texturedsurface/2.0" xmlns:gml="http://www.opengis.net/gml" xmlns:app="http://www.opengis.net/citygml/appearance/2.0" xmlns:gen="http://www.opengis.net/citygml/generics/2.0" xmlns:dem="http://www.opengis.net/citygml/relief/2.0" xmlns:luse="http://www.opengis.net/citygml/landuse/2.0" xmlns:xAL="urn:oasis:names:tc:ciq:xsdschema:xAL:2.0" xmlns:uro="https://www.chisou.go.jp/tiiki/toshisaisei/itoshisaisei/iur/uro/1.5" xmlns:bldg="http://www.opengis.net/citygml/building/2.0" xmlns:smil20="http://www.w3.org/2001/SMIL20/" xmlns:pbase="http://www.opengis.net/citygml/profiles/base/2.0" xmlns:smil20lang="http://www.w3.org/2001/SMIL20/Language" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:grp="http://www.opengis.net/citygml/cityobjectgroup/2.0" xmlns:core="http://www.opengis.net/citygml/2.0">
+	<gml:boundedBy>
+		<gml:Envelope srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+			<gml:lowerCorner>35.675 139.65 0</gml:lowerCorner>
+			<gml:upperCorner>35.68333 139.6625 40</gml:upperCorner>
+		</gml:Envelope>
+	</gml:boundedBy>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0004">
+			<bldg:usage codeSpace="../../codelists/Building_usage.xml">412</bldg:usage>
+			<bldg:measuredHeight uom="m">6.1</bldg:measuredHeight>
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.677 139.651 8.0 35.677 139.6513 8.0 35.6772 139.6513 8.0 35.6772 139.651 8.0 35.677 139.651 8.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.677 139.651 2.5 35.677 139.6513 2.5 35.677 139.6513 8.0 35.677 139.651 8.0 35.677 139.651 2.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.677 139.651 2.5 35.6772 139.651 2.5 35.6772 139.6513 2.5 35.677 139.6513 2.5 35.677 139.651 2.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.677 139.6513 2.5 35.6772 139.6513 2.5 35.6772 139.6513 8.0 35.677 139.6513 8.0 35.677 139.6513 2.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6772 139.6513 2.5 35.6772 139.651 2.5 35.6772 139.651 8.0 35.6772 139.6513 8.0 35.6772 139.6513 2.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6772 139.651 2.5 35.677 139.651 2.5 35.677 139.651 8.0 35.6772 139.651 8.0 35.6772 139.651 2.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetails>
+				<uro:BuildingDetails>
+					<uro:buildingStructureType codeSpace="../../codelists/Building_buildingStructureType.xml">699</uro:buildingStructureType>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetails>
+			</uro:buildingDetails>
+		</bldg:Building>
+	</core:cityObjectMember>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0005">
+			<bldg:usage codeSpace="../../codelists/Building_usage.xml">402</bldg:usage>
+			<bldg:measuredHeight uom="m">28.2</bldg:measuredHeight>
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.682 139.66 30.5 35.682 139.6604 30.5 35.6823 139.6604 30.5 35.6823 139.66 30.5 35.682 139.66 30.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.682 139.66 3.0 35.682 139.6604 3.0 35.682 139.6604 30.5 35.682 139.66 30.5 35.682 139.66 3.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.682 139.66 3.0 35.6823 139.66 3.0 35.6823 139.6604 3.0 35.682 139.6604 3.0 35.682 139.66 3.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.682 139.6604 3.0 35.6823 139.6604 3.0 35.6823 139.6604 30.5 35.682 139.6604 30.5 35.682 139.6604 3.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6823 139.6604 3.0 35.6823 139.66 3.0 35.6823 139.66 30.5 35.6823 139.6604 30.5 35.6823 139.6604 3.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6823 139.66 3.0 35.682 139.66 3.0 35.682 139.66 30.5 35.6823 139.66 30.5 35.6823 139.66 3.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetails>
+				<uro:BuildingDetails>
+					<uro:buildingStructureType codeSpace="../../codelists/Building_buildingStructureType.xml">611</uro:buildingStructureType>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetails>
+			</uro:buildingDetails>
+		</bldg:Building>
+	</core:cityObjectMember>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0006">
+			<bldg:usage codeSpace="../../codelists/Building_usage.xml">401</bldg:usage>
+			<bldg:measuredHeight uom="m">9.7</bldg:measuredHeight>
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.67911 139.65531 11.03 35.67949 139.65529 11.03 35.67941 139.65548 11.03 35.67952 139.65569 11.03 35.67913 139.65577 11.03 35.67911 139.65531 11.03</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.67911 139.65531 1.337 35.67913 139.65577 1.337 35.67952 139.65569 1.337 35.67941 139.65548 1.337 35.67949 139.65529 1.337 35.67911 139.65531 1.337</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetails>
+				<uro:BuildingDetails>
+					<uro:buildingStructureType codeSpace="../../codelists/Building_buildingStructureType.xml">610</uro:buildingStructureType>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetails>
+			</uro:buildingDetails>
+		</bldg:Building>
+	</core:cityObjectMember>
+</core:CityModel>
@@ -0,0 +1,228 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<core:CityModel xmlns:brid="http://www.opengis.net/citygml/bridge/2.0" xmlns:tran="http://www.opengis.net/citygml/transportation/2.0" xmlns:frn="http://www.opengis.net/citygml/cityfurniture/2.0" xmlns:wtr="http://www.opengis.net/citygml/waterbody/2.0" xmlns:sch="http://www.ascc.net/xml/schematron" xmlns:veg="http://www.opengis.net/citygml/vegetation/2.0" xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:tun="http://www.opengis.net/citygml/tunnel/2.0" xmlns:tex="http://www.opengis.net/citygml/texturedsurface/2.0" xmlns:gml="http://www.opengis.net/gml" xmlns:app="http://www.opengis.net/citygml/appearance/2.0" xmlns:gen="http://www.opengis.net/citygml/generics/2.0" xmlns:dem="http://www.opengis.net/citygml/relief/2.0" xmlns:luse="http://www.opengis.net/citygml/landuse/2.0" xmlns:xAL="urn:oasis:names:tc:ciq:xsdschema:xAL:2.0" xmlns:uro="https://www.geospatial.jp/iur/uro/2.0" xmlns:bldg="http://www.opengis.net/citygml/building/2.0" xmlns:smil20="http://www.w3.org/2001/SMIL20/" xmlns:pbase="http://www.opengis.net/citygml/profiles/base/2.0" xmlns:smil20lang="http://www.w3.org/2001/SMIL20/Language" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:grp="http://www.opengis.net/citygml/cityobjectgroup/2.0" xmlns:core="http://www.opengis.net/citygml/2.0">
+	<gml:boundedBy>
+		<gml:Envelope srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+			<gml:lowerCorner>35.675 139.6375 0</gml:lowerCorner>
+			<gml:upperCorner>35.68333 139.65 40</gml:upperCorner>
+		</gml:Envelope>
+	</gml:boundedBy>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0001">
+			<bldg:usage codeSpace="../../codelists/Building_usage.xml">441</bldg:usage>
+			<bldg:measuredHeight uom="m">9.3</bldg:measuredHeight>
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.676 139.638 13.1 35.676 139.6383 13.1 35.6762 139.6383 13.1 35.6762 139.638 13.1 35.676 139.638 13.1</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.676 139.638 3.805999994277954 35.676 139.6383 3.805999994277954 35.676 139.6383 13.1 35.676 139.638 13.1 35.676 139.638 3.805999994277954</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.676 139.638 3.805999994277954 35.6762 139.638 3.805999994277954 35.6762 139.6383 3.805999994277954 35.676 139.6383 3.805999994277954 35.676 139.638 3.805999994277954</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.676 139.6383 3.805999994277954 35.6762 139.6383 3.805999994277954 35.6762 139.6383 13.1 35.676 139.6383 13.1 35.676 139.6383 3.805999994277954</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6762 139.6383 3.805999994277954 35.6762 139.638 3.805999994277954 35.6762 139.638 13.1 35.6762 139.6383 13.1 35.6762 139.6383 3.805999994277954</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6762 139.638 3.805999994277954 35.676 139.638 3.805999994277954 35.676 139.638 13.1 35.6762 139.638 13.1 35.6762 139.638 3.805999994277954</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetailAttribute>
+				<uro:BuildingDetailAttribute>
+					<uro:buildingStructureType codeSpace="../../codelists/Building_buildingStructureType.xml">610</uro:buildingStructureType>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetailAttribute>
+			</uro:buildingDetailAttribute>
+		</bldg:Building>
+	</core:cityObjectMember>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0002">
+			<bldg:usage codeSpace="../../codelists/Building_usage.xml">411</bldg:usage>
+			<bldg:measuredHeight uom="m">3.0</bldg:measuredHeight>
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.679 139.642 7.5 35.679 139.6422 7.5 35.6793 139.6422 7.5 35.6793 139.642 7.5 35.679 139.642 7.5</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.679 139.642 4.455 35.679 139.6422 4.455 35.679 139.6422 7.5 35.679 139.642 7.5 35.679 139.642 4.455</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.679 139.642 4.455 35.6793 139.642 4.455 35.6793 139.6422 4.455 35.679 139.6422 4.455 35.679 139.642 4.455</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.679 139.6422 4.455 35.6793 139.6422 4.455 35.6793 139.6422 7.5 35.679 139.6422 7.5 35.679 139.6422 4.455</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6793 139.6422 4.455 35.6793 139.642 4.455 35.6793 139.642 7.5 35.6793 139.6422 7.5 35.6793 139.6422 4.455</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6793 139.642 4.455 35.679 139.642 4.455 35.679 139.642 7.5 35.6793 139.642 7.5 35.6793 139.642 4.455</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetailAttribute>
+				<uro:BuildingDetailAttribute>
+					<uro:buildingStructureType codeSpace="../../codelists/Building_buildingStructureType.xml">601</uro:buildingStructureType>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetailAttribute>
+			</uro:buildingDetailAttribute>
+		</bldg:Building>
+	</core:cityObjectMember>
+	<core:cityObjectMember>
+		<bldg:Building gml:id="bldg_0a4a1f5e-0003">
+			<bldg:lod1Solid>
+				<gml:Solid srsName="http://www.opengis.net/def/crs/EPSG/0/6697" srsDimension="3">
+					<gml:exterior>
+						<gml:CompositeSurface>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6825 139.648 20.0 35.6825 139.6484 20.0 35.6828 139.6484 20.0 35.6828 139.648 20.0 35.6825 139.648 20.0</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6825 139.648 5.25 35.6825 139.6484 5.25 35.6825 139.6484 20.0 35.6825 139.648 20.0 35.6825 139.648 5.25</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6825 139.648 5.25 35.6828 139.648 5.25 35.6828 139.6484 5.25 35.6825 139.6484 5.25 35.6825 139.648 5.25</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6825 139.6484 5.25 35.6828 139.6484 5.25 35.6828 139.6484 20.0 35.6825 139.6484 20.0 35.6825 139.6484 5.25</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6828 139.6484 5.25 35.6828 139.648 5.25 35.6828 139.648 20.0 35.6828 139.6484 20.0 35.6828 139.6484 5.25</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+							<gml:surfaceMember>
+								<gml:Polygon>
+									<gml:exterior>
+										<gml:LinearRing>
+											<gml:posList>35.6828 139.648 5.25 35.6825 139.648 5.25 35.6825 139.648 20.0 35.6828 139.648 20.0 35.6828 139.648 5.25</gml:posList>
+										</gml:LinearRing>
+									</gml:exterior>
+								</gml:Polygon>
+							</gml:surfaceMember>
+						</gml:CompositeSurface>
+					</gml:exterior>
+				</gml:Solid>
+			</bldg:lod1Solid>
+			<uro:buildingDetailAttribute>
+				<uro:BuildingDetailAttribute>
+					<uro:surveyYear>2020</uro:surveyYear>
+				</uro:BuildingDetailAttribute>
+			</uro:buildingDetailAttribute>
+		</bldg:Building>
+	</core:cityObjectMember>
+</core:CityModel>
@@ -0,0 +1,108 @@
+import struct
+
+# テスト用のMVTタイルを作成する最低限のエンコーダー
+
+
+def _varint(value: int) -> bytes:
+    result = bytearray()
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(b | 0x80)
+        else:
+            result.append(b)
+            return bytes(result)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint(field << 3 | wire_type)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(data)) + data
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _packed(values: list) -> bytes:
+    return b"".join(_varint(v) for v in values)
+
+
+def _value(value) -> bytes:
+    if isinstance(value, str):
+        return _bytes_field(1, value.encode("utf-8"))
+    if isinstance(value, bool):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    if value < 0:
+        return _key(6, 0) + _varint(_zigzag(value))
+    return _key(5, 0) + _varint(value)
+
+
+def geometry_commands(geometry_type: int, rings: list) -> list:
+    """タイル座標のリングのリストをコマンド列に変換する
+
+    点は全ての点を1つのMoveToにまとめ、ポリゴンのリングは閉じていない点列で指定する
+    """
+    commands = []
+    x = y = 0
+    if geometry_type == 1:
+        points = [point for ring in rings for point in ring]
+        commands.append(1 | len(points) << 3)
+        for px, py in points:
+            commands += [_zigzag(px - x), _zigzag(py - y)]
+            x, y = px, py
+        return commands
+    for ring in rings:
+        commands.append(1 | 1 << 3)
+        commands += [_zigzag(ring[0][0] - x), _zigzag(ring[0][1] - y)]
+        x, y = ring[0]
+        commands.append(2 | (len(ring) - 1) << 3)
+        for px, py in ring[1:]:
+            commands += [_zigzag(px - x), _zigzag(py - y)]
+            x, y = px, py
+        if geometry_type == 3:
+            commands.append(7 | 1 << 3)
+    return commands
+
+
+def encode_tile(layers: list) -> bytes:
+    """レイヤーのリストからMVTタイルを作成する
+
+    レイヤーはname、features、extent(省略可)を持つ辞書、
+    地物はtype、rings、id(省略可)、properties(省略可)を持つ辞書で指定する
+    """
+    tile = b""
+    for layer in layers:
+        keys = []
+        values = []
+        body = _bytes_field(1, layer["name"].encode("utf-8"))
+        for feature in layer["features"]:
+            tags = []
+            for key, value in feature.get("properties", {}).items():
+                if key not in keys:
+                    keys.append(key)
+                if (type(value), value) not in values:
+                    values.append((type(value), value))
+                tags += [keys.index(key), values.index((type(value), value))]
+            message = b""
+            if "id" in feature:
+                message += _key(1, 0) + _varint(feature["id"])
+            if tags:
+                message += _bytes_field(2, _packed(tags))
+            message += _key(3, 0) + _varint(feature["type"])
+            commands = geometry_commands(feature["type"], feature["rings"])
+            message += _bytes_field(4, _packed(commands))
+            body += _bytes_field(2, message)
+        for key in keys:
+            body += _bytes_field(3, key.encode("utf-8"))
+        for _, value in values:
+            body += _bytes_field(4, _value(value))
+        body += _key(5, 0) + _varint(layer.get("extent", 4096))
+        body += _key(15, 0) + _varint(2)
+        tile += _bytes_field(3, body)
+    return tile
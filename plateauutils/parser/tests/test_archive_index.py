@@ -0,0 +1,62 @@
+from pathlib import Path
+from plateauutils.parser.archive_index import (
+    ArchiveIndex,
+    archive_index_cache,
+    load_archive_index,
+)
+import tempfile
+import zipfile
+
+NAMES = [
+    "13100_tokyo/codelists/Building_usage.xml",
+    "13100_tokyo/udx/bldg/53394512_bldg_6697_op.gml",
+    "13100_tokyo/udx/bldg/53394511_bldg_6697_op.gml",
+    "13100_tokyo/udx/bldg/53394511_bldg_6697_appearance/hnap0001.jpg",
+    "13100_tokyo/udx/tran/53394511_tran_6697_op.gml",
+    "13100_tokyo/udx/bldg/533945_bldg_6697_op.gml",
+    "luse/15/28261/13163.mvt",
+    "luse/15/28261/13164.mvt",
+    "brid/15/28261/13163.mvt",
+]
+
+
+def test_archive_index_mesh_members():
+    index = ArchiveIndex(NAMES)
+    # zipファイル内の順序で返す
+    assert index.mesh_members("bldg", ["53394511", "53394512", "5339"]) == [
+        "13100_tokyo/udx/bldg/53394512_bldg_6697_op.gml",
+        "13100_tokyo/udx/bldg/53394511_bldg_6697_op.gml",
+    ]
+    assert index.mesh_members("bldg", ["533945"]) == [
+        "13100_tokyo/udx/bldg/533945_bldg_6697_op.gml"
+    ]
+    assert index.mesh_members("tran", ["53394511"]) == [
+        "13100_tokyo/udx/tran/53394511_tran_6697_op.gml"
+    ]
+    assert index.mesh_members("bldg", ["53394513"]) == []
+
+
+def test_archive_index_tile_members():
+    index = ArchiveIndex(NAMES)
+    assert index.tile_members(
+        "luse", ["15/28261/13164.mvt", "15/28261/13163.mvt", "15/0/0.mvt"]
+    ) == ["luse/15/28261/13163.mvt", "luse/15/28261/13164.mvt"]
+    assert index.tile_members("brid", ["15/28261/13163.mvt"]) == [
+        "brid/15/28261/13163.mvt"
+    ]
+
+
+def test_load_archive_index_cached():
+    archive_index_cache.clear()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = Path(tmpdir, "index.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            for name in NAMES:
+                zip_file.writestr(name, "")
+        with zipfile.ZipFile(archive_path) as zip_file:
+            first = load_archive_index(zip_file)
+        with zipfile.ZipFile(archive_path) as zip_file:
+            second = load_archive_index(zip_file)
+        assert first is second
+        assert first.names == NAMES
+    archive_index_cache.clear()
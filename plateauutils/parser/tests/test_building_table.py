@@ -0,0 +1,126 @@
+import io
+import numpy as np
+import pickle
+from plateauutils.parser.building_table import BuildingTable, DictionaryColumn
+import pytest
+
+
+def _make_table():
+    table = BuildingTable()
+    table.append("a", [130.1, 33.1], 3.5, 9.3, "非木造", "共同住宅")
+    table.append("b", None, 10000, None, None, "住宅")
+    table.append("c", [130.2, 33.2], 4.5, 3.0, "非木造", None)
+    return table
+
+
+def test_dictionary_column():
+    column = DictionaryColumn()
+    for value in ["a", "b", None, "a"]:
+        column.append(value)
+    assert column.categories == ["a", "b"]
+    assert column.numpy_codes().tolist() == [0, 1, -1, 0]
+    other = DictionaryColumn()
+    for value in ["c", "a", None]:
+        other.append(value)
+    column.extend(other)
+    assert column.categories == ["a", "b", "c"]
+    assert column.values() == ["a", "b", None, "a", "c", "a", None]
+
+
+def test_building_table_to_list():
+    table = _make_table()
+    assert len(table) == 3
+    assert table.to_list() == [
+        {
+            "gid": "a",
+            "center": [130.1, 33.1],
+            "min_height": 3.5,
+            "measured_height": 9.3,
+            "building_structure_type": "非木造",
+            "usage": "共同住宅",
+        },
+        {
+            "gid": "b",
+            "center": None,
+            "min_height": 10000,
+            "measured_height": None,
+            "building_structure_type": None,
+            "usage": "住宅",
+        },
+        {
+            "gid": "c",
+            "center": [130.2, 33.2],
+            "min_height": 4.5,
+            "measured_height": 3.0,
+            "building_structure_type": "非木造",
+            "usage": None,
+        },
+    ]
+
+
+def test_building_table_extend():
+    table = _make_table()
+    other = pickle.loads(pickle.dumps(_make_table()))
+    table.extend(other)
+    assert len(table) == 6
+    assert table.to_list()[3:] == _make_table().to_list()
+
+
+def test_building_table_to_numpy():
+    result = _make_table().to_numpy()
+    assert result["gid"].tolist() == ["a", "b", "c"]
+    assert result["center_x"].dtype == np.float64
+    assert np.isnan(result["measured_height"][1])
+    assert result["building_structure_type"].tolist() == [0, -1, 0]
+
+
+def test_building_table_to_pandas():
+    df = _make_table().to_pandas()
+    assert df["gid"].tolist() == ["a", "b", "c"]
+    assert df["min_height"].tolist() == [3.5, 10000, 4.5]
+    assert str(df["usage"].dtype) == "category"
+    assert df["usage"].isna().tolist() == [False, False, True]
+    assert df["building_structure_type"].cat.categories.tolist() == ["非木造"]
+
+
+def test_building_table_to_arrow():
+    pytest.importorskip("pyarrow")
+    result = _make_table().to_arrow()
+    assert result.column("gid").to_pylist() == ["a", "b", "c"]
+    assert result.column("usage").to_pylist() == ["共同住宅", "住宅", None]
+    assert (
+        str(result.schema.field("usage").type)
+        == "dictionary<values=string, indices=int32, ordered=0>"
+    )
+
+
+def test_building_table_select():
+    table = _make_table()
+    result = table.select(np.array([True, False, True]))
+    assert result.to_list() == [table.to_list()[0], table.to_list()[2]]
+    assert result.envelope_array().shape == (2, 4)
+
+
+def test_building_table_save_load():
+    table = _make_table()
+    table.append("d", [130.3, 33.3], 1.0, 2.0, "木造", "住宅", envelope=(1, 2, 3, 4))
+    f = io.BytesIO()
+    table.save(f)
+    f.seek(0)
+    result = BuildingTable.load(f)
+    assert result.to_list() == table.to_list()
+    assert result.usage.categories == ["共同住宅", "住宅"]
+    assert result.envelope_array()[3].tolist() == [1, 2, 3, 4]
+    assert np.isnan(result.envelope_array()[0]).all()
+
+
+def test_building_table_save_load_missing_gid():
+    table = BuildingTable()
+    table.append(None, [130.1, 33.1], 3.5, 9.3, None, None)
+    table.append("None", [130.2, 33.2], 4.5, 3.0, None, None)
+    table.append("", [130.3, 33.3], 5.5, 2.0, None, None)
+    f = io.BytesIO()
+    table.save(f)
+    f.seek(0)
+    # gml:idが無い建物は文字列の"None"や空文字列と区別して復元する
+    assert BuildingTable.load(f).gid == [None, "None", ""]
@@ -1,6 +1,30 @@
+import os
+from pathlib import Path
+from plateauutils.network.download_cache import DownloadCache
+from plateauutils.network.tests.range_server import serve_directory
+from plateauutils.parser import city_gml_parser
 from plateauutils.parser.city_gml_parser import CityGMLParser
+import pytest
 from shapely import from_wkt
 import tempfile
+import zipfile
+
+DATA_DIRECTORY = Path(__file__).parent / "fixtures"
+
+LOCAL_POLYGON = from_wkt(
+    "POLYGON ((139.637 35.674, 139.637 35.684, 139.663 35.684, 139.663 35.674, 139.637 35.674))"
+)
+
+
+def _make_archive(name: str, target_dir: str) -> str:
+    """fixtures以下のディレクトリからCityGMLのzipを作成する"""
+    base_dir = DATA_DIRECTORY / name
+    archive_path = os.path.join(target_dir, name + ".zip")
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for path in sorted(base_dir.rglob("*")):
+            if path.is_file():
+                zip_file.write(path, path.relative_to(base_dir).as_posix())
+    return archive_path
 
 
 def test_citygml_parser_v2():
@@ -37,3 +61,271 @@ def test_citygml_parser_v1_4():
         assert result[0]["measured_height"] == 3.0
         assert result[0]["building_structure_type"] == "非木造"
         assert result[0]["usage"] == "共同住宅"
+
+
+def test_citygml_parser_local_v2():
+    parser = CityGMLParser(LOCAL_POLYGON)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = parser.parse(_make_archive("citygml_v2", tmpdir))
+    assert len(result) == 6
+    assert result[0]["gid"] == "bldg_0a4a1f5e-0001"
+    assert result[0]["center"] == [139.63815, 35.6761]
+    assert result[0]["min_height"] == 3.805999994277954
+    assert result[0]["measured_height"] == 9.3
+    assert result[0]["building_structure_type"] == "非木造"
+    assert result[0]["usage"] == "運輸倉庫施設"
+    assert result[2]["measured_height"] is None
+    assert result[2]["building_structure_type"] is None
+    assert result[2]["usage"] is None
+    assert result[5]["center"] == [139.65552065112087, 35.67928718936577]
+    assert result[5]["min_height"] == 1.337
+
+
+def test_citygml_parser_codelist_once_per_file(monkeypatch):
+    calls = []
+    load_codelist = city_gml_parser.load_codelist
+
+    def counting_load_codelist(zip_file, path):
+        calls.append(path)
+        return load_codelist(zip_file, path)
+
+    monkeypatch.setattr(city_gml_parser, "load_codelist", counting_load_codelist)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = CityGMLParser(LOCAL_POLYGON).parse(_make_archive("citygml_v2", tmpdir))
+    # 建物ごとではなく、ファイル(2つ)とコードリスト(2種類)の組ごとに一度だけ読み込む
+    assert len(result) == 6
+    assert len(set(calls)) == 2
+    assert len(calls) <= 2 * 2
+
+
+def test_citygml_parser_streaming():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in ["citygml_v2", "citygml_v1.5"]:
+            archive_path = _make_archive(name, tmpdir)
+            expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+            result = CityGMLParser(LOCAL_POLYGON, streaming=True).parse(archive_path)
+            assert result == expected
+
+
+def test_citygml_parser_workers():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        result = CityGMLParser(LOCAL_POLYGON, workers=2).parse(archive_path)
+        assert result == expected
+        assert [i["gid"] for i in result] == [
+            "bldg_0a4a1f5e-0001",
+            "bldg_0a4a1f5e-0002",
+            "bldg_0a4a1f5e-0003",
+            "bldg_0a4a1f5e-0004",
+            "bldg_0a4a1f5e-0005",
+            "bldg_0a4a1f5e-0006",
+        ]
+
+
+def test_citygml_parser_detect_namespace():
+    from plateauutils.parser.city_gml_parser import uro_namespace_cache
+
+    uro_namespace_cache.clear()
+    parser = CityGMLParser(LOCAL_POLYGON)
+    target = "udx/bldg/53394511_bldg_6697_op.gml"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with zipfile.ZipFile(_make_archive("citygml_v2", tmpdir)) as zip_file:
+            ns, version = parser._detect_namespace(target, zip_file)
+            assert ns["uro"] == "https://www.geospatial.jp/iur/uro/2.0"
+            assert version == 2
+        with zipfile.ZipFile(_make_archive("citygml_v1.5", tmpdir)) as zip_file:
+            ns, version = parser._detect_namespace(target, zip_file)
+            assert (
+                ns["uro"]
+                == "https://www.chisou.go.jp/tiiki/toshisaisei/itoshisaisei/iur/uro/1.5"
+            )
+            assert version == 1
+        # アーカイブごとにキャッシュされる
+        assert len(uro_namespace_cache) == 2
+        archive_path = os.path.join(tmpdir, "no_uro.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr(
+                target,
+                '<core:CityModel xmlns:core="http://www.opengis.net/citygml/2.0"/>',
+            )
+        with zipfile.ZipFile(archive_path) as zip_file:
+            with pytest.raises(ValueError) as e:
+                parser._detect_namespace(target, zip_file)
+            assert str(e.value) == "version is None"
+    uro_namespace_cache.clear()
+
+
+def test_citygml_parser_geometry():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        result = CityGMLParser(LOCAL_POLYGON, geometry=True).parse(archive_path)
+        # 指定しない場合はgeometryを含めない
+        assert "geometry" not in CityGMLParser(LOCAL_POLYGON).parse(archive_path)[0]
+    for item in result:
+        centroid = item["geometry"].centroid
+        assert item["center"] == [centroid.x, centroid.y]
+    assert item["geometry"].bounds == (139.65529, 35.67911, 139.65577, 35.67952)
+
+
+def test_parse_pos_list():
+    parser = CityGMLParser(LOCAL_POLYGON)
+    coordinates = parser._parse_pos_list("35.1 139.2 3.5\n35.2 139.3 4.5")
+    assert coordinates.tolist() == [[35.1, 139.2, 3.5], [35.2, 139.3, 4.5]]
+    with pytest.raises(ValueError) as e:
+        parser._parse_pos_list("35.1 139.2 3.5 35.2")
+    assert str(e.value) == "poi_list is invalid"
+    with pytest.raises(ValueError):
+        parser._parse_pos_list("")
+    # 数値でない値は途中で打ち切らずにエラーとする
+    with pytest.raises(ValueError):
+        parser._parse_pos_list("35.1 139.2 3.5 35.2 x 4.5")
+
+
+def test_ring_centroid():
+    from plateauutils.parser.city_gml_parser import _ring_centroid
+    from shapely.geometry import Polygon
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    for n in range(3, 30):
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+        radius = rng.uniform(0.0001, 0.0005, n)
+        x = 130.4 + radius * np.cos(angles)
+        y = 33.2 + radius * np.sin(angles)
+        centroid = Polygon(np.column_stack([x, y])).centroid
+        assert _ring_centroid(x, y) == (centroid.x, centroid.y)
+    # 面積が0の場合
+    assert _ring_centroid(np.array([0.0, 2.0, 0.0]), np.array([0.0, 0.0, 0.0])) == (
+        1.0,
+        0.0,
+    )
+
+
+def test_citygml_parser_spatial_filter():
+    polygon = from_wkt(
+        "MULTIPOLYGON (((139.6379 35.6759, 139.6515 35.6759, 139.6515 35.6775, 139.6379 35.6775, 139.6379 35.6759)), ((139.64215 35.678, 139.643 35.678, 139.643 35.6791, 139.64215 35.6791, 139.64215 35.678)))"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        result = CityGMLParser(polygon, spatial_filter="centroid").parse(archive_path)
+        assert [i["gid"] for i in result] == [
+            "bldg_0a4a1f5e-0001",
+            "bldg_0a4a1f5e-0004",
+        ]
+        result = CityGMLParser(polygon, spatial_filter="envelope").parse(archive_path)
+        assert [i["gid"] for i in result] == [
+            "bldg_0a4a1f5e-0001",
+            "bldg_0a4a1f5e-0002",
+            "bldg_0a4a1f5e-0004",
+        ]
+        result = CityGMLParser(
+            polygon, streaming=True, workers=2, spatial_filter="centroid"
+        ).parse(archive_path)
+        assert [i["gid"] for i in result] == [
+            "bldg_0a4a1f5e-0001",
+            "bldg_0a4a1f5e-0004",
+        ]
+
+
+def test_citygml_parser_output():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        df = CityGMLParser(LOCAL_POLYGON, output="pandas", workers=2).parse(
+            archive_path
+        )
+        result = CityGMLParser(LOCAL_POLYGON, output="numpy").parse(archive_path)
+    assert df["gid"].tolist() == [i["gid"] for i in expected]
+    assert df["usage"].tolist()[:2] == ["運輸倉庫施設", "共同住宅"]
+    assert result["center_x"].tolist() == [i["center"][0] for i in expected]
+    assert result["min_height"].tolist() == [i["min_height"] for i in expected]
+    with pytest.raises(ValueError) as e:
+        CityGMLParser(LOCAL_POLYGON, output="csv")
+    assert str(e.value) == "output must be one of list, table, numpy, pandas, arrow"
+
+
+def test_citygml_parser_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        cache_dir = os.path.join(tmpdir, "cache")
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        parser = CityGMLParser(LOCAL_POLYGON, cache_dir=cache_dir)
+        assert parser.parse(archive_path) == expected
+        assert len(list(Path(cache_dir).glob("*.npz"))) == 2
+        # 2回目はキャッシュから読み込む
+        assert parser.parse(archive_path) == expected
+        # キャッシュは絞り込み前の結果のため、spatial_filterを指定しても利用できる
+        polygon = from_wkt(
+            "MULTIPOLYGON (((139.6379 35.6759, 139.6515 35.6759, 139.6515 35.6775, 139.6379 35.6775, 139.6379 35.6759)), ((139.64215 35.678, 139.643 35.678, 139.643 35.6791, 139.64215 35.6791, 139.64215 35.678)))"
+        )
+        for predicate in ["centroid", "envelope"]:
+            expected = CityGMLParser(polygon, spatial_filter=predicate).parse(
+                archive_path
+            )
+            result = CityGMLParser(
+                polygon, spatial_filter=predicate, cache_dir=cache_dir, workers=2
+            ).parse(archive_path)
+            assert result == expected
+
+
+def test_citygml_parser_remote():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = _make_archive("citygml_v2", tmpdir)
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        with serve_directory(tmpdir) as server:
+            url = server.url + "/citygml_v2.zip"
+            result = CityGMLParser(LOCAL_POLYGON).download_and_parse(url, remote=True)
+            assert result == expected
+            result = CityGMLParser(LOCAL_POLYGON, workers=2).download_and_parse(
+                url, remote=True
+            )
+            assert result == expected
+
+
+def test_citygml_parser_download():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        archive_path = _make_archive("citygml_v2", server_dir)
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        with serve_directory(server_dir) as server:
+            result = CityGMLParser(LOCAL_POLYGON).download_and_parse(
+                server.url + "/citygml_v2.zip", tmpdir
+            )
+        assert result == expected
+        # 一時ファイルは残らない
+        assert sorted(os.listdir(tmpdir)) == ["citygml_v2.zip", "server"]
+
+
+def test_citygml_parser_download_cache(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = DownloadCache(os.path.join(tmpdir, "cache"))
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        archive_path = _make_archive("citygml_v2", server_dir)
+        expected = CityGMLParser(LOCAL_POLYGON).parse(archive_path)
+        with serve_directory(server_dir) as server:
+            url = server.url + "/citygml_v2.zip"
+            # cacheを指定した場合はキャッシュを利用する
+            parser = CityGMLParser(LOCAL_POLYGON)
+            assert parser.download_and_parse(url, cache=cache) == expected
+            bytes_sent = server.bytes_sent
+            assert parser.download_and_parse(url, cache=cache) == expected
+            assert server.bytes_sent == bytes_sent
+            # target_dirが空の場合はこれまで通りエラー
+            with pytest.raises(FileNotFoundError):
+                parser.download_and_parse(url)
+
+            # cache=Falseの場合は共有のキャッシュを使わず、target_dirにダウンロードする
+            def default_download_cache():
+                raise AssertionError("default cache is used")
+
+            monkeypatch.setattr(
+                "plateauutils.abc.plateau_parser.default_download_cache",
+                default_download_cache,
+            )
+            target_dir = os.path.join(tmpdir, "target")
+            os.mkdir(target_dir)
+            assert parser.download_and_parse(url, target_dir, cache=False) == expected
+            assert os.listdir(target_dir) == ["citygml_v2.zip"]
@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+from plateauutils.parser.archive_cache import ArchiveCache, archive_key
+from plateauutils.parser.codelist import codelist_cache, load_codelist, parse_codelist
+import tempfile
+import zipfile
+
+DATA_DIRECTORY = Path(__file__).parent / "fixtures"
+
+
+def test_parse_codelist():
+    data = (DATA_DIRECTORY / "citygml_v2/codelists/Building_usage.xml").read_bytes()
+    codelist = parse_codelist(data)
+    assert codelist["411"] == "共同住宅"
+    assert codelist["441"] == "運輸倉庫施設"
+    assert codelist.get("999") is None
+
+
+def test_load_codelist_cached():
+    codelist_cache.clear()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = Path(tmpdir, "codelist.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.write(
+                DATA_DIRECTORY / "citygml_v2/codelists/Building_usage.xml",
+                "codelists/Building_usage.xml",
+            )
+        with zipfile.ZipFile(archive_path) as zip_file:
+            first = load_codelist(zip_file, "codelists/Building_usage.xml")
+        # 別のZipFileオブジェクトでも同じアーカイブならキャッシュを利用する
+        with zipfile.ZipFile(archive_path) as zip_file:
+            second = load_codelist(zip_file, "codelists/Building_usage.xml")
+        assert first is second
+        assert len(codelist_cache) == 1
+    codelist_cache.clear()
+
+
+def test_archive_cache_eviction():
+    cache = ArchiveCache(maxsize=2)
+    calls = []
+
+    def loader(value):
+        def _load():
+            calls.append(value)
+            return value
+
+        return _load
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = Path(tmpdir, "empty.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("a.txt", "a")
+        with zipfile.ZipFile(archive_path) as zip_file:
+            assert cache.get(zip_file, "a", loader("a")) == "a"
+            assert cache.get(zip_file, "b", loader("b")) == "b"
+            assert cache.get(zip_file, "a", loader("a")) == "a"
+            assert cache.get(zip_file, "c", loader("c")) == "c"
+            # 最も古いbが削除される
+            assert cache.get(zip_file, "b", loader("b")) == "b"
+    assert calls == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+
+
+def test_archive_key_once_per_zip_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = Path(tmpdir, "empty.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("a.txt", "a")
+        with zipfile.ZipFile(archive_path) as zip_file:
+            key = archive_key(zip_file)
+            # 開いている間はファイルを確認せず、最初に作成したキーを返す
+            os.utime(archive_path, ns=(0, 0))
+            assert archive_key(zip_file) is key
+        # 開き直した場合は改めてキーを作成する
+        with zipfile.ZipFile(archive_path) as zip_file:
+            assert archive_key(zip_file) != key
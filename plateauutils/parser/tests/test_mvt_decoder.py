@@ -0,0 +1,200 @@
+import gzip
+import numpy as np
+from plateauutils.parser.mvt_decoder import (
+    MvtDecodeException,
+    MvtFeatureTable,
+    clip_features,
+    decode_tile,
+    decode_tiles,
+    filter_features,
+    merge_split_features,
+)
+from plateauutils.parser.tests import mvt_encoder
+from plateauutils.parser.tests.mvt_encoder import encode_tile
+import pytest
+import shapely
+from shapely import box
+
+# 外周(タイル座標で時計回り)と穴
+SQUARE = [(1024, 1024), (3072, 1024), (3072, 3072), (1024, 3072)]
+HOLE = [(1536, 1536), (1536, 2560), (2560, 2560), (2560, 1536)]
+SMALL = [(3584, 3584), (4000, 3584), (4000, 4000), (3584, 4000)]
+
+
+def _sample_tile() -> bytes:
+    return encode_tile(
+        [
+            {
+                "name": "luse",
+                "features": [
+                    {
+                        "id": 1,
+                        "type": 3,
+                        "rings": [SQUARE, HOLE, SMALL],
+                        "properties": {"name": "a", "code": 211, "ratio": 0.5},
+                    },
+                    {
+                        "id": 2,
+                        "type": 2,
+                        "rings": [[(0, 0), (2048, 2048)], [(0, 4096), (4096, 4096)]],
+                        "properties": {"name": "b", "flag": True, "level": -3},
+                    },
+                ],
+            },
+            {
+                "name": "poi",
+                "extent": 512,
+                "features": [{"type": 1, "rings": [[(256, 256), (128, 384)]]}],
+            },
+        ]
+    )
+
+
+def test_decode_tile():
+    table = decode_tile(_sample_tile(), "1/0/0.mvt")
+    assert len(table) == 3
+    assert table.layers == ["luse", "poi"]
+    assert table.layer.tolist() == [0, 0, 1]
+    assert table.feature_id.tolist() == [1, 2, 0]
+    assert table.geometry_type.tolist() == [3, 2, 1]
+    assert table.properties["name"].tolist() == ["a", "b", None]
+    assert table.properties["code"].tolist() == [211, None, None]
+    assert table.properties["ratio"].tolist() == [0.5, None, None]
+    assert table.properties["flag"].tolist() == [None, True, None]
+    assert table.properties["level"].tolist() == [None, -3, None]
+    # 座標は経度緯度の平坦な配列
+    assert table.coords.dtype == np.float64
+    assert table.coords.shape == (5 * 3 + 2 * 2 + 2, 2)
+    assert table.feature_offsets.tolist() == [0, 2, 4, 5]
+    assert table.part_offsets.tolist() == [0, 2, 3, 4, 5, 6]
+    polygon, line, points = table.geometries()
+    assert polygon.geom_type == "MultiPolygon"
+    assert len(polygon.geoms) == 2
+    assert len(polygon.geoms[0].interiors) == 1
+    assert polygon.geoms[0].exterior.bounds == pytest.approx(
+        (-135.0, 40.979898, -45.0, 79.171335)
+    )
+    assert line.geom_type == "MultiLineString"
+    assert line.geoms[0].coords[1] == pytest.approx((-90.0, 66.513260))
+    assert points.geom_type == "MultiPoint"
+    # extentが512のレイヤー
+    assert points.geoms[0].coords[0] == pytest.approx((-90.0, 66.513260))
+
+
+def test_decode_tile_gzip():
+    data = _sample_tile()
+    table = decode_tile(gzip.compress(data), "1/0/0.mvt")
+    expected = decode_tile(data, "1/0/0.mvt")
+    assert np.array_equal(table.coords, expected.coords)
+    assert table.properties["name"].tolist() == ["a", "b", None]
+
+
+def test_decode_tile_truncated():
+    data = _sample_tile()
+    with pytest.raises(MvtDecodeException):
+        decode_tile(data[:-20], "1/0/0.mvt")
+
+
+def test_decode_tile_invalid_commands(monkeypatch):
+    # MoveToの無いLineTo、不明なコマンド
+    for commands in [[2 | 1 << 3, 2, 2], [1 | 1 << 3, 2, 2, 3 | 1 << 3]]:
+        monkeypatch.setattr(mvt_encoder, "geometry_commands", lambda *_: commands)
+        data = encode_tile(
+            [{"name": "luse", "features": [{"type": 2, "rings": [[(0, 0)]]}]}]
+        )
+        with pytest.raises(MvtDecodeException):
+            decode_tile(data, "1/0/0.mvt")
+
+
+def test_decode_tiles_parallel():
+    tiles = {
+        "1/0/0.mvt": _sample_tile(),
+        "1/1/0.mvt": _sample_tile(),
+        "1/1/1.mvt": b"",
+    }
+    sequential = decode_tiles(tiles)
+    parallel = decode_tiles(tiles, workers=2)
+    assert len(sequential) == 6
+    assert np.array_equal(sequential.coords, parallel.coords)
+    assert np.array_equal(sequential.feature_offsets, parallel.feature_offsets)
+    assert sequential.properties["name"].tolist() == ["a", "b", None] * 2
+    # 2つ目のタイルは経度が180度ずれる
+    assert sequential.coords[len(sequential.coords) // 2, 0] == pytest.approx(
+        sequential.coords[0, 0] + 180.0
+    )
+
+
+def test_take_and_concat():
+    table = decode_tile(_sample_tile(), "1/0/0.mvt")
+    taken = table.take(np.array([2, 0]))
+    assert taken.feature_id.tolist() == [0, 1]
+    assert taken.properties["name"].tolist() == [None, "a"]
+    geometries = taken.geometries()
+    assert geometries[0].equals(table.geometries()[2])
+    assert geometries[1].equals(table.geometries()[0])
+    assert len(MvtFeatureTable.concat([table, MvtFeatureTable.empty()])) == 3
+    df = table.to_pandas()
+    assert df["layer"].tolist() == ["luse", "luse", "poi"]
+    assert df["geometry"][0].geom_type == "MultiPolygon"
+
+
+def test_merge_split_features():
+    left = encode_tile(
+        [
+            {
+                "name": "luse",
+                "features": [
+                    {
+                        "id": 7,
+                        "type": 3,
+                        "rings": [[(2048, 0), (4096, 0), (4096, 4096), (2048, 4096)]],
+                        "properties": {"name": "left"},
+                    },
+                    {"id": 8, "type": 2, "rings": [[(2048, 2048), (4096, 2048)]]},
+                ],
+            }
+        ]
+    )
+    right = encode_tile(
+        [
+            {
+                "name": "luse",
+                "features": [
+                    {
+                        "id": 7,
+                        "type": 3,
+                        "rings": [[(0, 0), (2048, 0), (2048, 4096), (0, 4096)]],
+                        "properties": {"name": "right"},
+                    },
+                    {"id": 8, "type": 2, "rings": [[(0, 2048), (2048, 2048)]]},
+                ],
+            }
+        ]
+    )
+    table = decode_tiles({"1/0/0.mvt": left, "1/1/0.mvt": right})
+    merged = merge_split_features(table)
+    assert len(merged) == 2
+    assert merged.feature_id.tolist() == [7, 8]
+    # 属性は最初に出現した地物のもの
+    assert merged.properties["name"].tolist() == ["left", None]
+    polygon, line = merged.geometries()
+    assert len(polygon.geoms) == 1
+    assert polygon.bounds == pytest.approx((-90.0, 0.0, 90.0, 85.051129))
+    assert len(line.geoms) == 1
+    assert line.geoms[0].coords[0] == pytest.approx((-90.0, 66.513260))
+    assert line.geoms[0].coords[-1] == pytest.approx((90.0, 66.513260))
+
+
+def test_filter_and_clip_features():
+    table = decode_tile(_sample_tile(), "1/0/0.mvt")
+    # 穴の内側と外周の一部のみを含む範囲
+    query = box(-100.0, 50.0, -60.0, 60.0)
+    filtered = filter_features(table, query)
+    assert filtered.feature_id.tolist() == [1]
+    clipped = clip_features(table, query)
+    assert clipped.feature_id.tolist() == [1]
+    (polygon,) = clipped.geometries()
+    assert polygon.geom_type == "MultiPolygon"
+    assert shapely.within(polygon, query.buffer(1e-9))
+    assert polygon.area < table.geometries()[0].area
+    assert len(clip_features(table, box(0.0, 0.0, 10.0, 10.0))) == 0
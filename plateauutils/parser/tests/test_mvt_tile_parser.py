@@ -1,7 +1,12 @@
 import os
+from plateauutils.network.tests.range_server import serve_directory
 from plateauutils.parser.mvt_tile_parser import MvtTileParser
+from plateauutils.parser.tests.mvt_encoder import encode_tile
+from plateauutils.parser.tests.tile_archive_writer import write_mbtiles, write_pmtiles
+import pytest
 from shapely import from_wkt
 import tempfile
+import zipfile
 
 
 def test_mvt_tile_parser_z15():
@@ -34,3 +39,189 @@ def test_mvt_tile_parser_z14():
         assert len(result) == 6
         assert result[0] == os.path.join(tmpdir, "test_mvt_list/luse/14/14130/6581.mvt")
         assert result[5] == os.path.join(tmpdir, "test_mvt_list/luse/14/14132/6582.mvt")
+
+
+def test_mvt_tile_parser_local():
+    test_polygon = from_wkt(
+        "POLYGON ((130.525689 33.323966, 130.522728 33.314069, 130.511441 33.308653, 130.501013 33.30937, 130.492516 33.318516, 130.493717 33.325831, 130.504618 33.332249, 130.512857 33.332213, 130.525689 33.323966))"
+    )
+    parser = MvtTileParser(test_polygon, 14)
+    # 対象のタイルは作成時に一度だけ求めたリストとして保持する
+    assert isinstance(parser.targets, list)
+    assert "14/14130/6581.mvt" in parser.targets
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, "test_mvt_list.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            for name in [
+                "luse/14/14130/6581.mvt",
+                "luse/14/14132/6582.mvt",
+                "luse/14/14140/6581.mvt",
+                "luse/15/28261/13163.mvt",
+            ]:
+                zip_file.writestr(name, name.encode())
+        result = parser.parse(archive_path)
+        assert result == [
+            os.path.join(tmpdir, "test_mvt_list/luse/14/14130/6581.mvt"),
+            os.path.join(tmpdir, "test_mvt_list/luse/14/14132/6582.mvt"),
+        ]
+        # 対象外のタイルは展開しない
+        assert not os.path.exists(
+            os.path.join(tmpdir, "test_mvt_list/luse/14/14140/6581.mvt")
+        )
+        assert not os.path.exists(os.path.join(tmpdir, "test_mvt_list/luse/15"))
+
+
+def test_mvt_tile_parser_remote():
+    test_polygon = from_wkt(
+        "POLYGON ((130.525689 33.323966, 130.522728 33.314069, 130.511441 33.308653, 130.501013 33.30937, 130.492516 33.318516, 130.493717 33.325831, 130.504618 33.332249, 130.512857 33.332213, 130.525689 33.323966))"
+    )
+    parser = MvtTileParser(test_polygon, 14)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_dir = os.path.join(tmpdir, "server")
+        os.mkdir(server_dir)
+        archive_path = os.path.join(server_dir, "test_mvt_list.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("luse/14/14130/6581.mvt", b"a")
+            zip_file.writestr("luse/14/14140/6581.mvt", os.urandom(4 * 1024 * 1024))
+        with serve_directory(server_dir) as server:
+            result = parser.download_and_parse(
+                server.url + "/test_mvt_list.zip", tmpdir, remote=True
+            )
+            assert server.bytes_sent < os.path.getsize(archive_path) / 2
+        assert result == [os.path.join(tmpdir, "test_mvt_list/luse/14/14130/6581.mvt")]
+        with open(result[0], "rb") as f:
+            assert f.read() == b"a"
+
+
+def test_mvt_tile_parser_bytes():
+    test_polygon = from_wkt(
+        "POLYGON ((130.525689 33.323966, 130.522728 33.314069, 130.511441 33.308653, 130.501013 33.30937, 130.492516 33.318516, 130.493717 33.325831, 130.504618 33.332249, 130.512857 33.332213, 130.525689 33.323966))"
+    )
+    parser = MvtTileParser(test_polygon, 14, output="bytes")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, "test_mvt_list.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("luse/14/14132/6582.mvt", b"b")
+            zip_file.writestr("luse/14/14130/6581.mvt", b"a")
+            zip_file.writestr("luse/14/14140/6581.mvt", b"c")
+        result = parser.parse(archive_path)
+        # 何も展開しない
+        assert os.listdir(tmpdir) == ["test_mvt_list.zip"]
+        with serve_directory(tmpdir) as server:
+            remote_result = parser.download_and_parse(
+                server.url + "/test_mvt_list.zip", remote=True
+            )
+    assert result == {"14/14130/6581.mvt": b"a", "14/14132/6582.mvt": b"b"}
+    assert list(result) == ["14/14130/6581.mvt", "14/14132/6582.mvt"]
+    assert remote_result == result
+    with pytest.raises(ValueError) as e:
+        MvtTileParser(test_polygon, 14, output="json")
+    assert str(e.value) == "output must be one of path, bytes, features"
+
+
+def test_mvt_tile_parser_features():
+    test_polygon = from_wkt(
+        "POLYGON ((130.525689 33.323966, 130.522728 33.314069, 130.511441 33.308653, 130.501013 33.30937, 130.492516 33.318516, 130.493717 33.325831, 130.504618 33.332249, 130.512857 33.332213, 130.525689 33.323966))"
+    )
+    # タイル全体を覆う地物と、ポリゴンと交差しない地物
+    tile = encode_tile(
+        [
+            {
+                "name": "luse",
+                "features": [
+                    {
+                        "id": 1,
+                        "type": 3,
+                        "rings": [[(0, 0), (4096, 0), (4096, 4096), (0, 4096)]],
+                        "properties": {"luse_id": "a"},
+                    },
+                    {
+                        "id": 2,
+                        "type": 3,
+                        "rings": [[(0, 0), (16, 0), (16, 16), (0, 16)]],
+                        "properties": {"luse_id": "b"},
+                    },
+                ],
+            }
+        ]
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, "test_mvt_list.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("luse/14/14130/6581.mvt", tile)
+        filtered = MvtTileParser(test_polygon, 14, output="features").parse(
+            archive_path
+        )
+        clipped = MvtTileParser(test_polygon, 14, output="features", clip=True).parse(
+            archive_path
+        )
+        # 何も展開しない
+        assert os.listdir(tmpdir) == ["test_mvt_list.zip"]
+    assert filtered.properties["luse_id"].tolist() == ["a"]
+    assert clipped.properties["luse_id"].tolist() == ["a"]
+    (whole,) = filtered.geometries()
+    (part,) = clipped.geometries()
+    assert whole.bounds == pytest.approx(
+        (130.4736328, 33.3213485, 130.4956055, 33.3397070), abs=1e-6
+    )
+    assert part.equals(test_polygon.intersection(whole))
+
+
+@pytest.mark.parametrize(
+    "filename, writer",
+    [
+        ("test_mvt_list.mbtiles", write_mbtiles),
+        ("test_mvt_list.pmtiles", write_pmtiles),
+    ],
+)
+def test_mvt_tile_parser_tile_archive(filename, writer):
+    test_polygon = from_wkt(
+        "POLYGON ((130.525689 33.323966, 130.522728 33.314069, 130.511441 33.308653, 130.501013 33.30937, 130.492516 33.318516, 130.493717 33.325831, 130.504618 33.332249, 130.512857 33.332213, 130.525689 33.323966))"
+    )
+    tile = encode_tile(
+        [
+            {
+                "name": "luse",
+                "features": [
+                    {
+                        "id": 1,
+                        "type": 3,
+                        "rings": [[(0, 0), (4096, 0), (4096, 4096), (0, 4096)]],
+                    }
+                ],
+            }
+        ]
+    )
+    empty = encode_tile([{"name": "luse", "features": []}])
+    tiles = {
+        "14/14130/6581.mvt": tile,
+        "14/14132/6582.mvt": empty,
+        "14/14140/6581.mvt": b"c",
+        "15/28261/13163.mvt": b"d",
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, filename)
+        writer(archive_path, tiles)
+        result = MvtTileParser(test_polygon, 14, output="bytes").parse(archive_path)
+        # 何も展開しない
+        assert os.listdir(tmpdir) == [filename]
+        assert result == {"14/14130/6581.mvt": tile, "14/14132/6582.mvt": empty}
+        paths = MvtTileParser(test_polygon, 14).parse(archive_path)
+        assert paths == [
+            os.path.join(tmpdir, "test_mvt_list/luse/14/14130/6581.mvt"),
+            os.path.join(tmpdir, "test_mvt_list/luse/14/14132/6582.mvt"),
+        ]
+        with open(paths[1], "rb") as f:
+            assert f.read() == empty
+        features = MvtTileParser(test_polygon, 14, output="features").parse(
+            archive_path
+        )
+        assert features.feature_id.tolist() == [1]
+        if filename.endswith(".pmtiles"):
+            with serve_directory(tmpdir) as server:
+                remote_result = MvtTileParser(
+                    test_polygon, 14, output="bytes"
+                ).download_and_parse(server.url + "/" + filename, remote=True)
+            assert remote_result == result
+        with pytest.raises(ValueError):
+            MvtTileParser(test_polygon, 13, output="bytes").parse(archive_path)
@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from plateauutils.parser.building_table import BuildingTable
+from plateauutils.parser.parse_cache import ParseCache
+import tempfile
+import time
+import zipfile
+
+
+def _make_table(gid: str) -> BuildingTable:
+    table = BuildingTable()
+    table.append(gid, [130.1, 33.1], 3.5, 9.3, "非木造", "共同住宅")
+    return table
+
+
+def test_parse_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ParseCache(os.path.join(tmpdir, "cache"))
+        info = zipfile.ZipInfo("udx/bldg/a.gml")
+        info.CRC = 1
+        assert cache.load("a.zip", info) is None
+        cache.save("a.zip", info, _make_table("a"))
+        assert cache.load("a.zip", info).gid == ["a"]
+        # CRCが変わった場合は別のキャッシュとする
+        info.CRC = 2
+        assert cache.load("a.zip", info) is None
+        cache.clear()
+        info.CRC = 1
+        assert cache.load("a.zip", info) is None
+
+
+def test_parse_cache_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ParseCache(tmpdir)
+        infos = [zipfile.ZipInfo(f"udx/bldg/{i}.gml") for i in range(3)]
+        for info in infos:
+            info.CRC = 0
+        cache.save("a.zip", infos[0], _make_table("0"))
+        size = os.path.getsize(cache.path("a.zip", infos[0]))
+        # 2件分のみ保持する
+        cache.max_bytes = size * 2 + size // 2
+        os.utime(cache.path("a.zip", infos[0]), (time.time() - 10,) * 2)
+        cache.save("a.zip", infos[1], _make_table("1"))
+        cache.save("a.zip", infos[2], _make_table("2"))
+        assert cache.load("a.zip", infos[0]) is None
+        assert cache.load("a.zip", infos[1]).gid == ["1"]
+        assert cache.load("a.zip", infos[2]).gid == ["2"]
+        assert len(list(Path(tmpdir).glob("*.npz"))) == 2
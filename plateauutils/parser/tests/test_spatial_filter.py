@@ -0,0 +1,59 @@
+import numpy as np
+import pickle
+from plateauutils.parser.spatial_filter import SpatialFilter, SpatialFilterException
+import pytest
+from shapely import from_wkt
+
+
+def test_spatial_filter_centroid():
+    polygon = from_wkt(
+        "MULTIPOLYGON (((0 0, 1 0, 1 1, 0 1, 0 0)), ((2 2, 3 2, 3 3, 2 3, 2 2)))"
+    )
+    spatial_filter = SpatialFilter(polygon)
+    coordinates = np.array([[0.5, 0.5], [0.6, 0.6]])
+    assert spatial_filter.contains(coordinates, (0.5, 0.5))
+    assert spatial_filter.contains(coordinates, (2.5, 2.5))
+    # 境界上は交差とする
+    assert spatial_filter.contains(coordinates, (1.0, 0.5))
+    assert not spatial_filter.contains(coordinates, (1.5, 1.5))
+
+
+def test_spatial_filter_envelope():
+    polygon = from_wkt("POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+    spatial_filter = SpatialFilter(polygon, "envelope")
+    coordinates = np.array([[0.9, 0.9], [1.5, 1.5]])
+    assert spatial_filter.contains(coordinates, (1.2, 1.2))
+    coordinates = np.array([[1.1, 1.1], [1.5, 1.5]])
+    assert not spatial_filter.contains(coordinates, (1.3, 1.3))
+
+
+def test_spatial_filter_pickle():
+    polygon = from_wkt("POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+    spatial_filter = pickle.loads(pickle.dumps(SpatialFilter(polygon, "envelope")))
+    assert spatial_filter.predicate == "envelope"
+    assert spatial_filter.contains(np.array([[0.5, 0.5]]), (0.5, 0.5))
+
+
+def test_invalid_spatial_filter():
+    polygon = from_wkt("POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+    with pytest.raises(SpatialFilterException) as e:
+        SpatialFilter(polygon, "within")
+    assert str(e.value) == "predicate must be one of centroid, envelope"
+
+
+def test_spatial_filter_mask():
+    polygon = from_wkt("POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+    center_x = np.array([0.5, 1.5, np.nan, 1.2])
+    center_y = np.array([0.5, 1.5, np.nan, 1.2])
+    envelope = np.array(
+        [
+            [0.4, 0.4, 0.6, 0.6],
+            [1.4, 1.4, 1.6, 1.6],
+            [np.nan, np.nan, np.nan, np.nan],
+            [0.9, 0.9, 1.5, 1.5],
+        ]
+    )
+    result = SpatialFilter(polygon).mask(center_x, center_y, envelope)
+    assert result.tolist() == [True, False, False, False]
+    result = SpatialFilter(polygon, "envelope").mask(center_x, center_y, envelope)
+    assert result.tolist() == [True, False, False, True]
@@ -0,0 +1,131 @@
+import os
+from plateauutils.network.tests.range_server import serve_directory
+from plateauutils.parser.tests.tile_archive_writer import write_mbtiles, write_pmtiles
+from plateauutils.parser.tile_archive import (
+    MBTilesReader,
+    PMTilesReader,
+    is_tile_archive,
+    open_tile_archive,
+    zxy_to_tile_id,
+    zxy_to_tile_ids,
+)
+import pytest
+import tempfile
+
+
+def _tiles() -> dict:
+    tiles = {}
+    for x in range(16):
+        for y in range(16):
+            tiles[f"4/{x}/{y}.mvt"] = f"{x}-{y}".encode()
+    # 同じ内容のタイル
+    tiles["5/0/0.mvt"] = b"0-0"
+    return tiles
+
+
+def test_zxy_to_tile_id():
+    assert zxy_to_tile_id(0, 0, 0) == 0
+    assert zxy_to_tile_id(1, 0, 0) == 1
+    assert zxy_to_tile_id(1, 0, 1) == 2
+    assert zxy_to_tile_id(1, 1, 1) == 3
+    assert zxy_to_tile_id(1, 1, 0) == 4
+    assert zxy_to_tile_id(2, 0, 0) == 5
+    assert zxy_to_tile_id(12, 3423, 1763) == 19078479
+    assert zxy_to_tile_ids(
+        [0, 1, 2, 12], [0, 1, 0, 3423], [0, 0, 0, 1763]
+    ).tolist() == [
+        0,
+        4,
+        5,
+        19078479,
+    ]
+    with pytest.raises(ValueError):
+        zxy_to_tile_id(1, 2, 0)
+
+
+def test_is_tile_archive():
+    assert is_tile_archive("a/b.mbtiles")
+    assert is_tile_archive("https://example.com/b.PMTiles")
+    assert not is_tile_archive("a/b.zip")
+
+
+def test_mbtiles_reader():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.mbtiles")
+        write_mbtiles(path, _tiles())
+        reader = MBTilesReader(path)
+        try:
+            assert reader.metadata() == {"format": "pbf"}
+            result = reader.read_tiles(["4/3/5.mvt", "4/1/2.mvt", "3/0/0.mvt"])
+            # 2回目も同じ結果になる
+            assert reader.read_tiles(["4/1/2.mvt"]) == {"4/1/2.mvt": b"1-2"}
+        finally:
+            reader.close()
+    # 存在しないタイルは含まない、内容はgzipを展開する
+    assert result == {"4/1/2.mvt": b"1-2", "4/3/5.mvt": b"3-5"}
+
+
+@pytest.mark.parametrize("leaf_size", [None, 7])
+def test_pmtiles_reader(leaf_size):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.pmtiles")
+        write_pmtiles(path, _tiles(), leaf_size)
+        with open_tile_archive(path) as reader:
+            assert isinstance(reader, PMTilesReader)
+            result = reader.read_tiles(
+                ["4/15/15.mvt", "4/0/0.mvt", "5/0/0.mvt", "4/16/0.mvt", "3/0/0.mvt"]
+            )
+    assert result == {
+        "4/0/0.mvt": b"0-0",
+        "4/15/15.mvt": b"15-15",
+        "5/0/0.mvt": b"0-0",
+    }
+
+
+def test_pmtiles_reader_all_tiles():
+    tiles = _tiles()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.pmtiles")
+        write_pmtiles(path, tiles, 10)
+        with open_tile_archive(path) as reader:
+            assert reader.read_tiles(list(tiles)) == dict(sorted(tiles.items()))
+
+
+def test_pmtiles_reader_remote():
+    tiles = {name: os.urandom(64 * 1024) for name in _tiles()}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.pmtiles")
+        write_pmtiles(path, tiles, 16)
+        with serve_directory(tmpdir) as server:
+            with open_tile_archive(server.url + "/test.pmtiles") as reader:
+                result = reader.read_tiles(["4/2/3.mvt"])
+            # ヘッダー、ディレクトリ、対象のタイルのみを取得する
+            assert server.bytes_sent < os.path.getsize(path) / 4
+    assert result == {"4/2/3.mvt": tiles["4/2/3.mvt"]}
+
+
+def test_open_tile_archive_invalid():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.pmtiles")
+        with open(path, "wb") as f:
+            f.write(b"0" * 200)
+        with pytest.raises(ValueError):
+            with open_tile_archive(path):
+                pass
+    with pytest.raises(ValueError):
+        with open_tile_archive("https://example.com/test.mbtiles"):
+            pass
+
+
+def test_pmtiles_reader_batches(monkeypatch):
+    monkeypatch.setattr("plateauutils.parser.tile_archive.FIND_BATCH_SIZE", 3)
+    tiles = _tiles()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.pmtiles")
+        write_pmtiles(path, tiles, 10)
+        with open_tile_archive(path) as reader:
+            # イテレータを一定数ごとに検索する
+            result = reader.read_tiles(
+                tile for tile in ["4/16/0.mvt", "3/0/0.mvt", "4/1/2.mvt", *tiles]
+            )
+    assert result == dict(sorted(tiles.items()))
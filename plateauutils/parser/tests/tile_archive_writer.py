@@ -0,0 +1,118 @@
+import gzip
+import sqlite3
+import struct
+from plateauutils.parser.tile_archive import zxy_to_tile_id
+
+# テスト用のMBTiles、PMTilesを作成する
+
+
+def _varint(value: int) -> bytes:
+    result = bytearray()
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(b | 0x80)
+        else:
+            result.append(b)
+            return bytes(result)
+
+
+def _split_tile(tile: str) -> tuple:
+    z, x, y = tile.split(".")[0].split("/")
+    return int(z), int(x), int(y)
+
+
+def write_mbtiles(path: str, tiles: dict, compress: bool = True):
+    """タイル(z/x/y.mvt)をキー、内容を値とする辞書からMBTilesを作成する"""
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+    connection.execute(
+        "CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, "
+        "tile_row INTEGER, tile_data BLOB)"
+    )
+    connection.execute(
+        "CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)"
+    )
+    connection.execute("INSERT INTO metadata VALUES ('format', 'pbf')")
+    for tile, data in tiles.items():
+        z, x, y = _split_tile(tile)
+        if compress:
+            data = gzip.compress(data)
+        connection.execute(
+            "INSERT INTO tiles VALUES (?, ?, ?, ?)", (z, x, (1 << z) - 1 - y, data)
+        )
+    connection.commit()
+    connection.close()
+
+
+def _directory(entries: list) -> bytes:
+    # (タイルID, 連続数, オフセット, 長さ)のリストをディレクトリにする
+    data = _varint(len(entries))
+    last = 0
+    for tile_id, _, _, _ in entries:
+        data += _varint(tile_id - last)
+        last = tile_id
+    for _, run_length, _, _ in entries:
+        data += _varint(run_length)
+    for _, _, _, length in entries:
+        data += _varint(length)
+    for i, (_, _, offset, _) in enumerate(entries):
+        if i > 0 and offset == entries[i - 1][2] + entries[i - 1][3]:
+            data += _varint(0)
+        else:
+            data += _varint(offset + 1)
+    return gzip.compress(data)
+
+
+def write_pmtiles(path: str, tiles: dict, leaf_size: int = None):
+    """タイル(z/x/y.mvt)をキー、内容を値とする辞書からPMTilesを作成する
+
+    leaf_sizeを指定した場合は、その数ごとにリーフディレクトリに分割する
+    同じ内容のタイルは1つのデータを共有する
+    """
+    entries = []
+    tile_data = b""
+    contents = {}
+    for tile_id, data in sorted(
+        (zxy_to_tile_id(*_split_tile(tile)), data) for tile, data in tiles.items()
+    ):
+        data = gzip.compress(data, mtime=0)
+        if data not in contents:
+            contents[data] = len(tile_data)
+            tile_data += data
+        entries.append((tile_id, 1, contents[data], len(data)))
+    leaves = b""
+    if leaf_size is None:
+        root = _directory(entries)
+    else:
+        root_entries = []
+        for i in range(0, len(entries), leaf_size):
+            leaf = _directory(entries[i : i + leaf_size])
+            root_entries.append((entries[i][0], 0, len(leaves), len(leaf)))
+            leaves += leaf
+        root = _directory(root_entries)
+    root_offset = 127
+    metadata_offset = root_offset + len(root)
+    leaf_offset = metadata_offset
+    data_offset = leaf_offset + len(leaves)
+    header = b"PMTiles" + bytes([3])
+    header += struct.pack(
+        "<11Q",
+        root_offset,
+        len(root),
+        metadata_offset,
+        0,
+        leaf_offset,
+        len(leaves),
+        data_offset,
+        len(tile_data),
+        len(entries),
+        len(entries),
+        len(contents),
+    )
+    # clustered, internal_compression, tile_compression, tile_type, min_zoom, max_zoom
+    header += bytes([1, 2, 2, 1, 0, 15])
+    header += struct.pack("<4iBii", 0, 0, 0, 0, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(header + root + leaves + tile_data)
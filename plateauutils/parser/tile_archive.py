@@ -0,0 +1,401 @@
+from contextlib import contextmanager
+import gzip
+from itertools import islice
+import numpy as np
+from plateauutils.network.range_reader import is_remote, open_remote
+from plateauutils.tile_list.tile_key import MAX_ZOOM, hilbert_codes, pack_tiles
+import sqlite3
+import struct
+
+# PMTilesのヘッダーのサイズとマジックナンバー
+PMTILES_HEADER_SIZE = 127
+PMTILES_MAGIC = b"PMTiles"
+
+# PMTilesの圧縮形式
+COMPRESSION_UNKNOWN = 0
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+
+# PMTilesでまとめて読み込むタイルの間隔の上限(バイト)
+MERGE_GAP = 16 * 1024
+
+# PMTilesで一度にディレクトリを検索するタイルの数
+FIND_BATCH_SIZE = 65536
+
+# 単一ファイルのタイルアーカイブの拡張子
+TILE_ARCHIVE_EXTENSIONS = (".mbtiles", ".pmtiles")
+
+
+def is_tile_archive(path: str) -> bool:
+    """パスがMBTiles、PMTilesのファイルか判定する
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパスもしくはURL
+
+    Returns
+    -------
+    bool
+        MBTiles、PMTilesであればTrue
+    """
+    return path.lower().endswith(TILE_ARCHIVE_EXTENSIONS)
+
+
+def _split_tile(tile: str) -> tuple:
+    # z/x/y.extを(z, x, y)に分解する
+    z, x, y = tile.split(".")[0].split("/")[-3:]
+    return int(z), int(x), int(y)
+
+
+def _tile_key(z: int, x: int, y: int) -> str:
+    # 返り値の辞書のキー(z/x/y.mvt)
+    return f"{z}/{x}/{y}.mvt"
+
+
+class MBTilesReader(object):
+    """MBTiles(SQLite)からタイルを読み込むクラス
+
+    Parameters
+    ----------
+    path : str
+        MBTilesのパス
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # 読み込み専用で開く
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def close(self):
+        """ファイルを閉じる"""
+        self._connection.close()
+
+    def metadata(self) -> dict:
+        """metadataテーブルの内容を返す
+
+        Returns
+        -------
+        dict
+            名前をキー、値を値とする辞書
+        """
+        return dict(self._connection.execute("SELECT name, value FROM metadata"))
+
+    def read_tiles(self, tiles: list) -> dict:
+        """タイルの内容を読み込む
+
+        タイルの一覧を一時テーブルに入れ、(zoom_level, tile_column, tile_row)の
+        索引を利用した結合で一度に取得する
+
+        Parameters
+        ----------
+        tiles : list
+            タイル(z/x/y.mvt)のリスト(イテレータも可)
+
+        Returns
+        -------
+        dict
+            存在するタイル(z/x/y.mvt)をキー、内容を値とする辞書(キーの順)
+        """
+        # MBTilesのtile_rowはTMS(y軸が南から北)
+        rows = ((z, x, (1 << z) - 1 - y) for z, x, y in map(_split_tile, tiles))
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS targets "
+                "(zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER)"
+            )
+            cursor.execute("DELETE FROM targets")
+            cursor.executemany("INSERT INTO targets VALUES (?, ?, ?)", rows)
+            cursor.execute(
+                "SELECT t.zoom_level, t.tile_column, t.tile_row, t.tile_data "
+                "FROM targets AS s JOIN tiles AS t "
+                "ON t.zoom_level = s.zoom_level "
+                "AND t.tile_column = s.tile_column "
+                "AND t.tile_row = s.tile_row"
+            )
+            result = {}
+            for z, x, row, data in cursor:
+                result[_tile_key(z, x, (1 << z) - 1 - row)] = _decompress(
+                    bytes(data), COMPRESSION_UNKNOWN
+                )
+        finally:
+            cursor.close()
+        return dict(sorted(result.items()))
+
+
+def zxy_to_tile_id(z: int, x: int, y: int) -> int:
+    """タイルの座標をPMTilesのタイルID(ヒルベルト曲線の順序)に変換する
+
+    Parameters
+    ----------
+    z : int
+        ズームレベル
+    x : int
+        タイルのx座標
+    y : int
+        タイルのy座標
+
+    Returns
+    -------
+    int
+        タイルID
+    """
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise ValueError(f"tile is out of range: {z}/{x}/{y}")
+    return int(zxy_to_tile_ids([z], [x], [y])[0])
+
+
+def zxy_to_tile_ids(
+    zoom: np.ndarray, xtiles: np.ndarray, ytiles: np.ndarray
+) -> np.ndarray:
+    """タイルの座標の配列をPMTilesのタイルIDの配列に変換する
+
+    ズームレベル内のヒルベルト曲線上の位置に、それより小さいズームレベルの
+    タイルの数を加える
+
+    Parameters
+    ----------
+    zoom : numpy.ndarray
+        ズームレベルの配列
+    xtiles : numpy.ndarray
+        タイルのxの配列
+    ytiles : numpy.ndarray
+        タイルのyの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルIDの配列(uint64)
+    """
+    zoom = np.asarray(zoom, dtype=np.uint64)
+    offsets = ((np.uint64(1) << (np.uint64(2) * zoom)) - np.uint64(1)) // np.uint64(3)
+    return offsets + hilbert_codes(pack_tiles(xtiles, ytiles, zoom))
+
+
+class PMTilesReader(object):
+    """PMTiles(v3)からタイルを読み込むクラス
+
+    ディレクトリを二分探索してタイルの位置を求め、対象のタイルの範囲のみを読み込む
+    URLの場合はRangeリクエストで必要な範囲のみを取得する
+
+    Parameters
+    ----------
+    path : str
+        PMTilesのパスもしくはURL
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open_remote(path) if is_remote(path) else open(path, "rb")
+        try:
+            self._read_header()
+        except Exception:
+            self._file.close()
+            raise
+        # 読み込んだリーフディレクトリ
+        self._leaves = {}
+
+    def close(self):
+        """ファイルを閉じる"""
+        self._file.close()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self._file.seek(offset)
+        data = self._file.read(length)
+        if len(data) != length:
+            raise ValueError(f"{self.path} is truncated")
+        return data
+
+    def _read_header(self):
+        header = self._read(0, PMTILES_HEADER_SIZE)
+        if header[:7] != PMTILES_MAGIC or header[7] != 3:
+            raise ValueError(f"{self.path} is not a PMTiles v3 file")
+        (
+            self.root_offset,
+            self.root_length,
+            self.metadata_offset,
+            self.metadata_length,
+            self.leaf_offset,
+            self.leaf_length,
+            self.data_offset,
+            self.data_length,
+        ) = struct.unpack_from("<8Q", header, 8)
+        (
+            self.internal_compression,
+            self.tile_compression,
+            self.tile_type,
+            self.min_zoom,
+            self.max_zoom,
+        ) = struct.unpack_from("<5B", header, 97)
+        self._root = self._read_directory(self.root_offset, self.root_length)
+
+    def _read_directory(self, offset: int, length: int) -> tuple:
+        # ディレクトリを(タイルID, 連続数, オフセット, 長さ)の配列にする
+        data = _decompress(self._read(offset, length), self.internal_compression)
+        count, pos = _read_varint(data, 0)
+        columns = []
+        for _ in range(4):
+            column = np.zeros(count, dtype=np.uint64)
+            for i in range(count):
+                column[i], pos = _read_varint(data, pos)
+            columns.append(column)
+        deltas, run_lengths, lengths, offsets = columns
+        tile_ids = np.cumsum(deltas, dtype=np.uint64)
+        # オフセットが0の場合は直前のエントリの直後
+        for i in range(count):
+            if i > 0 and offsets[i] == 0:
+                offsets[i] = offsets[i - 1] + lengths[i - 1]
+            else:
+                offsets[i] -= 1
+        return tile_ids, run_lengths, offsets, lengths
+
+    def _leaf(self, offset: int, length: int) -> tuple:
+        key = (offset, length)
+        if key not in self._leaves:
+            self._leaves[key] = self._read_directory(self.leaf_offset + offset, length)
+        return self._leaves[key]
+
+    def _find(self, tile_ids: np.ndarray) -> tuple:
+        # タイルIDのデータの位置を求める(無い場合は長さ0)
+        offsets = np.zeros(len(tile_ids), dtype=np.uint64)
+        lengths = np.zeros(len(tile_ids), dtype=np.uint64)
+        pending = [(self._root, np.arange(len(tile_ids)))]
+        while pending:
+            directory, indices = pending.pop()
+            entry_ids, run_lengths, entry_offsets, entry_lengths = directory
+            # タイルID以下で最大のエントリを二分探索する
+            positions = np.searchsorted(entry_ids, tile_ids[indices], side="right") - 1
+            found = positions >= 0
+            indices = indices[found]
+            positions = positions[found]
+            run = run_lengths[positions]
+            # タイルのエントリ
+            tile = (run > 0) & (tile_ids[indices] < entry_ids[positions] + run)
+            offsets[indices[tile]] = entry_offsets[positions[tile]] + self.data_offset
+            lengths[indices[tile]] = entry_lengths[positions[tile]]
+            # リーフディレクトリのエントリ
+            leaf = run == 0
+            for position in np.unique(positions[leaf]):
+                pending.append(
+                    (
+                        self._leaf(
+                            int(entry_offsets[position]), int(entry_lengths[position])
+                        ),
+                        indices[leaf & (positions == position)],
+                    )
+                )
+        return offsets, lengths
+
+    def read_tiles(self, tiles: list) -> dict:
+        """タイルの内容を読み込む
+
+        Parameters
+        ----------
+        tiles : list
+            タイル(z/x/y.mvt)のリスト(イテレータも可)
+
+        Returns
+        -------
+        dict
+            存在するタイル(z/x/y.mvt)をキー、内容を値とする辞書(キーの順)
+        """
+        # 一定数ごとにディレクトリを検索し、存在するタイルのみを保持する
+        keys = []
+        offsets = [np.zeros(0, dtype=np.uint64)]
+        lengths = [np.zeros(0, dtype=np.uint64)]
+        tiles = iter(tiles)
+        while True:
+            batch = list(islice(tiles, FIND_BATCH_SIZE))
+            if len(batch) == 0:
+                break
+            # 範囲外のタイルは除外する
+            targets = [
+                (z, x, y)
+                for z, x, y in map(_split_tile, batch)
+                if z <= MAX_ZOOM and 0 <= x < 1 << z and 0 <= y < 1 << z
+            ]
+            tile_ids = zxy_to_tile_ids(
+                *np.array(targets, dtype=np.int64).reshape((-1, 3)).T
+            )
+            batch_offsets, batch_lengths = self._find(tile_ids)
+            found = np.flatnonzero(batch_lengths > 0)
+            keys.extend(_tile_key(*targets[i]) for i in found)
+            offsets.append(batch_offsets[found])
+            lengths.append(batch_lengths[found])
+        offsets = np.concatenate(offsets)
+        lengths = np.concatenate(lengths)
+        hits = np.arange(len(keys))
+        # オフセット順に並べ、近接する範囲はまとめて読み込む
+        hits = hits[np.argsort(offsets[hits], kind="stable")]
+        result = {}
+        start = 0
+        while start < len(hits):
+            end = start + 1
+            range_start = int(offsets[hits[start]])
+            range_end = range_start + int(lengths[hits[start]])
+            while end < len(hits) and int(offsets[hits[end]]) <= range_end + MERGE_GAP:
+                range_end = max(
+                    range_end, int(offsets[hits[end]]) + int(lengths[hits[end]])
+                )
+                end += 1
+            data = self._read(range_start, range_end - range_start)
+            for i in hits[start:end]:
+                offset = int(offsets[i]) - range_start
+                result[keys[i]] = _decompress(
+                    data[offset : offset + int(lengths[i])], self.tile_compression
+                )
+            start = end
+        return dict(sorted(result.items()))
+
+
+@contextmanager
+def open_tile_archive(path: str):
+    """MBTilesもしくはPMTilesのファイルを開く
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパス(PMTilesの場合はURLも可)
+
+    Yields
+    ------
+    MBTilesReader or PMTilesReader
+        タイルを読み込むオブジェクト
+    """
+    if path.lower().endswith(".mbtiles"):
+        if is_remote(path):
+            raise ValueError("MBTiles cannot be read remotely")
+        reader = MBTilesReader(path)
+    elif path.lower().endswith(".pmtiles"):
+        reader = PMTilesReader(path)
+    else:
+        raise ValueError(f"{path} is not a tile archive")
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def _read_varint(data: bytes, pos: int) -> tuple:
+    # varintを1つ読み込み、値と次の位置を返す
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _decompress(data: bytes, compression: int) -> bytes:
+    # gzipで圧縮されていれば展開する
+    if compression == COMPRESSION_GZIP or (
+        compression == COMPRESSION_UNKNOWN and data[:2] == b"\x1f\x8b"
+    ):
+        return gzip.decompress(data)
+    if compression not in [COMPRESSION_UNKNOWN, COMPRESSION_NONE]:
+        raise ValueError(f"unsupported compression: {compression}")
+    return data
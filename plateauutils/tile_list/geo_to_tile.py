@@ -1,6 +1,10 @@
 import math
+import numpy as np
 from shapely.geometry import Point, Polygon
 
+# points_to_tilesでpoint_to_tileと同じ計算をし直す、タイルの境界との距離(タイル単位)
+BOUNDARY_TOLERANCE = 1e-6
+
 
 def _deg2num(lat_deg, lon_deg, zoom):
     # https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames#Python
@@ -89,3 +93,99 @@ def tile_to_polygon(tile_path: str) -> Polygon:
         (from_longitude, from_latitude),
     )
     return Polygon(coords)
+
+
+def points_to_tiles(longitudes: np.ndarray, latitudes: np.ndarray, zoom: int) -> tuple:
+    """経度緯度の配列をタイルのx, yの配列に変換して返す
+
+    point_to_tileをまとめて計算する版で、文字列には変換しない
+    タイルの境界上(およびその近傍)の点は、numpyとmathの三角関数の誤差で
+    隣のタイルになることがあるため、_deg2numで計算し直して結果を一致させる
+
+    Parameters
+    ----------
+    longitudes : numpy.ndarray
+        経度の配列
+    latitudes : numpy.ndarray
+        緯度の配列
+    zoom : int
+        ズームレベル
+
+    Returns
+    -------
+    tuple
+        タイルのxの配列とyの配列(int64)
+    """
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    n = 1 << zoom
+    # _deg2numと同じく0方向に切り捨てる
+    xtiles = ((longitudes + 180.0) / 360.0 * n).astype(np.int64)
+    y = (1.0 - np.arcsinh(np.tan(np.radians(latitudes))) / np.pi) / 2.0 * n
+    ytiles = y.astype(np.int64)
+    # 境界に近い点のみ、point_to_tileと同じ計算で求め直す
+    near = np.flatnonzero(np.abs(y - np.round(y)) < BOUNDARY_TOLERANCE)
+    for i in near.tolist():
+        ytiles[i] = _deg2num(float(latitudes[i]), 0.0, zoom)[1]
+    return xtiles, ytiles
+
+
+def tiles_to_bounds(xtiles: np.ndarray, ytiles: np.ndarray, zoom: int) -> np.ndarray:
+    """タイルのx, yの配列を範囲の配列に変換して返す
+
+    Parameters
+    ----------
+    xtiles : numpy.ndarray
+        タイルのxの配列
+    ytiles : numpy.ndarray
+        タイルのyの配列
+    zoom : int
+        ズームレベル
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルごとの(最小経度, 最小緯度, 最大経度, 最大緯度)の(タイル数, 4)の配列
+    """
+    xtiles = np.asarray(xtiles, dtype=np.int64)
+    ytiles = np.asarray(ytiles, dtype=np.int64)
+    max_tile = 2**zoom
+    if zoom < 0 or (xtiles < 0).any() or (ytiles < 0).any():
+        raise TileRangeException("Tile range must be positive integer")
+    if (xtiles >= max_tile).any() or (ytiles >= max_tile).any():
+        raise TileRangeException(f"Tile range must be less than {max_tile}")
+    n = 1 << zoom
+    bounds = np.empty(xtiles.shape + (4,), dtype=np.float64)
+    bounds[..., 0] = xtiles / n * 360.0 - 180.0
+    bounds[..., 2] = (xtiles + 1) / n * 360.0 - 180.0
+    # yが大きいほど南になる
+    bounds[..., 1] = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (ytiles + 1) / n))))
+    bounds[..., 3] = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * ytiles / n))))
+    return bounds
+
+
+def tiles_to_paths(
+    xtiles: np.ndarray, ytiles: np.ndarray, zoom: int, ext: str = ".mvt"
+) -> list:
+    """タイルのx, yの配列をタイルのパスのリストに変換して返す
+
+    Parameters
+    ----------
+    xtiles : numpy.ndarray
+        タイルのxの配列
+    ytiles : numpy.ndarray
+        タイルのyの配列
+    zoom : int
+        ズームレベル
+    ext : str, optional
+        タイルの拡張子, by default ".mvt"
+
+    Returns
+    -------
+    list
+        タイルのパスのリスト
+    """
+    return [
+        f"{zoom}/{x}/{y}{ext}"
+        for x, y in zip(np.ravel(xtiles).tolist(), np.ravel(ytiles).tolist())
+    ]
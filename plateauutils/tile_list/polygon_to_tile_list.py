@@ -1,9 +1,13 @@
-from itertools import product
 from plateauutils.abc.polygon_to_list import PolygonToList
-from plateauutils.tile_list.geo_to_tile import (
-    point_to_tile,
-    tile_to_polygon,
+from plateauutils.tile_list.tile_cover import (
+    CHUNK_SIZE,
+    iter_tile_cover,
+    quadtree_tile_cover,
+    tile_cover,
+    tile_range,
 )
+from plateauutils.tile_list.tile_key import keys_to_paths, pack_tiles, sort_tiles
+import numpy as np
 from shapely.geometry import Polygon
 
 
@@ -18,27 +22,100 @@ class PolygonToTileList(PolygonToList):
         ズームレベル
     ext : str, optional
         タイルの拡張子, by default ".mvt"
+    lazy : bool, optional
+        Trueの場合は作成時にタイルを求めず、keys、outputの呼び出し時に求める
+        iter_tilesのみを使う場合は全てのタイルを保持しない, by default False
     """
 
-    def __init__(self, polygon: Polygon, zoom: int, ext: str = ".mvt"):
+    def __init__(
+        self, polygon: Polygon, zoom: int, ext: str = ".mvt", lazy: bool = False
+    ):
         super().__init__(polygon)
         self.zoom = zoom
         self.ext = ext
-        self.split()
+        self.targets = None
+        # targetsと同じ順の、ポリゴンに完全に含まれるタイルかの配列
+        self.interior = None
+        if not lazy:
+            self.split()
+
+    def __iter__(self):
+        return self.iter_tiles()
 
     def split(self):
         """対象となるポリゴンを分割してタイルのリストを作成する"""
-        start_tile = point_to_tile(self.start_pos, self.zoom)
-        end_tile = point_to_tile(self.end_pos, self.zoom)
-        _, start_x, start_y = start_tile.split("/")
-        start_x = int(start_x)
-        start_y = int(start_y.split(".")[0])
-        _, end_x, end_y = end_tile.split("/")
-        end_x = int(end_x)
-        end_y = int(end_y.split(".")[0])
-        self.targets = _tile_list_range(
-            start_x, start_y, end_x, end_y, self.zoom, self.ext
+        # iter_tiles、PolygonToTilePyramidと同じく、範囲の南西端と北東端の点を
+        # 含むタイルの間を対象とする
+        start_x, start_y, end_x, end_y = tile_range(self.polygon, self.zoom)
+        # 範囲内のタイルのうち、ポリゴンと交差するタイルのみを求める
+        xtiles, ytiles, self.interior = tile_cover(
+            self.polygon,
+            self.zoom,
+            start_x,
+            start_y,
+            end_x,
+            end_y,
+            return_interior=True,
         )
+        # タイルはキーの配列(x、yの順)で保持し、出力時にパスに変換する
+        self.targets = pack_tiles(xtiles, ytiles, self.zoom)
+
+    def keys(self, order: str = "zxy") -> np.ndarray:
+        """タイルのキーの配列を返す
+
+        Parameters
+        ----------
+        order : str, optional
+            並べ替えの順序(hilbert, morton, zxy), by default "zxy"
+
+        Returns
+        -------
+        numpy.ndarray
+            ポリゴンと交差するタイルのキーの配列
+        """
+        return sort_tiles(self._keys(), order)
+
+    def iter_tiles(self, chunk_size: int = CHUNK_SIZE, classify: bool = False):
+        """ポリゴンと交差するタイルを順に返す
+
+        タイルを求めていない場合は列の帯ごとに求めるため、メモリの使用量は
+        chunk_sizeにおよそ比例する
+        順序はx、yの数値の順(outputの文字列の順とは異なる)
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            一度に求めるタイルの数の目安, by default CHUNK_SIZE
+        classify : bool, optional
+            Trueの場合はポリゴンに完全に含まれるタイルかも返す, by default False
+
+        Yields
+        ------
+        str or tuple
+            タイルのパス(z/x/y.ext)
+            classifyがTrueの場合は(タイルのパス, ポリゴンに完全に含まれるか)
+        """
+        if self.targets is None:
+            chunks = (
+                (pack_tiles(xtiles, ytiles, self.zoom), interior)
+                for xtiles, ytiles, interior in iter_tile_cover(
+                    self.polygon, self.zoom, chunk_size, return_interior=True
+                )
+            )
+        else:
+            chunks = (
+                (
+                    self.targets[start : start + chunk_size],
+                    self.interior[start : start + chunk_size],
+                )
+                for start in range(0, len(self.targets), chunk_size)
+            )
+        for keys, interior in chunks:
+            paths = keys_to_paths(keys, self.ext)
+            if classify:
+                yield from zip(paths, interior.tolist())
+            else:
+                yield from paths
 
     def output(self) -> list:
         """タイルのリストを出力する
@@ -46,47 +123,96 @@ class PolygonToTileList(PolygonToList):
         Returns
         -------
         list
-            タイルのリスト
+            ポリゴンと交差するタイルのリスト
         """
-        output_list = []
-        for i in self.targets:
-            polygon = tile_to_polygon(i)
-            # ポリゴンが交差しているかどうかを判定
-            if self.polygon.intersects(polygon):
-                output_list.append(i)
-        return sorted(output_list)
+        return sorted(keys_to_paths(self._keys(), self.ext))
+
+    def classify(self) -> dict:
+        """タイルをポリゴンに完全に含まれるものと、辺が通るものに分けて出力する
 
+        被覆を求める際の走査線で内部と判定したタイルをinteriorとするため、
+        追加の判定は行わない
+        interiorのタイルはポリゴンで切り抜く必要がない
 
-def _tile_list_range(
-    start_x: int, start_y: int, end_x: int, end_y: int, zoom: int, ext: str
-) -> list:
-    """タイルのリストを作成する
+        Returns
+        -------
+        dict
+            interior(ポリゴンに完全に含まれるタイル)、boundary(辺が通るタイル)を
+            キー、タイルのリストを値とする辞書
+        """
+        keys = self._keys()
+        return {
+            "interior": sorted(keys_to_paths(keys[self.interior], self.ext)),
+            "boundary": sorted(keys_to_paths(keys[~self.interior], self.ext)),
+        }
+
+    def _keys(self) -> np.ndarray:
+        # lazyの場合は最初に必要になった時点で求める
+        if self.targets is None:
+            self.split()
+        return self.targets
+
+
+class PolygonToTilePyramid(PolygonToList):
+    """Polygonから複数のズームレベルのタイルのリストを返すクラス
+
+    最小のズームレベルから4分割していき、ポリゴンに完全に含まれるタイルの子は
+    判定せずに含めるため、ズームレベルごとにPolygonToTileListを作成するより速い
+    各ズームレベルのタイルはPolygonToTileListと一致する
 
     Parameters
     ----------
-    start_x : int
-        開始x座標
-    start_y : int
-        開始y座標
-    end_x : int
-        終了x座標
-    end_y : int
-        終了y座標
-    zoom : int
-        ズームレベル
-    ext : str
-        タイルの拡張子
-
-    Returns
-    -------
-    list
-        タイルのリスト
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン
+    min_zoom : int
+        最小のズームレベル
+    max_zoom : int
+        最大のズームレベル
+    ext : str, optional
+        タイルの拡張子, by default ".mvt"
     """
-    matrix = []
-    matrix.append(range(zoom, zoom + 1))
-    matrix.append(range(start_x, end_x + 1))
-    # y軸は上下逆(コンピュータ座標に合わせる)
-    matrix.append(range(end_y, start_y + 1))
-    combinations = product(*matrix)
-    tile_base = ["/".join(map(str, i)) for i in combinations]
-    return [i + ext for i in tile_base]
+
+    def __init__(
+        self, polygon: Polygon, min_zoom: int, max_zoom: int, ext: str = ".mvt"
+    ):
+        super().__init__(polygon)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.ext = ext
+        self.split()
+
+    def split(self):
+        """対象となるポリゴンを分割してズームレベルごとのタイルのリストを作成する"""
+        covers = quadtree_tile_cover(self.polygon, self.min_zoom, self.max_zoom)
+        self.targets = {
+            zoom: pack_tiles(xtiles, ytiles, zoom)
+            for zoom, (xtiles, ytiles) in covers.items()
+        }
+
+    def keys(self, order: str = "zxy") -> np.ndarray:
+        """全てのズームレベルのタイルのキーの配列を返す
+
+        Parameters
+        ----------
+        order : str, optional
+            並べ替えの順序(hilbert, morton, zxy), by default "zxy"
+
+        Returns
+        -------
+        numpy.ndarray
+            ポリゴンと交差するタイルのキーの配列(ズームレベルの小さい順)
+        """
+        return sort_tiles(np.concatenate(list(self.targets.values())), order)
+
+    def output(self) -> dict:
+        """ズームレベルごとのタイルのリストを出力する
+
+        Returns
+        -------
+        dict
+            ズームレベルをキー、ポリゴンと交差するタイルのリストを値とする辞書
+        """
+        return {
+            zoom: sorted(keys_to_paths(keys, self.ext))
+            for zoom, keys in self.targets.items()
+        }
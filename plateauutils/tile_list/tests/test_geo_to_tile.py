@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from shapely.geometry import Polygon, Point
 
@@ -45,3 +46,70 @@ def test_invalid_tile_to_polygon():
     with pytest.raises(TileRangeException) as e:
         tile_to_polygon(tile_path)
     assert str(e.value) == "Tile range must be less than 2"
+
+
+def test_points_to_tiles():
+    from plateauutils.tile_list.geo_to_tile import (
+        point_to_tile,
+        points_to_tiles,
+        tiles_to_paths,
+    )
+
+    rng = np.random.default_rng(0)
+    longitudes = rng.uniform(-180.0, 180.0, 10000)
+    latitudes = rng.uniform(-85.0, 85.0, 10000)
+    for zoom in [0, 10, 16, 22]:
+        xtiles, ytiles = points_to_tiles(longitudes, latitudes, zoom)
+        assert xtiles.dtype == np.int64
+        paths = tiles_to_paths(xtiles, ytiles, zoom)
+        # 1点ずつ変換した結果と一致する
+        assert paths == [
+            point_to_tile(Point(x, y), zoom) for x, y in zip(longitudes, latitudes)
+        ]
+    xtiles, ytiles = points_to_tiles([139.767125], [35.681236], 16)
+    assert tiles_to_paths(xtiles, ytiles, 16, ".pbf") == ["16/58211/25806.pbf"]
+
+
+def test_points_to_tiles_on_tile_edges():
+    from plateauutils.tile_list.geo_to_tile import (
+        point_to_tile,
+        points_to_tiles,
+        tile_to_polygon,
+        tiles_to_paths,
+    )
+
+    # タイルの角の座標(境界上)でもpoint_to_tileと一致する
+    for zoom in [1, 9, 15, 20]:
+        n = 1 << zoom
+        corners = []
+        for x in np.linspace(0, n - 1, 12, dtype=np.int64).tolist():
+            for y in np.linspace(1, n - 1, 12, dtype=np.int64).tolist():
+                corners.extend(tile_to_polygon(f"{zoom}/{x}/{y}.mvt").exterior.coords)
+        longitudes, latitudes = np.array(corners).T
+        xtiles, ytiles = points_to_tiles(longitudes, latitudes, zoom)
+        assert tiles_to_paths(xtiles, ytiles, zoom) == [
+            point_to_tile(Point(x, y), zoom) for x, y in corners
+        ]
+
+
+def test_tiles_to_bounds():
+    from plateauutils.tile_list.geo_to_tile import (
+        TileRangeException,
+        tile_to_polygon,
+        tiles_to_bounds,
+    )
+
+    bounds = tiles_to_bounds(np.array([58211, 0]), np.array([25806, 65535]), 16)
+    assert bounds.shape == (2, 4)
+    assert tuple(bounds[0]) == pytest.approx(
+        tile_to_polygon("16/58211/25806.mvt").bounds, rel=1e-12
+    )
+    assert tuple(bounds[1]) == pytest.approx(
+        tile_to_polygon("16/0/65535.mvt").bounds, rel=1e-12
+    )
+    with pytest.raises(TileRangeException) as e:
+        tiles_to_bounds(np.array([0, 2]), np.array([0, 0]), 1)
+    assert str(e.value) == "Tile range must be less than 2"
+    with pytest.raises(TileRangeException) as e:
+        tiles_to_bounds(np.array([-1]), np.array([0]), 1)
+    assert str(e.value) == "Tile range must be positive integer"
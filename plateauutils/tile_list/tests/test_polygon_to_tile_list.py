@@ -1,22 +1,12 @@
+import numpy as np
 from plateauutils.tile_list.polygon_to_tile_list import (
     PolygonToTileList,
-    _tile_list_range,
+    PolygonToTilePyramid,
 )
-from shapely import from_wkt
-
-
-def test_tile_list_range():
-    assert _tile_list_range(0, 0, 0, 0, 0, ".mvt") == ["0/0/0.mvt"]
-    assert sorted(_tile_list_range(58211, 25807, 58213, 25806, 16, ".mvt")) == sorted(
-        [
-            "16/58211/25807.mvt",
-            "16/58211/25806.mvt",
-            "16/58212/25807.mvt",
-            "16/58212/25806.mvt",
-            "16/58213/25807.mvt",
-            "16/58213/25806.mvt",
-        ]
-    )
+from plateauutils.tile_list.geo_to_tile import point_to_tile, tile_to_polygon
+from plateauutils.tile_list.tile_key import keys_to_paths, pack_tiles
+from shapely import box, from_wkt
+from shapely.geometry import LineString, MultiPolygon, Point, Polygon
 
 
 def test_polygon_to_tile_list():
@@ -49,3 +39,147 @@ def test_polygon_to_tile_list():
             "16/58212/25807.mvt",
         ]
     )
+
+
+def _intersecting_tiles(polygon, zoom):
+    # 範囲内の全てのタイルをshapelyで判定した結果
+    start = point_to_tile(Point(polygon.bounds[0], polygon.bounds[1]), zoom)
+    end = point_to_tile(Point(polygon.bounds[2], polygon.bounds[3]), zoom)
+    _, start_x, start_y = [int(i) for i in start.split(".")[0].split("/")]
+    _, end_x, end_y = [int(i) for i in end.split(".")[0].split("/")]
+    # y軸は上下逆(コンピュータ座標に合わせる)
+    xtiles, ytiles = np.meshgrid(
+        np.arange(start_x, end_x + 1), np.arange(end_y, start_y + 1)
+    )
+    tiles = keys_to_paths(pack_tiles(xtiles.ravel(), ytiles.ravel(), zoom))
+    return sorted(i for i in tiles if polygon.intersects(tile_to_polygon(i)))
+
+
+def test_polygon_to_tile_list_exact_cover():
+    # 細長い斜めのポリゴン
+    river = LineString([(139.0, 35.0), (139.3, 35.2), (139.35, 35.5)]).buffer(0.0003)
+    # 穴のあるポリゴン
+    ring = Point(139.7, 35.6).buffer(0.05).difference(Point(139.7, 35.6).buffer(0.03))
+    # タイルの境界に頂点と辺を揃えたポリゴン(隣のタイルと接する)
+    a = tile_to_polygon("14/14552/6451.mvt").bounds
+    b = tile_to_polygon("14/14554/6452.mvt").bounds
+    aligned = Polygon([(a[0], a[3]), (b[2], a[3]), (b[2], b[1]), (a[2], a[1])])
+    multi = MultiPolygon([river.buffer(-0.0001), box(139.8, 35.8, 139.81, 35.83)])
+    for polygon, zoom in [
+        (river, 14),
+        (river, 16),
+        (ring, 13),
+        (aligned, 14),
+        (aligned, 15),
+        (multi, 15),
+    ]:
+        expected = _intersecting_tiles(polygon, zoom)
+        assert PolygonToTileList(polygon, zoom).output() == expected
+
+
+def test_polygon_to_tile_pyramid():
+    river = LineString([(139.0, 35.0), (139.3, 35.2), (139.35, 35.5)]).buffer(0.003)
+    ring = Point(139.7, 35.6).buffer(0.05).difference(Point(139.7, 35.6).buffer(0.03))
+    a = tile_to_polygon("14/14552/6451.mvt").bounds
+    b = tile_to_polygon("14/14554/6452.mvt").bounds
+    aligned = Polygon([(a[0], a[3]), (b[2], a[3]), (b[2], b[1]), (a[2], a[1])])
+    for polygon in [river, ring, aligned]:
+        pyramid = PolygonToTilePyramid(polygon, 8, 16).output()
+        assert list(pyramid) == list(range(8, 17))
+        for zoom, tiles in pyramid.items():
+            # ズームレベルごとに求めた結果と一致する
+            assert tiles == PolygonToTileList(polygon, zoom).output()
+    # 辺や頂点で接するタイルも含む
+    assert PolygonToTilePyramid(aligned, 14, 15).output()[14] == [
+        "14/14552/6451.mvt",
+        "14/14552/6452.mvt",
+        "14/14553/6451.mvt",
+        "14/14553/6452.mvt",
+        "14/14554/6451.mvt",
+        "14/14554/6452.mvt",
+        "14/14554/6453.mvt",
+        "14/14555/6451.mvt",
+        "14/14555/6452.mvt",
+        "14/14555/6453.mvt",
+    ]
+
+
+def test_polygon_to_tile_pyramid_aligned():
+    # 範囲の端がタイルの境界上にある場合も、ズームレベルごとに求めた結果と一致する
+    for polygon in _aligned_boxes(20):
+        pyramid = PolygonToTilePyramid(polygon, 12, 17).output()
+        for zoom, tiles in pyramid.items():
+            assert tiles == PolygonToTileList(polygon, zoom).output()
+
+
+def test_polygon_to_tile_list_keys():
+    polygon = Point(139.7, 35.6).buffer(0.05)
+    tile_list = PolygonToTileList(polygon, 14)
+    assert keys_to_paths(tile_list.keys()) == tile_list.output()
+    pyramid = PolygonToTilePyramid(polygon, 12, 14)
+    keys = pyramid.keys("hilbert")
+    assert len(keys) == sum(len(tiles) for tiles in pyramid.output().values())
+    assert (pyramid.keys() == np.sort(keys)).all()
+
+
+def test_polygon_to_tile_list_iter_tiles():
+    river = LineString([(139.0, 35.0), (139.3, 35.2), (139.35, 35.5)]).buffer(0.003)
+    ring = Point(139.7, 35.6).buffer(0.05).difference(Point(139.7, 35.6).buffer(0.03))
+    for polygon in [river, ring, LineString([(139.0, 35.0), (139.1, 35.05)])]:
+        expected = PolygonToTileList(polygon, 15)
+        lazy = PolygonToTileList(polygon, 15, lazy=True)
+        # 列の帯ごとに求めた結果はまとめて求めた結果と一致し、x、yの順に並ぶ
+        tiles = list(lazy.iter_tiles(chunk_size=50))
+        assert tiles == keys_to_paths(expected.keys())
+        assert lazy.targets is None
+        assert list(expected) == tiles
+        assert lazy.output() == expected.output()
+
+
+def _aligned_boxes(count: int) -> list:
+    # ズームレベル15のタイルの境界に辺を揃えた矩形
+    rng = np.random.default_rng(0)
+    boxes = []
+    for _ in range(count):
+        x0, x1 = np.sort(rng.integers(29100, 29130, 2)).tolist()
+        y0, y1 = np.sort(rng.integers(12900, 12910, 2)).tolist()
+        a = tile_to_polygon(f"15/{x0}/{y0}.mvt").bounds
+        b = tile_to_polygon(f"15/{x1}/{y1}.mvt").bounds
+        boxes.append(box(a[0], b[1], b[2], a[3]))
+    return boxes
+
+
+def test_polygon_to_tile_list_iter_tiles_aligned():
+    # 範囲の端がタイルの境界上にある場合も、帯ごとに求めた結果と一致する
+    for polygon in _aligned_boxes(60):
+        expected = PolygonToTileList(polygon, 15).output()
+        lazy = PolygonToTileList(polygon, 15, lazy=True)
+        assert sorted(lazy.iter_tiles(chunk_size=8)) == expected
+
+
+def test_polygon_to_tile_list_classify():
+    ring = Point(139.7, 35.6).buffer(0.05).difference(Point(139.7, 35.6).buffer(0.03))
+    a = tile_to_polygon("14/14552/6451.mvt").bounds
+    b = tile_to_polygon("14/14554/6452.mvt").bounds
+    aligned = box(a[0], b[1], b[2], a[3])
+    for polygon in [ring, aligned]:
+        tile_list = PolygonToTileList(polygon, 15)
+        classified = tile_list.classify()
+        assert sorted(classified["interior"] + classified["boundary"]) == (
+            tile_list.output()
+        )
+        # 内部のタイルはポリゴンに完全に含まれ、辺と接しない
+        for tile in classified["interior"]:
+            assert polygon.contains_properly(tile_to_polygon(tile))
+        for tile in classified["boundary"]:
+            assert not polygon.contains_properly(tile_to_polygon(tile))
+        # 列の帯ごとに求めても同じ
+        lazy = PolygonToTileList(polygon, 15, lazy=True)
+        streamed = dict(lazy.iter_tiles(chunk_size=20, classify=True))
+        assert streamed == dict(tile_list.iter_tiles(classify=True))
+        assert sorted(t for t, inside in streamed.items() if inside) == (
+            classified["interior"]
+        )
+    # ポリゴン以外は全て辺が通るタイルとする
+    line = PolygonToTileList(LineString([(139.0, 35.0), (139.1, 35.05)]), 14)
+    assert line.classify()["interior"] == []
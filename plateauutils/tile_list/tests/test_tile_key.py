@@ -0,0 +1,135 @@
+import numpy as np
+from plateauutils.parser.tile_archive import zxy_to_tile_ids
+from plateauutils.tile_list.geo_to_tile import tile_to_polygon
+from plateauutils.tile_list.tile_key import (
+    NO_TILE,
+    keys_to_bounds,
+    keys_to_paths,
+    keys_to_quadkeys,
+    pack_tiles,
+    paths_to_keys,
+    quadkeys_to_keys,
+    sort_tiles,
+    tile_children,
+    tile_neighbors,
+    tile_parents,
+    unpack_tiles,
+)
+import pytest
+
+
+def test_pack_tiles():
+    keys = pack_tiles([0, 58211, (1 << 29) - 1], [0, 25806, 3], [0, 16, 29])
+    assert keys.dtype == np.uint64
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    assert zoom.tolist() == [0, 16, 29]
+    assert xtiles.tolist() == [0, 58211, (1 << 29) - 1]
+    assert ytiles.tolist() == [0, 25806, 3]
+    # ズームレベル、x、yの順に並ぶ
+    assert np.sort(pack_tiles([1, 0, 0], [0, 1, 0], [1, 1, 2])).tolist() == (
+        pack_tiles([0, 1, 0], [1, 0, 0], [1, 1, 2]).tolist()
+    )
+    with pytest.raises(ValueError):
+        pack_tiles([0], [0], [30])
+    # 範囲外のタイル、負のズームレベルはエラー
+    for xtiles, ytiles, zoom in [
+        ([-1], [0], 1),
+        ([0], [-1], 1),
+        ([2], [0], 1),
+        ([0], [4], 2),
+        ([1], [0], 0),
+        ([0], [0], -1),
+    ]:
+        with pytest.raises(ValueError):
+            pack_tiles(xtiles, ytiles, zoom)
+
+
+def test_paths_and_quadkeys():
+    paths = ["16/58211/25806.mvt", "0/0/0.mvt", "3/3/5.mvt"]
+    keys = paths_to_keys(paths)
+    assert keys_to_paths(keys) == paths
+    assert keys_to_paths(keys[:1], ".pbf") == ["16/58211/25806.pbf"]
+    assert keys_to_quadkeys(keys[1:]) == ["", "213"]
+    assert quadkeys_to_keys(["", "213"]).tolist() == keys[1:].tolist()
+    assert len(paths_to_keys([])) == 0
+
+
+def test_tile_parents_and_children():
+    keys = paths_to_keys(["16/58211/25806.mvt", "3/3/5.mvt"])
+    assert keys_to_paths(tile_parents(keys)) == ["15/29105/12903.mvt", "2/1/2.mvt"]
+    assert keys_to_paths(tile_parents(keys, 3)) == ["13/7276/3225.mvt", "0/0/0.mvt"]
+    with pytest.raises(ValueError):
+        tile_parents(keys, 4)
+    children = tile_children(keys[1:])
+    assert keys_to_paths(children[0]) == [
+        "4/6/10.mvt",
+        "4/7/10.mvt",
+        "4/6/11.mvt",
+        "4/7/11.mvt",
+    ]
+    assert (tile_parents(children[0]) == keys[1]).all()
+
+
+def test_tile_neighbors():
+    neighbors = tile_neighbors(paths_to_keys(["2/1/1.mvt", "2/0/0.mvt"]))
+    assert keys_to_paths(neighbors[0]) == [
+        "2/0/0.mvt",
+        "2/1/0.mvt",
+        "2/2/0.mvt",
+        "2/0/1.mvt",
+        "2/2/1.mvt",
+        "2/0/2.mvt",
+        "2/1/2.mvt",
+        "2/2/2.mvt",
+    ]
+    # xは折り返し、北の範囲外はNO_TILE
+    assert (neighbors[1][:3] == NO_TILE).all()
+    assert keys_to_paths(neighbors[1][3:]) == [
+        "2/3/0.mvt",
+        "2/1/0.mvt",
+        "2/3/1.mvt",
+        "2/0/1.mvt",
+        "2/1/1.mvt",
+    ]
+
+
+def test_sort_tiles():
+    # PMTilesの仕様のタイルID
+    tile_ids = {
+        "0/0/0.mvt": 0,
+        "1/0/0.mvt": 1,
+        "1/0/1.mvt": 2,
+        "1/1/1.mvt": 3,
+        "1/1/0.mvt": 4,
+        "2/0/0.mvt": 5,
+        "3/0/0.mvt": 21,
+        "3/3/5.mvt": 49,
+        "3/7/0.mvt": 84,
+        "10/909/403.mvt": 1146697,
+        "12/3423/1763.mvt": 19078479,
+        "15/29100/12907.mvt": 1174218634,
+        "20/931621/413034.mvt": 1202399602738,
+    }
+    rng = np.random.default_rng(0)
+    keys = paths_to_keys(list(rng.permutation(list(tile_ids))))
+    assert zxy_to_tile_ids(*unpack_tiles(keys)).tolist() == [
+        tile_ids[path] for path in keys_to_paths(keys)
+    ]
+    # ヒルベルト曲線の順はPMTilesのタイルIDの順
+    assert keys_to_paths(sort_tiles(keys)) == sorted(tile_ids, key=tile_ids.get)
+    paths = ["1/0/0.mvt", "1/1/0.mvt", "1/0/1.mvt"]
+    assert keys_to_paths(sort_tiles(paths_to_keys(paths), "morton")) == [
+        "1/0/0.mvt",
+        "1/0/1.mvt",
+        "1/1/0.mvt",
+    ]
+    assert (sort_tiles(keys, "zxy") == np.sort(keys)).all()
+    with pytest.raises(ValueError):
+        sort_tiles(keys, "unknown")
+
+
+def test_keys_to_bounds():
+    paths = ["16/58211/25806.mvt", "3/3/5.mvt"]
+    bounds = keys_to_bounds(paths_to_keys(paths))
+    for path, row in zip(paths, bounds):
+        assert row.tolist() == pytest.approx(tile_to_polygon(path).bounds, rel=1e-12)
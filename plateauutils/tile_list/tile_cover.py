@@ -0,0 +1,433 @@
+import numpy as np
+from plateauutils.tile_list.geo_to_tile import _num2deg, points_to_tiles
+import shapely
+from shapely.geometry import Polygon
+
+# 格子点との距離がこれ以下の交点は、shapelyで交差を判定する(度)
+TOLERANCE = 1e-9
+
+# iter_tile_coverで一度に求めるタイルの数の目安
+CHUNK_SIZE = 1 << 16
+
+
+def tile_range(polygon: Polygon, zoom: int) -> tuple:
+    """ポリゴンの範囲を含むタイルの範囲を返す
+
+    範囲の南西端と北東端の点を含むタイル(point_to_tileと同じ)から求める
+    PolygonToTileList、iter_tile_cover、quadtree_tile_coverはこの範囲を共通に使う
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン
+    zoom : int
+        ズームレベル
+
+    Returns
+    -------
+    tuple
+        (開始x座標, 開始y座標(南端), 終了x座標, 終了y座標(北端))
+    """
+    min_x, min_y, max_x, max_y = polygon.bounds
+    xtiles, ytiles = points_to_tiles([min_x, max_x], [min_y, max_y], zoom)
+    return int(xtiles[0]), int(ytiles[0]), int(xtiles[1]), int(ytiles[1])
+
+
+def tile_cover(
+    polygon: Polygon,
+    zoom: int,
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    return_interior: bool = False,
+) -> tuple:
+    """範囲内のタイルのうち、ポリゴンと交差するタイルのみを求める
+
+    ポリゴンの辺が通るタイルを辺ごとに格子との交点から求め、
+    内部のタイルは行ごとの走査線で塗りつぶす
+    交点が格子点とほぼ一致する場合のみshapelyで判定し、
+    tile_to_polygonのポリゴンとintersectsで判定した結果と一致させる
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン(MultiPolygonも可)
+    zoom : int
+        ズームレベル
+    start_x : int
+        開始x座標
+    start_y : int
+        開始y座標(南端)
+    end_x : int
+        終了x座標
+    end_y : int
+        終了y座標(北端)
+    return_interior : bool, optional
+        Trueの場合はタイルがポリゴンの内部にあるかの配列も返す, by default False
+
+    Returns
+    -------
+    tuple
+        タイルのxの配列とyの配列(int64、x、yの順に並べる)
+        return_interiorがTrueの場合は、辺が通らずポリゴンに完全に含まれるタイルを
+        Trueとするbool型の配列を加える(辺が通るタイルは全てFalse)
+    """
+    grid = _Grid(zoom, start_x, start_y, end_x, end_y)
+    if polygon.geom_type not in ["Polygon", "MultiPolygon"]:
+        # ポリゴン以外は全て内部ではないタイルとする
+        cells = _intersecting_cells(polygon, grid)
+        return _cover_result(grid, cells, len(cells), return_interior)
+    edges = _polygon_edges(polygon)
+    return _cover_result(grid, *_cover_cells(polygon, edges, grid), return_interior)
+
+
+def iter_tile_cover(
+    polygon: Polygon,
+    zoom: int,
+    chunk_size: int = CHUNK_SIZE,
+    return_interior: bool = False,
+):
+    """ポリゴンと交差するタイルを、列の帯ごとに順に求める
+
+    範囲をおよそchunk_size個のタイルを含む列の帯に分け、帯ごとにtile_coverと
+    同じ方法で求めるため、範囲全体のタイルを一度に保持しない
+    全ての帯の結果を連結するとtile_coverの結果と一致する
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン(MultiPolygonも可)
+    zoom : int
+        ズームレベル
+    chunk_size : int, optional
+        帯に含める範囲のタイルの数の目安, by default CHUNK_SIZE
+    return_interior : bool, optional
+        Trueの場合はtile_coverと同じくポリゴンの内部にあるかの配列も返す,
+        by default False
+
+    Yields
+    ------
+    tuple
+        帯ごとのタイルのxの配列とyの配列(int64、x、yの順に並べる)
+    """
+    start_x, start_y, end_x, end_y = tile_range(polygon, zoom)
+    # 1列でchunk_sizeを超える場合も1列ずつ求める
+    width = max(1, chunk_size // (start_y - end_y + 1))
+    edges = None
+    if polygon.geom_type in ["Polygon", "MultiPolygon"]:
+        edges = _polygon_edges(polygon)
+    for x in range(start_x, end_x + 1, width):
+        grid = _Grid(zoom, x, start_y, min(x + width - 1, end_x), end_y)
+        if edges is None:
+            cells = _intersecting_cells(polygon, grid)
+            interior_start = len(cells)
+        else:
+            cells, interior_start = _cover_cells(polygon, edges, grid)
+        if len(cells) > 0:
+            yield _cover_result(grid, cells, interior_start, return_interior)
+
+
+def quadtree_tile_cover(polygon: Polygon, min_zoom: int, max_zoom: int) -> dict:
+    """複数のズームレベルのタイルのうち、ポリゴンと交差するタイルを求める
+
+    min_zoomでtile_coverと同じ方法で求めたタイルを、max_zoomまで4分割していく
+    ポリゴンに完全に含まれるタイルの子は判定せずにそのまま含め、
+    辺が通るタイルの子のみを判定する
+    各ズームレベルの結果はtile_coverと一致する
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon
+        対象となるポリゴン(MultiPolygonも可)
+    min_zoom : int
+        最小のズームレベル
+    max_zoom : int
+        最大のズームレベル
+
+    Returns
+    -------
+    dict
+        ズームレベルをキー、(タイルのxの配列, yの配列)を値とする辞書
+    """
+    if polygon.geom_type not in ["Polygon", "MultiPolygon"]:
+        return {
+            zoom: tile_cover(polygon, zoom, *tile_range(polygon, zoom))
+            for zoom in range(min_zoom, max_zoom + 1)
+        }
+    edges = _polygon_edges(polygon)
+    result = {}
+    for zoom in range(min_zoom, max_zoom + 1):
+        grid = _Grid(zoom, *tile_range(polygon, zoom))
+        boundary = _boundary(polygon, edges, grid)
+        if zoom == min_zoom:
+            interior = np.setdiff1d(_fill_cells(edges[1], edges[2], grid), boundary)
+            interior_x, interior_y = grid.xy(interior)
+        else:
+            # 内部のタイルの子は判定せずに内部とし、辺が通るタイルの子のうち
+            # 辺が通らないものは中心で内外を判定する
+            interior_x, interior_y = _children(interior_x, interior_y)
+            candidates = np.setdiff1d(
+                grid.cells(*_children(boundary_x, boundary_y)), boundary
+            )
+            shapely.prepare(polygon)
+            inside = shapely.contains_xy(polygon, *grid.centers(candidates))
+            inside_x, inside_y = grid.xy(candidates[inside])
+            interior_x = np.concatenate([interior_x, inside_x])
+            interior_y = np.concatenate([interior_y, inside_y])
+        boundary_x, boundary_y = grid.xy(boundary)
+        # 辺が通るタイルと内部のタイルは重複しない
+        result[zoom] = _sort_tiles(
+            np.concatenate([boundary_x, interior_x]),
+            np.concatenate([boundary_y, interior_y]),
+            zoom,
+        )
+    return result
+
+
+def _cover_cells(polygon: Polygon, edges: tuple, grid: "_Grid") -> tuple:
+    # 辺が通るセルに内部のセル(重複しない)を続けた配列と、内部のセルの開始位置
+    boundary = _boundary(polygon, edges, grid)
+    interior = np.setdiff1d(_fill_cells(edges[1], edges[2], grid), boundary)
+    return np.concatenate([boundary, interior]), len(boundary)
+
+
+def _cover_result(
+    grid: "_Grid", cells: np.ndarray, interior_start: int, return_interior: bool
+) -> tuple:
+    # セルをタイルのx, yの順に並べ、必要であれば内部のタイルかの配列を加える
+    xtiles, ytiles = grid.xy(cells)
+    if not return_interior:
+        return _sort_tiles(xtiles, ytiles, grid.zoom)
+    order = np.argsort((xtiles << grid.zoom) | ytiles)
+    interior = np.arange(len(cells)) >= interior_start
+    return xtiles[order], ytiles[order], interior[order]
+
+
+def _sort_tiles(xtiles: np.ndarray, ytiles: np.ndarray, zoom: int) -> tuple:
+    # x、yの順に並べる(1つの整数にまとめて並べ替える)
+    keys = np.sort((xtiles << zoom) | ytiles)
+    return keys >> zoom, keys & ((1 << zoom) - 1)
+
+
+def _children(xtiles: np.ndarray, ytiles: np.ndarray) -> tuple:
+    # 1つ大きいズームレベルの4つの子タイル
+    xtiles = (xtiles[:, None] * 2 + np.array([0, 1, 0, 1])).ravel()
+    ytiles = (ytiles[:, None] * 2 + np.array([0, 0, 1, 1])).ravel()
+    return xtiles, ytiles
+
+
+class _Grid(object):
+    # タイルの範囲の格子、セルは行*列数+列の番号で表す
+    # 行rのタイルのyはstart_y - r(緯度の昇順)
+
+    def __init__(self, zoom: int, start_x: int, start_y: int, end_x: int, end_y: int):
+        n = 1 << zoom
+        self.zoom = zoom
+        self.start_x = start_x
+        self.start_y = start_y
+        # 列、行の境界の経度緯度(昇順、tile_to_polygonと同じ計算)
+        self.lon_edges = np.arange(start_x, end_x + 2) / n * 360.0 - 180.0
+        self.lat_edges = np.array(
+            [_num2deg(0, y, zoom)[0] for y in range(start_y + 1, end_y - 1, -1)]
+        )
+        self.ncols = len(self.lon_edges) - 1
+        self.nrows = len(self.lat_edges) - 1
+
+    def cell_ids(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # 範囲内のセルのみを番号にする
+        valid = (cols >= 0) & (cols < self.ncols) & (rows >= 0) & (rows < self.nrows)
+        return rows[valid] * self.ncols + cols[valid]
+
+    def cells(self, xtiles: np.ndarray, ytiles: np.ndarray) -> np.ndarray:
+        # タイルのx, yを範囲内のセルの番号にする
+        return self.cell_ids(xtiles - self.start_x, self.start_y - ytiles)
+
+    def xy(self, cells: np.ndarray) -> tuple:
+        # セルの番号をタイルのx, yにする
+        rows, cols = np.divmod(cells, self.ncols)
+        return self.start_x + cols, self.start_y - rows
+
+    def centers(self, cells: np.ndarray) -> tuple:
+        # セルの中心の経度緯度
+        rows, cols = np.divmod(cells, self.ncols)
+        return (
+            (self.lon_edges[cols] + self.lon_edges[cols + 1]) / 2.0,
+            (self.lat_edges[rows] + self.lat_edges[rows + 1]) / 2.0,
+        )
+
+
+def _polygon_edges(polygon: Polygon) -> tuple:
+    # ポリゴンの頂点と、リングの辺の始点と終点の配列
+    coords, ring_index = shapely.get_coordinates(
+        shapely.get_rings(shapely.get_parts(polygon)), return_index=True
+    )
+    same = ring_index[1:] == ring_index[:-1]
+    return coords, coords[:-1][same], coords[1:][same]
+
+
+def _boundary(polygon: Polygon, edges: tuple, grid: "_Grid") -> np.ndarray:
+    # 辺が通る(接する)セル
+    definite, uncertain = _boundary_cells(*edges, grid)
+    if len(uncertain) == 0:
+        return definite
+    return np.union1d(definite, _verify_cells(polygon, uncertain, grid))
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    # [start, start + count)の範囲を連結したインデックスを返す
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(counts)
+    return (
+        np.repeat(np.asarray(starts, dtype=np.int64), counts)
+        + np.arange(total, dtype=np.int64)
+        - np.repeat(ends - counts, counts)
+    )
+
+
+def _touching_cells(x: np.ndarray, y: np.ndarray, grid: _Grid) -> np.ndarray:
+    # 点を含む(境界で接するものを含む)セルを返す
+    lon_edges = grid.lon_edges
+    lat_edges = grid.lat_edges
+    cols = np.searchsorted(lon_edges, x, side="right") - 1
+    rows = np.searchsorted(lat_edges, y, side="right") - 1
+    on_col = lon_edges[np.clip(cols, 0, len(lon_edges) - 1)] == x
+    on_row = lat_edges[np.clip(rows, 0, len(lat_edges) - 1)] == y
+    # 格子線上の点は隣のセルとも接する
+    return np.concatenate(
+        [
+            grid.cell_ids(cols, rows),
+            grid.cell_ids(cols[on_col] - 1, rows[on_col]),
+            grid.cell_ids(cols[on_row], rows[on_row] - 1),
+            grid.cell_ids(cols[on_col & on_row] - 1, rows[on_col & on_row] - 1),
+        ]
+    )
+
+
+def _crossings(start: np.ndarray, end: np.ndarray, edges: np.ndarray) -> tuple:
+    # 辺が格子線を(端点を除いて)横切る位置を、辺の番号、格子線の番号、辺上の比率で返す
+    low = np.minimum(start, end)
+    high = np.maximum(start, end)
+    first = np.searchsorted(edges, low, side="right")
+    counts = np.maximum(np.searchsorted(edges, high, side="left") - first, 0)
+    segments = np.repeat(np.arange(len(start)), counts)
+    lines = _ranges(first, counts)
+    ratios = (edges[lines] - start[segments]) / (end[segments] - start[segments])
+    return segments, lines, ratios
+
+
+def _near_corner(values: np.ndarray, edges: np.ndarray) -> tuple:
+    # 格子線上の交点のうち、直交する格子線に近いものと、その格子線の番号を返す
+    index = np.clip(np.searchsorted(edges, values), 1, len(edges) - 1)
+    nearest = np.where(
+        values - edges[index - 1] < edges[index] - values, index - 1, index
+    )
+    near = np.abs(values - edges[nearest]) <= TOLERANCE
+    return near, nearest
+
+
+def _boundary_cells(
+    vertices: np.ndarray,
+    p0: np.ndarray,
+    p1: np.ndarray,
+    grid: _Grid,
+) -> tuple:
+    # 辺が通るセル(確定)と、格子点の近くを通るため判定が必要なセルを返す
+    lon_edges = grid.lon_edges
+    lat_edges = grid.lat_edges
+    x0, y0 = p0[:, 0], p0[:, 1]
+    x1, y1 = p1[:, 0], p1[:, 1]
+    # 頂点を含むセル(格子線上の頂点は両側のセル)
+    definite = [_touching_cells(vertices[:, 0], vertices[:, 1], grid)]
+    uncertain = []
+    # 格子線との交点で辺を区間に分け、区間の中点を含むセルを辺が通るセルとする
+    v_segments, v_lines, v_ratios = _crossings(x0, x1, lon_edges)
+    h_segments, h_lines, h_ratios = _crossings(y0, y1, lat_edges)
+    count = len(p0)
+    segments = np.concatenate(
+        [np.arange(count), np.arange(count), v_segments, h_segments]
+    )
+    ratios = np.concatenate([np.zeros(count), np.ones(count), v_ratios, h_ratios])
+    order = np.lexsort((ratios, segments))
+    segments = segments[order]
+    ratios = ratios[order]
+    pair = segments[1:] == segments[:-1]
+    interval_segments = segments[:-1][pair]
+    middle = (ratios[:-1][pair] + ratios[1:][pair]) / 2.0
+    lengths = (ratios[1:][pair] - ratios[:-1][pair]) * np.hypot(x1 - x0, y1 - y0)[
+        interval_segments
+    ]
+    mx = x0[interval_segments] + middle * (x1 - x0)[interval_segments]
+    my = y0[interval_segments] + middle * (y1 - y0)[interval_segments]
+    # 格子線上の辺(水平、垂直)は両側のセルと接する
+    # 格子点の近くで区間が短い場合は、中点が隣のセルに入り得るため判定が必要
+    short = lengths <= TOLERANCE
+    definite.append(_touching_cells(mx[~short], my[~short], grid))
+    uncertain.append(_touching_cells(mx[short], my[short], grid))
+    # 格子点の近くを通る交点の周囲の4セルは判定が必要
+    v_y = y0[v_segments] + v_ratios * (y1 - y0)[v_segments]
+    near, rows = _near_corner(v_y, lat_edges)
+    h_x = x0[h_segments] + h_ratios * (x1 - x0)[h_segments]
+    h_near, cols = _near_corner(h_x, lon_edges)
+    corner_cols = np.concatenate([v_lines[near], cols[h_near]])
+    corner_rows = np.concatenate([rows[near], h_lines[h_near]])
+    for dc in [-1, 0]:
+        for dr in [-1, 0]:
+            uncertain.append(grid.cell_ids(corner_cols + dc, corner_rows + dr))
+    definite = np.unique(np.concatenate(definite))
+    uncertain = np.setdiff1d(np.concatenate(uncertain), definite)
+    return definite, uncertain
+
+
+def _fill_cells(p0: np.ndarray, p1: np.ndarray, grid: _Grid) -> np.ndarray:
+    # 中心がポリゴンの内部にあるセルを行ごとの走査線(偶奇規則)で求める
+    lon_edges = grid.lon_edges
+    lat_edges = grid.lat_edges
+    x0, y0 = p0[:, 0], p0[:, 1]
+    x1, y1 = p1[:, 0], p1[:, 1]
+    row_centers = (lat_edges[:-1] + lat_edges[1:]) / 2.0
+    col_centers = (lon_edges[:-1] + lon_edges[1:]) / 2.0
+    # 辺ごとに、中心の緯度が[下端, 上端)に含まれる行との交点を求める
+    low = np.minimum(y0, y1)
+    high = np.maximum(y0, y1)
+    first = np.searchsorted(row_centers, low, side="left")
+    counts = np.searchsorted(row_centers, high, side="left") - first
+    segments = np.repeat(np.arange(len(p0)), counts)
+    rows = _ranges(first, counts)
+    xs = x0[segments] + (row_centers[rows] - y0[segments]) / (
+        y1[segments] - y0[segments]
+    ) * (x1[segments] - x0[segments])
+    order = np.lexsort((xs, rows))
+    rows = rows[order]
+    xs = xs[order]
+    # 行ごとに交点を2つずつ組にして、その間に中心があるセルを内部とする
+    row_start = np.searchsorted(rows, rows, side="left")
+    is_start = (np.arange(len(rows)) - row_start) % 2 == 0
+    is_start[-1:] = False
+    starts = np.flatnonzero(is_start)
+    first_cols = np.searchsorted(col_centers, xs[starts], side="left")
+    last_cols = np.searchsorted(col_centers, xs[starts + 1], side="right")
+    counts = np.maximum(last_cols - first_cols, 0)
+    cols = _ranges(first_cols, counts)
+    return grid.cell_ids(cols, np.repeat(rows[starts], counts))
+
+
+def _verify_cells(polygon: Polygon, cells: np.ndarray, grid: _Grid) -> np.ndarray:
+    # shapelyでポリゴンと交差するセルのみを返す
+    rows, cols = np.divmod(cells, grid.ncols)
+    boxes = shapely.box(
+        grid.lon_edges[cols],
+        grid.lat_edges[rows],
+        grid.lon_edges[cols + 1],
+        grid.lat_edges[rows + 1],
+    )
+    shapely.prepare(polygon)
+    return cells[shapely.intersects(polygon, boxes)]
+
+
+def _intersecting_cells(geometry, grid: _Grid) -> np.ndarray:
+    # ポリゴン以外は範囲内の全てのセルをshapelyで判定する
+    return _verify_cells(geometry, np.arange(grid.ncols * grid.nrows), grid)
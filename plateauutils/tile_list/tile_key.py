@@ -0,0 +1,360 @@
+import numpy as np
+from plateauutils.tile_list.geo_to_tile import tiles_to_bounds
+
+# キーで扱える最大のズームレベル
+MAX_ZOOM = 29
+
+# x, yに割り当てるビット数
+COORD_BITS = 29
+COORD_MASK = (1 << COORD_BITS) - 1
+
+# 範囲外のタイルを表すキー
+NO_TILE = np.uint64(np.iinfo(np.uint64).max)
+
+# 8近傍のx, yの差分
+NEIGHBOR_OFFSETS = np.array(
+    [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+)
+
+
+def pack_tiles(xtiles: np.ndarray, ytiles: np.ndarray, zoom) -> np.ndarray:
+    """タイルのz, x, yを1つのuint64のキーにまとめる
+
+    上位からズームレベル(6ビット)、x(29ビット)、y(29ビット)の順に格納する
+    ズームレベルが0からMAX_ZOOM、x, yが0から2^zoom未満の範囲外の場合はValueError
+
+    Parameters
+    ----------
+    xtiles : numpy.ndarray
+        タイルのxの配列
+    ytiles : numpy.ndarray
+        タイルのyの配列
+    zoom : int or numpy.ndarray
+        ズームレベル(タイルごとに指定も可)
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルのキーの配列(uint64)
+    """
+    xtiles = np.asarray(xtiles, dtype=np.int64)
+    ytiles = np.asarray(ytiles, dtype=np.int64)
+    zoom = np.asarray(zoom, dtype=np.int64)
+    if ((zoom < 0) | (zoom > MAX_ZOOM)).any():
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    # 範囲外の値は他のタイルのキーと衝突するためエラーとする
+    size = np.int64(1) << zoom
+    invalid = (xtiles < 0) | (xtiles >= size) | (ytiles < 0) | (ytiles >= size)
+    if invalid.any():
+        z, x, y = [
+            np.broadcast_to(i, invalid.shape)[invalid][0]
+            for i in (zoom, xtiles, ytiles)
+        ]
+        raise ValueError(f"tile is out of range: {z}/{x}/{y}")
+    xtiles = xtiles.astype(np.uint64)
+    ytiles = ytiles.astype(np.uint64)
+    zoom = zoom.astype(np.uint64)
+    return (
+        (zoom << np.uint64(2 * COORD_BITS)) | (xtiles << np.uint64(COORD_BITS)) | ytiles
+    )
+
+
+def unpack_tiles(keys: np.ndarray) -> tuple:
+    """タイルのキーをz, x, yに分解する
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    tuple
+        ズームレベル、x、yの配列(int64)
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    zoom = (keys >> np.uint64(2 * COORD_BITS)).astype(np.int64)
+    xtiles = ((keys >> np.uint64(COORD_BITS)) & np.uint64(COORD_MASK)).astype(np.int64)
+    ytiles = (keys & np.uint64(COORD_MASK)).astype(np.int64)
+    return zoom, xtiles, ytiles
+
+
+def keys_to_paths(keys: np.ndarray, ext: str = ".mvt") -> list:
+    """タイルのキーをタイルのパス(z/x/y.ext)のリストに変換する
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+    ext : str, optional
+        タイルの拡張子, by default ".mvt"
+
+    Returns
+    -------
+    list
+        タイルのパスのリスト
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    return [
+        f"{z}/{x}/{y}{ext}"
+        for z, x, y in zip(zoom.tolist(), xtiles.tolist(), ytiles.tolist())
+    ]
+
+
+def paths_to_keys(paths: list) -> np.ndarray:
+    """タイルのパス(z/x/y.ext)のリストをタイルのキーに変換する
+
+    Parameters
+    ----------
+    paths : list
+        タイルのパスのリスト
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルのキーの配列
+    """
+    values = np.array(
+        [path.split(".")[0].split("/")[-3:] for path in paths], dtype=np.int64
+    ).reshape((-1, 3))
+    return pack_tiles(values[:, 1], values[:, 2], values[:, 0])
+
+
+def keys_to_quadkeys(keys: np.ndarray) -> list:
+    """タイルのキーをクアッドキーの文字列のリストに変換する
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    list
+        クアッドキーのリスト(ズームレベル0のタイルは空文字列)
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    result = []
+    for z, x, y in zip(zoom.tolist(), xtiles.tolist(), ytiles.tolist()):
+        digits = []
+        for i in range(z, 0, -1):
+            mask = 1 << (i - 1)
+            digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+        result.append("".join(digits))
+    return result
+
+
+def quadkeys_to_keys(quadkeys: list) -> np.ndarray:
+    """クアッドキーの文字列のリストをタイルのキーに変換する
+
+    Parameters
+    ----------
+    quadkeys : list
+        クアッドキーのリスト
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルのキーの配列
+    """
+    zoom = []
+    xtiles = []
+    ytiles = []
+    for quadkey in quadkeys:
+        x = y = 0
+        for digit in quadkey:
+            digit = int(digit)
+            x = (x << 1) | (digit & 1)
+            y = (y << 1) | (digit >> 1)
+        zoom.append(len(quadkey))
+        xtiles.append(x)
+        ytiles.append(y)
+    return pack_tiles(xtiles, ytiles, zoom)
+
+
+def tile_parents(keys: np.ndarray, levels: int = 1) -> np.ndarray:
+    """levels個小さいズームレベルの親タイルのキーを返す
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+    levels : int, optional
+        遡るズームレベルの数, by default 1
+
+    Returns
+    -------
+    numpy.ndarray
+        親タイルのキーの配列
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    if (zoom < levels).any():
+        raise ValueError("zoom must be greater than or equal to levels")
+    return pack_tiles(xtiles >> levels, ytiles >> levels, zoom - levels)
+
+
+def tile_children(keys: np.ndarray) -> np.ndarray:
+    """1つ大きいズームレベルの4つの子タイルのキーを返す
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        子タイルのキーの(タイル数, 4)の配列(左上、右上、左下、右下の順)
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    return pack_tiles(
+        xtiles[:, None] * 2 + np.array([0, 1, 0, 1]),
+        ytiles[:, None] * 2 + np.array([0, 0, 1, 1]),
+        zoom[:, None] + 1,
+    )
+
+
+def tile_neighbors(keys: np.ndarray) -> np.ndarray:
+    """同じズームレベルの8近傍のタイルのキーを返す
+
+    xは経度180度で折り返し、南北の範囲外はNO_TILEとする
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        近傍のタイルのキーの(タイル数, 8)の配列(北西から南東への行順)
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    n = (1 << zoom)[:, None]
+    xs = (xtiles[:, None] + NEIGHBOR_OFFSETS[:, 0]) % n
+    ys = ytiles[:, None] + NEIGHBOR_OFFSETS[:, 1]
+    valid = (ys >= 0) & (ys < n)
+    result = pack_tiles(xs, np.where(valid, ys, 0), zoom[:, None])
+    result[~valid] = NO_TILE
+    return result
+
+
+def morton_codes(keys: np.ndarray) -> np.ndarray:
+    """タイルのx, yのビットを交互に並べたモートン(Zオーダー)の値を返す
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        モートンの値の配列(uint64)
+    """
+    _, xtiles, ytiles = unpack_tiles(keys)
+    return (_spread_bits(xtiles) << np.uint64(1)) | _spread_bits(ytiles)
+
+
+def hilbert_codes(keys: np.ndarray) -> np.ndarray:
+    """ズームレベル内のヒルベルト曲線上の位置を返す
+
+    小さいズームレベルのタイルの数を加えるとPMTilesのタイルIDになる
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        ヒルベルト曲線上の位置の配列(uint64)
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    codes = np.zeros(len(zoom), dtype=np.uint64)
+    max_zoom = int(zoom.max()) if len(zoom) > 0 else 0
+    for level in range(max_zoom - 1, -1, -1):
+        # ズームレベルがlevelより大きいタイルのみを処理する
+        active = zoom > level
+        s = np.int64(1) << level
+        rx = ((xtiles & s) > 0).astype(np.int64)
+        ry = ((ytiles & s) > 0).astype(np.int64)
+        codes += np.where(active, s * s * ((3 * rx) ^ ry), 0).astype(np.uint64)
+        # 象限に合わせて回転する
+        flip = active & (ry == 0) & (rx == 1)
+        xtiles = np.where(flip, s - 1 - xtiles, xtiles)
+        ytiles = np.where(flip, s - 1 - ytiles, ytiles)
+        swap = active & (ry == 0)
+        xtiles, ytiles = np.where(swap, ytiles, xtiles), np.where(swap, xtiles, ytiles)
+        # 回転後は下位のビットのみを使う
+        xtiles &= s - 1
+        ytiles &= s - 1
+    return codes
+
+
+def sort_tiles(keys: np.ndarray, order: str = "hilbert") -> np.ndarray:
+    """タイルのキーをズームレベルごとに空間的に近い順に並べ替える
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+    order : str, optional
+        並べ替えの順序, by default "hilbert"
+
+        * hilbert: ヒルベルト曲線の順(PMTilesのタイルIDの順)
+        * morton: モートン(Zオーダー)の順
+        * zxy: ズームレベル、x、yの順
+
+    Returns
+    -------
+    numpy.ndarray
+        並べ替えたタイルのキーの配列
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    if order == "zxy":
+        return np.sort(keys)
+    if order == "hilbert":
+        codes = hilbert_codes(keys)
+    elif order == "morton":
+        codes = morton_codes(keys)
+    else:
+        raise ValueError("order must be one of hilbert, morton, zxy")
+    zoom, _, _ = unpack_tiles(keys)
+    return keys[np.lexsort((codes, zoom))]
+
+
+def keys_to_bounds(keys: np.ndarray) -> np.ndarray:
+    """タイルのキーを範囲の配列に変換する
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        タイルのキーの配列
+
+    Returns
+    -------
+    numpy.ndarray
+        タイルごとの(最小経度, 最小緯度, 最大経度, 最大緯度)の(タイル数, 4)の配列
+    """
+    zoom, xtiles, ytiles = unpack_tiles(keys)
+    bounds = np.empty((len(zoom), 4), dtype=np.float64)
+    for z in np.unique(zoom):
+        mask = zoom == z
+        bounds[mask] = tiles_to_bounds(xtiles[mask], ytiles[mask], int(z))
+    return bounds
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    # 32ビットまでの値のビットを1つおきに広げる
+    values = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in [
+        (16, 0x0000FFFF0000FFFF),
+        (8, 0x00FF00FF00FF00FF),
+        (4, 0x0F0F0F0F0F0F0F0F),
+        (2, 0x3333333333333333),
+        (1, 0x5555555555555555),
+    ]:
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values